@@ -0,0 +1,100 @@
+"""Compare per-cycle cost of the port scanner backends.
+
+Opens a number of listening sockets inside and outside the scanned range,
+then times repeated scans with every backend available on this machine.
+
+Usage:
+    python benchmarks/bench_backends.py [--listeners 50] [--cycles 100]
+"""
+
+import argparse
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import port_scanner
+from src.port_set import PortSet
+
+START_PORT = 3000
+END_PORT = 9000
+PORTS = PortSet([(START_PORT, END_PORT)])
+
+
+def open_listeners(count: int):
+    """Open `count` listeners in range plus as many out of range."""
+    sockets = []
+    for index in range(count * 2):
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Even indexes land in the scanned range, odd ones above it
+        base = START_PORT + 100 if index % 2 == 0 else END_PORT + 100
+        for port in range(base + index, base + index + 500):
+            try:
+                sock.bind(("127.0.0.1", port))
+                break
+            except OSError:
+                continue
+        sock.listen()
+        sockets.append(sock)
+    return sockets
+
+
+def time_backend(backend, cycles: int):
+    """Run `cycles` scans and return per-cycle durations in milliseconds."""
+    durations = []
+    for _ in range(cycles):
+        started = time.perf_counter()
+        backend.scan(PORTS)
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--listeners", type=int, default=50)
+    parser.add_argument("--cycles", type=int, default=100)
+    args = parser.parse_args()
+
+    sockets = open_listeners(args.listeners)
+    try:
+        print(f"{args.listeners} listeners in range, {args.listeners} outside, "
+              f"{args.cycles} cycles\n")
+        print(f"{'backend':<10}{'found':>7}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+        for name, backend_class in port_scanner.BACKENDS.items():
+            backend = backend_class()
+            if not backend.is_available():
+                print(f"{name:<10}{'n/a':>7}")
+                continue
+
+            found = len(backend.scan(PORTS))
+            durations = sorted(time_backend(backend, args.cycles))
+            p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+            print(f"{name:<10}{found:>7}{statistics.mean(durations):>10.2f}"
+                  f"{statistics.median(durations):>10.2f}{p99:>10.2f}")
+
+        # Netlink skips the /proc fd walk when listeners are unchanged;
+        # also show the cost when every cycle sees a change
+        backend = port_scanner.NetlinkBackend()
+        if backend.is_available():
+            durations = []
+            for _ in range(args.cycles):
+                backend._fingerprint = None
+                started = time.perf_counter()
+                backend.scan(PORTS)
+                durations.append((time.perf_counter() - started) * 1000)
+            durations.sort()
+            p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+            print(f"{'netlink*':<10}{'':>7}{statistics.mean(durations):>10.2f}"
+                  f"{statistics.median(durations):>10.2f}{p99:>10.2f}")
+            print("\n* netlink with the change cache disabled (listeners changing every cycle)")
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
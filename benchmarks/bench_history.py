@@ -0,0 +1,88 @@
+"""Benchmark the SQLite history store.
+
+Feeds a day of synthetic scans through HistoryStore.record() (batched
+writes), rolls them up, then times the typical queries: one port over the
+last hour, one process name over the day and the top processes by memory.
+
+Usage:
+    python benchmarks/bench_history.py [--processes 30] [--hours 24] [--interval 10]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import scan_engine
+from src.history import HistoryStore
+from src.port_scanner import PortSnapshot
+
+
+def best_of(func, repeat=5):
+    """Return the fastest of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=30)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--interval", type=float, default=10, help="seconds between scans")
+    parser.add_argument("--batch", type=int, default=10, help="scans per write")
+    args = parser.parse_args()
+
+    names = ["node", "python3", "vite", "ruby", "java", "gunicorn"]
+    start = time.time() - args.hours * 3600
+    scans = int(args.hours * 3600 / args.interval)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = HistoryStore(str(Path(workdir) / "history.db"), batch_cycles=args.batch,
+                             rollup_interval=float("inf"), raw_retention=args.hours * 3600)
+
+        started = time.perf_counter()
+        for scan in range(scans):
+            ports = PortSnapshot(
+                {'port': 3000 + p, 'pid': 1000 + p, 'name': names[p % len(names)],
+                 'memory_mb': 100.0 + p + scan % 50, 'cpu_percent': float(scan % 7)}
+                for p in range(args.processes)
+            )
+            store.record(scan_engine.Snapshot(scan + 1, ports, start + scan * args.interval, 0.0))
+        store.flush()
+        insert_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store.rollup()
+        rollup_s = time.perf_counter() - started
+
+        now = time.time()
+        queries = {
+            "port 3000, last hour (raw)":
+                lambda: store.query(port=3000, since=now - 3600),
+            "name 'node', today (1m)":
+                lambda: store.query(name="node", since=now - 86400, resolution='1m'),
+            "top 10 by memory, today (1m)":
+                lambda: store.top_processes('memory', since=now - 86400),
+            "top 10 by memory, today (1h)":
+                lambda: store.top_processes('memory', since=now - 86400, resolution='1h'),
+        }
+        timings = {label: best_of(query) for label, query in queries.items()}
+        store.close()
+
+    rows = scans * args.processes
+    print(f"{scans} scans x {args.processes} processes = {rows} samples, "
+          f"batches of {args.batch} scans\n")
+    print(f"{'insert':<32}{insert_s * 1000:>10.1f} ms  ({rows / insert_s:,.0f} rows/s)")
+    print(f"{'rollup (1m + 1h)':<32}{rollup_s * 1000:>10.1f} ms")
+    for label, ms in timings.items():
+        print(f"{label:<32}{ms:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Benchmark the scan -> enrich -> filter -> render pipeline on synthetic fixtures.
+
+Each stage is fed generated data (lsof output, a fake /proc tree, fake
+psutil processes) sized from 10 up to 10,000 listeners, and timed over
+repeated runs. Results can be saved as a baseline and compared later so
+regressions show up.
+
+Usage:
+    python benchmarks/bench_pipeline.py                  # run, compare with baseline if present
+    python benchmarks/bench_pipeline.py --save           # run and store as the new baseline
+    python benchmarks/bench_pipeline.py --check          # exit 1 on regressions
+    python benchmarks/bench_pipeline.py --sizes 10,100 --stages scan_proc,menu
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import fixtures
+from src import config, menu_model, port_scanner, process_monitor
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines.json"
+
+# A stage is slower than its baseline if p50 grew by more than this fraction
+DEFAULT_TOLERANCE = 0.25
+
+
+class FixtureLsofBackend(port_scanner.LsofBackend):
+    """lsof backend that parses canned output instead of running lsof."""
+
+    def __init__(self, output: str):
+        self.output = output
+
+    def _lsof_lines(self, ports):
+        return io.StringIO(self.output)
+
+
+def stage_scan_lsof(listeners, workdir):
+    """scan_ports() through the lsof backend (parsing only)."""
+    port_scanner.set_backend(FixtureLsofBackend(fixtures.make_lsof_output(listeners)))
+    return lambda: port_scanner.scan_ports()
+
+
+def stage_scan_proc(listeners, workdir):
+    """scan_ports() through the /proc/net backend on a fake procfs tree."""
+    proc_root = Path(workdir) / f"proc-{len(listeners)}"
+    if not proc_root.exists():
+        fixtures.make_proc_tree(str(proc_root), listeners)
+    port_scanner.set_backend(port_scanner.ProcNetBackend(proc_root=str(proc_root)))
+    return lambda: port_scanner.scan_ports()
+
+
+def stage_filter(listeners, workdir):
+    """filter_processes() over raw scan records (whitelist mode)."""
+    records = [
+        {'port': listener.port, 'pid': listener.pid, 'name': listener.name}
+        for listener in listeners
+    ]
+    return lambda: port_scanner.filter_processes(records)
+
+
+def stage_enrich(listeners, workdir):
+    """get_processes_info() for every listener (fake psutil)."""
+    pids = [listener.pid for listener in listeners]
+    return lambda: process_monitor.get_processes_info(pids)
+
+
+def stage_menu(listeners, workdir):
+    """Build the menu view-model and diff it against the previous refresh."""
+    processes = {
+        (listener.port, listener.pid): {
+            'port': listener.port,
+            'pid': listener.pid,
+            'name': listener.name,
+            'memory_mb': float(listener.pid % 500),
+            'cpu_percent': 0.0,
+            'uptime_formatted': '5m',
+        }
+        for listener in listeners
+    }
+    previous = [menu_model.build_process_nodes(processes)]
+
+    def run():
+        nodes = menu_model.build_process_nodes(processes)
+        menu_model.diff_menu(previous[0], nodes)
+        previous[0] = nodes
+
+    return run
+
+
+STAGES = {
+    "scan_lsof": stage_scan_lsof,
+    "scan_proc": stage_scan_proc,
+    "filter": stage_filter,
+    "enrich": stage_enrich,
+    "menu": stage_menu,
+}
+
+
+def measure(run, size: int, min_seconds: float = 0.5, max_runs: int = 200):
+    """
+    Time repeated runs of a stage.
+
+    Returns:
+        Dictionary with p50/p99 latency (ms) and throughput (listeners/s)
+    """
+    run()  # warm-up (caches, first CPU sample)
+
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < 5 or (
+        len(durations) < max_runs and time.perf_counter() - started < min_seconds
+    ):
+        begin = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - begin)
+
+    durations.sort()
+    p50 = statistics.median(durations)
+    p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+    return {
+        'runs': len(durations),
+        'p50_ms': round(p50 * 1000, 4),
+        'p99_ms': round(p99 * 1000, 4),
+        'throughput': round(size / p50) if p50 else 0,
+    }
+
+
+def run_suite(sizes, stages):
+    """Run every stage at every size and return results keyed by 'stage@size'."""
+    results = {}
+    saved_mode = config.FILTER_MODE
+    config.FILTER_MODE = "whitelist"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            for size in sizes:
+                listeners = fixtures.make_listeners(size)
+                with fixtures.fake_processes(listeners):
+                    for name in stages:
+                        process_monitor.clear_process_cache()
+                        run = STAGES[name](listeners, workdir)
+                        results[f"{name}@{size}"] = measure(run, size)
+        finally:
+            port_scanner.set_backend(None)
+            config.FILTER_MODE = saved_mode
+
+    return results
+
+
+def report(results, baseline, tolerance: float):
+    """
+    Print results, compared with the baseline when available.
+
+    Returns:
+        List of keys that regressed
+    """
+    regressions = []
+    print(f"{'stage@size':<20}{'runs':>6}{'p50 ms':>11}{'p99 ms':>11}{'items/s':>12}{'vs base':>10}")
+
+    for key, result in results.items():
+        comparison = ""
+        base = baseline.get(key)
+        if base and base['p50_ms']:
+            ratio = result['p50_ms'] / base['p50_ms']
+            comparison = f"{ratio:.2f}x"
+            if ratio > 1 + tolerance:
+                comparison += " !"
+                regressions.append(key)
+
+        print(f"{key:<20}{result['runs']:>6}{result['p50_ms']:>11.3f}"
+              f"{result['p99_ms']:>11.3f}{result['throughput']:>12}{comparison:>10}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated listener counts")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated stages")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="store results as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a stage regressed")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = run_suite(sizes, stages)
+
+    baseline = {}
+    if args.baseline.exists() and not args.save:
+        baseline = json.loads(args.baseline.read_text())
+
+    regressions = report(results, baseline, args.tolerance)
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
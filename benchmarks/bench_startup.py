@@ -0,0 +1,72 @@
+"""Benchmark cold start: import time and time to the first snapshot.
+
+Every measurement runs in a fresh interpreter (imports are cached inside
+a process), and the median of several runs is reported.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 15]
+"""
+
+import argparse
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Child program: time the given imports, optionally the first scan, print JSON
+CHILD = """
+import json, time
+started = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+first_snapshot = None
+if {scan}:
+    from src.scan_engine import ScanEngine
+    ScanEngine().scan_once()
+    first_snapshot = (time.perf_counter() - started) * 1000
+print(json.dumps({{"import_ms": (imported - started) * 1000, "snapshot_ms": first_snapshot}}))
+"""
+
+SCENARIOS = {
+    "import src.config": ("import src.config", False),
+    "import src.cli (entry point)": ("import src.cli", False),
+    "headless first snapshot": ("import src.cli", True),
+}
+
+if importlib.util.find_spec("rumps") is not None:
+    SCENARIOS["import src.main (menubar app)"] = ("import src.main", False)
+
+
+def run_child(imports: str, scan: bool) -> dict:
+    """Run one scenario in a new interpreter and return its timings."""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(imports=imports, scan=scan)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<32}{'import ms':>11}{'snapshot ms':>13}{'process ms':>12}")
+    for label, (imports, scan) in SCENARIOS.items():
+        runs = [run_child(imports, scan) for _ in range(args.runs)]
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        process_ms = statistics.median(r["process_ms"] for r in runs)
+        snapshot = f"{statistics.median(r['snapshot_ms'] for r in runs):.1f}" if scan else "-"
+        print(f"{label:<32}{import_ms:>11.1f}{snapshot:>13}{process_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
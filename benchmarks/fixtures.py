@@ -0,0 +1,183 @@
+"""Synthetic fixtures for the benchmark suite.
+
+Generates lsof output, a fake /proc tree and fake psutil processes for any
+number of listeners, so every pipeline stage can be measured without
+depending on what happens to be running on the machine.
+"""
+
+import contextlib
+import os
+import random
+from collections import namedtuple
+from typing import Dict, List
+from unittest import mock
+
+import psutil
+
+from src import port_set
+
+# Process names: mostly dev tools (kept by the whitelist), some system apps
+DEV_NAMES = ["node", "python3", "ruby", "java", "vite", "webpack", "gunicorn", "php-fpm"]
+OTHER_NAMES = ["Spotify", "ControlCe", "Slack", "rapportd", "postgres", "redis-ser"]
+
+# Listeners per fake process (workers share sockets, servers bind v4 and v6)
+SOCKETS_PER_PROCESS = 4
+
+FIRST_PID = 10000
+FIRST_INODE = 500000
+
+Listener = namedtuple("Listener", "port pid name inode ipv6")
+
+
+def make_listeners(count: int, seed: int = 1) -> List[Listener]:
+    """
+    Generate `count` listening sockets, about 10% outside the default PORTS (3000-9000).
+
+    Args:
+        count: Number of listening sockets
+        seed: Random seed (fixtures are deterministic)
+
+    Returns:
+        List of Listener tuples
+    """
+    rng = random.Random(seed)
+    listeners = []
+    names = {}
+    scanned = list(port_set.configured_ports())
+
+    for index in range(count):
+        pid = FIRST_PID + index // SOCKETS_PER_PROCESS
+        if pid not in names:
+            pool = DEV_NAMES if rng.random() < 0.8 else OTHER_NAMES
+            names[pid] = rng.choice(pool)
+
+        if rng.random() < 0.1:
+            port = rng.randint(9001, 65000)
+        else:
+            port = scanned[index % len(scanned)]
+
+        listeners.append(Listener(port, pid, names[pid], FIRST_INODE + index, index % 2 == 1))
+
+    return listeners
+
+
+def make_lsof_output(listeners: List[Listener]) -> str:
+    """
+    Render listeners as `lsof -F pcn` output (with macOS-style fd lines).
+
+    Args:
+        listeners: Listeners from make_listeners()
+
+    Returns:
+        lsof stdout
+    """
+    lines = []
+    current_pid = None
+    for listener in listeners:
+        if listener.pid != current_pid:
+            current_pid = listener.pid
+            lines.append(f"p{listener.pid}")
+            lines.append(f"c{listener.name}")
+        address = f"[::1]:{listener.port}" if listener.ipv6 else f"127.0.0.1:{listener.port}"
+        lines.append(f"f{listener.inode % 100}")
+        lines.append(f"n{address}")
+    return "\n".join(lines) + "\n"
+
+
+def make_proc_tree(root: str, listeners: List[Listener]):
+    """
+    Write a fake procfs tree (net/tcp, net/tcp6, <pid>/fd, <pid>/comm).
+
+    Args:
+        root: Empty directory to populate
+        listeners: Listeners from make_listeners()
+    """
+    header = ("  sl  local_address rem_address   st tx_queue rx_queue tr tm->when "
+              "retrnsmt   uid  timeout inode\n")
+    tables = {"tcp": [header], "tcp6": [header]}
+
+    for index, listener in enumerate(listeners):
+        if listener.ipv6:
+            table, address, remote = "tcp6", "0" * 31 + "1", "0" * 32
+        else:
+            table, address, remote = "tcp", "0100007F", "00000000"
+        tables[table].append(
+            f"{index:>4}: {address}:{listener.port:04X} {remote}:0000 0A "
+            f"00000000:00000000 00:00000000 00000000  1000        0 {listener.inode} 1\n"
+        )
+
+    os.makedirs(os.path.join(root, "net"))
+    for table, lines in tables.items():
+        with open(os.path.join(root, "net", table), "w") as f:
+            f.writelines(lines)
+
+    by_pid: Dict[int, List[Listener]] = {}
+    for listener in listeners:
+        by_pid.setdefault(listener.pid, []).append(listener)
+
+    for pid, owned in by_pid.items():
+        fd_dir = os.path.join(root, str(pid), "fd")
+        os.makedirs(fd_dir)
+        with open(os.path.join(root, str(pid), "comm"), "w") as f:
+            f.write(owned[0].name + "\n")
+
+        # A few non-socket fds, like a real process
+        for fd in range(3):
+            os.symlink("/dev/null", os.path.join(fd_dir, str(fd)))
+        for fd, listener in enumerate(owned, start=3):
+            os.symlink(f"socket:[{listener.inode}]", os.path.join(fd_dir, str(fd)))
+
+
+_MemoryInfo = namedtuple("pmem", "rss vms")
+_CpuTimes = namedtuple("pcputimes", "user system")
+
+
+class FakeProcess:
+    """Stand-in for psutil.Process backed by the fixture process table."""
+
+    table: Dict[int, Listener] = {}
+
+    def __init__(self, pid: int):
+        listener = self.table.get(pid)
+        if listener is None:
+            raise psutil.NoSuchProcess(pid)
+        self.pid = pid
+        self._name = listener.name
+        self._calls = 0
+
+    def is_running(self) -> bool:
+        return self.pid in self.table
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def create_time(self) -> float:
+        return 1_700_000_000.0 + self.pid
+
+    def name(self) -> str:
+        return self._name
+
+    def memory_info(self):
+        return _MemoryInfo(rss=(self.pid % 500 + 20) * 1024 * 1024, vms=0)
+
+    def cpu_times(self):
+        self._calls += 1
+        return _CpuTimes(user=self._calls * 0.01, system=0.0)
+
+    def as_dict(self, attrs, ad_value=None):
+        with self.oneshot():
+            return {attr: getattr(self, attr)() for attr in attrs}
+
+
+@contextlib.contextmanager
+def fake_processes(listeners: List[Listener]):
+    """
+    Replace psutil.Process with FakeProcess for the fixture's PIDs.
+
+    Args:
+        listeners: Listeners from make_listeners()
+    """
+    FakeProcess.table = {listener.pid: listener for listener in listeners}
+    with mock.patch.object(psutil, "Process", FakeProcess):
+        yield
+    FakeProcess.table = {}
@@ -47,6 +47,18 @@ OPTIONS = {
         'src.ui_helpers',
         'src.quick_actions',
         'src.updater',
+        'src.release_client',
+        'src.scan_engine',
+        'src.menu_model',
+        'src.scheduler',
+        'src.metrics_store',
+        'src.exporter',
+        'src.cli',
+        'src.history',
+        'src.instrumentation',
+        'src.port_set',
+        'src.prober',
+        'src.latency_histogram',
         'jaraco',
         'jaraco.text',
         'jaraco.functools',
@@ -0,0 +1,238 @@
+"""Command-line entry point: the menubar app, or a headless NDJSON monitor.
+
+`localhost-monitor` starts the menubar app as before. With `--headless`
+the same scan and enrich pipeline runs without importing rumps (so it
+works on Linux build boxes and in CI) and every snapshot is written as
+one JSON object per line:
+
+    localhost-monitor --headless --once
+    localhost-monitor --headless --watch --interval 5 --diff --output scans.ndjson
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, TextIO
+
+import src.config as config
+import src.instrumentation as instrumentation
+from src.port_scanner import PortSnapshot, scan_snapshot
+from src.process_monitor import get_processes_info
+from src.scan_engine import ScanEngine, Snapshot, stable_fields
+from src.scheduler import RefreshScheduler
+
+# Seconds between the CPU baseline reading and the scan --once reports
+CPU_BASELINE_SECONDS = 0.5
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="localhost-monitor",
+        description="Monitor localhost development servers."
+    )
+    parser.add_argument("--headless", action="store_true",
+                        help="run without the menubar and print NDJSON snapshots")
+
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true",
+                      help="scan once, print one snapshot and exit")
+    mode.add_argument("--watch", action="store_true",
+                      help="keep scanning until interrupted (default)")
+
+    parser.add_argument("--interval", type=float, metavar="SECONDS",
+                        help="fixed time between scans (default: adaptive, "
+                             f"{config.REFRESH_INTERVAL_MIN}-{config.REFRESH_INTERVAL_MAX} s)")
+    parser.add_argument("--count", type=int, metavar="N",
+                        help="stop after N scans")
+    parser.add_argument("--diff", action="store_true",
+                        help="after the first snapshot, only print what changed")
+    parser.add_argument("--output", "-o", metavar="FILE",
+                        help="append records to FILE instead of stdout")
+    parser.add_argument("--history", metavar="DB",
+                        help="also store samples in this SQLite history database")
+    return parser
+
+
+def _entry_key(entry) -> str:
+    """Identity of a listener across snapshots."""
+    return f"{entry['port']}:{entry['pid']}"
+
+
+def snapshot_record(snapshot: Snapshot) -> Dict[str, any]:
+    """
+    Convert a snapshot to a JSON-serializable record.
+
+    Args:
+        snapshot: Snapshot published by the scan engine
+
+    Returns:
+        Record with type "snapshot" and every listener
+    """
+    return {
+        'type': 'snapshot',
+        'generation': snapshot.generation,
+        'taken_at': round(snapshot.taken_at, 3),
+        'scan_ms': round(snapshot.scan_seconds * 1000, 2),
+        'error': snapshot.error,
+        'listeners': [dict(entry) for entry in snapshot.ports],
+    }
+
+
+def diff_record(previous: PortSnapshot, snapshot: Snapshot) -> Dict[str, any]:
+    """
+    Describe how a snapshot differs from the previous one.
+
+    Args:
+        previous: Listeners of the previously printed snapshot
+        snapshot: New snapshot
+
+    Returns:
+        Record with type "diff": added and changed listeners in full,
+        removed ones as {port, pid}
+    """
+    before = {_entry_key(entry): entry for entry in previous}
+    after = {_entry_key(entry): entry for entry in snapshot.ports}
+
+    added: List[Dict] = []
+    changed: List[Dict] = []
+    for key, entry in after.items():
+        old = before.get(key)
+        if old is None:
+            added.append(dict(entry))
+        elif stable_fields(old) != stable_fields(entry):
+            changed.append(dict(entry))
+
+    removed = [
+        {'port': entry['port'], 'pid': entry['pid']}
+        for key, entry in before.items()
+        if key not in after
+    ]
+
+    return {
+        'type': 'diff',
+        'generation': snapshot.generation,
+        'taken_at': round(snapshot.taken_at, 3),
+        'scan_ms': round(snapshot.scan_seconds * 1000, 2),
+        'error': snapshot.error,
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+    }
+
+
+def _write(stream: TextIO, record: Dict[str, any]):
+    """Write one NDJSON line and flush it so readers see it immediately."""
+    stream.write(json.dumps(record, separators=(',', ':')) + "\n")
+    stream.flush()
+
+
+def prime_cpu_baseline(seconds: float = CPU_BASELINE_SECONDS):
+    """
+    Read the CPU times of every listener, then wait.
+
+    CPU usage is the change between two readings, so a single scan would
+    otherwise report 0.0 for every process.
+
+    Args:
+        seconds: How long to wait before the measured scan
+    """
+    get_processes_info(scan_snapshot().pids)
+    time.sleep(seconds)
+
+
+def run_headless(args: argparse.Namespace, stream: TextIO) -> int:
+    """
+    Scan in a loop and write NDJSON records.
+
+    Args:
+        args: Parsed command-line arguments
+        stream: Where records are written
+
+    Returns:
+        Exit code (1 if the last scan failed)
+    """
+    if args.interval is not None:
+        scheduler = RefreshScheduler(args.interval, args.interval)
+    else:
+        scheduler = RefreshScheduler()
+
+    # Scans run on this thread; the engine only tracks generations and changes
+    engine = ScanEngine(scheduler=scheduler)
+    if config.PROFILE_MODE:
+        instrumentation.start_profiling()
+    previous: Optional[PortSnapshot] = None
+
+    store = None
+    if args.history:
+        from src.history import HistoryStore  # sqlite3 only when asked for
+        store = HistoryStore(args.history)
+        engine.subscribe(store.record)
+
+    if args.once:
+        prime_cpu_baseline()
+
+    try:
+        while True:
+            snapshot = engine.scan_once()
+            scheduler.record(snapshot.changed)
+
+            if previous is None or not args.diff:
+                _write(stream, snapshot_record(snapshot))
+            elif snapshot.changed:
+                _write(stream, diff_record(previous, snapshot))
+            previous = snapshot.ports
+
+            if args.once or (args.count is not None and snapshot.generation >= args.count):
+                return 1 if snapshot.error else 0
+
+            scheduler.wait()
+    finally:
+        instrumentation.stop_profiling()
+        if store is not None:
+            store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Console entry point.
+
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not args.headless:
+        if (args.once or args.watch or args.diff or args.output or args.history
+                or args.count is not None):
+            parser.error("--once, --watch, --count, --diff, --output and --history need --headless")
+
+        # Only the menubar app needs rumps (macOS)
+        from src.main import main as run_app
+        run_app()
+        return 0
+
+    if args.interval is not None and args.interval <= 0:
+        parser.error("--interval must be positive")
+
+    try:
+        if args.output:
+            with open(args.output, "a", encoding="utf-8") as stream:
+                return run_headless(args, stream)
+        return run_headless(args, sys.stdout)
+    except KeyboardInterrupt:
+        return 0
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head): silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,12 +17,17 @@ WEBSITE_URL = "https://dalfidan.dev"
 
 # App icon (menubar)
 # For bundled app, icon is in Resources/assets/icons/
+# APP_ICON is resolved on first access (see __getattr__ below), so
+# importing config does not touch the filesystem
+import functools
 import os
 import sys
-from pathlib import Path
 
+@functools.lru_cache(maxsize=None)
 def _get_icon_path():
     """Get menubar icon path (works in both dev and bundled app)."""
+    from pathlib import Path
+
     # Try multiple possible locations
     possible_paths = []
 
@@ -57,27 +62,69 @@ def _get_icon_path():
 
     return None
 
-APP_ICON = _get_icon_path()
+def __getattr__(name):
+    """Resolve lazy settings (APP_ICON) on first access."""
+    if name == "APP_ICON":
+        return _get_icon_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ═══════════════════════════════════════════════════════════
 # Core Settings
 # ═══════════════════════════════════════════════════════════
 
-# Port range for scanning (development servers)
-PORT_RANGE_START = 3000
-PORT_RANGE_END = 9000
+# Ports to scan (development servers): single ports and inclusive ranges,
+# e.g. "3000-3999, 5173, 5432, 8000-8999, 9229"
+PORTS = "3000-9000"
+
+# Port scanner backend: "auto", "netlink" (Linux sock_diag), "proc" (Linux /proc/net) or "lsof"
+# "auto" prefers /proc/net on Linux and falls back to lsof elsewhere; netlink is opt-in
+SCANNER_BACKEND = "auto"
+
+# Protocols to scan in the same pass: TCP listeners and bound (unconnected)
+# UDP sockets, both IPv4 and IPv6
+SCAN_PROTOCOLS = ("tcp", "udp")
+
+# Refresh interval in seconds (scans run on a background thread)
+# The interval starts at REFRESH_INTERVAL_MIN and is multiplied by
+# REFRESH_BACKOFF after every scan that finds nothing new, up to
+# REFRESH_INTERVAL_MAX. Any change, kill or menu open resets it.
+REFRESH_INTERVAL_MIN = 2
+REFRESH_INTERVAL_MAX = 30
+REFRESH_BACKOFF = 2.0
+
+# A scan only counts as "something new" for the backoff when a listener
+# appears, goes away or changes, or when its CPU/RAM moves to another step
+# of this size; jitter within a step is ignored
+CHANGE_CPU_STEP = 5.0  # percentage points
+CHANGE_MEMORY_STEP_MB = 8.0
 
-# Refresh interval in seconds
-REFRESH_INTERVAL = 3
+# How often the menubar checks for a new scan snapshot (seconds)
+UI_POLL_INTERVAL = 0.25
+
+# Print scan vs render duration for every refresh (debugging)
+LOG_TIMINGS = False
 
 # Display settings
 SHOW_PID = True
+SHOW_SOCKETS = True  # e.g. "Listening: TCP 127.0.0.1, [::1] · UDP 0.0.0.0"
 SHOW_RAM = True
 SHOW_CPU = True
 SHOW_UPTIME = True
+SHOW_TRENDS = True  # e.g. "RAM: 245.6 MB (+1.2 MB/min)"
+SHOW_LATENCY = True  # e.g. "Latency: connect 0.3 ms · first byte 12.4 ms" (needs ENABLE_PROBING)
+
+# Process cache: psutil objects kept between refreshes
+PROCESS_CACHE_MAX_SIZE = 256  # entries, least recently used evicted first
+PROCESS_CACHE_TTL = 300  # seconds an unused entry is kept
+
+# Metric history: CPU/RAM samples per process in fixed-size ring buffers
+# (uses NumPy for window queries if installed)
+METRICS_HISTORY_SIZE = 360  # samples kept per process, oldest overwritten
+METRICS_TREND_WINDOW = 300  # seconds of history behind the trends shown in the menu
 
 # Kill signal settings
 KILL_TIMEOUT = 5  # seconds to wait before force kill
+KILL_PROCESS_TREE = False  # also kill child processes (npm/yarn wrappers, gunicorn workers)
 
 # Process filtering settings
 FILTER_MODE = "whitelist"  # "whitelist", "blacklist", or "off"
@@ -138,9 +185,6 @@ SYSTEM_PROCESS_BLACKLIST = [
     "teams",
 ]
 
-# CPU measurement settings
-CPU_MEASUREMENT_INTERVAL = 0.5  # seconds to measure CPU usage
-
 # ═══════════════════════════════════════════════════════════
 # Quick Actions (Phase 2 Features)
 # ═══════════════════════════════════════════════════════════
@@ -161,6 +205,78 @@ SECTION_STYLE = "equals"  # "equals" (═══) or "dashes" (─────) o
 # Show section headers in menu
 SHOW_SECTIONS = True
 
+# ═══════════════════════════════════════════════════════════
+# Health Probes
+# ═══════════════════════════════════════════════════════════
+
+# Connect to every TCP listener after each scan (concurrently, on asyncio)
+# and report connect and first-byte latency next to CPU and RAM
+ENABLE_PROBING = False
+
+# Send "HEAD /" after connecting and time the first byte of the reply
+# (False: TCP connect only)
+PROBE_HTTP = True
+
+PROBE_CONCURRENCY = 16  # probes in flight at once
+PROBE_CONNECT_TIMEOUT = 1.0  # seconds per connection
+PROBE_RESPONSE_TIMEOUT = 2.0  # seconds per first byte
+
+# Seconds before the same listener is probed again (dev servers usually
+# log every request, so don't probe on every scan)
+PROBE_INTERVAL = 10
+
+# Probe latencies are kept per listener in constant-memory histograms over
+# the last LATENCY_WINDOWS windows of LATENCY_WINDOW_SECONDS (5 minutes),
+# for p50/p90/p99 in the menu and snapshots
+LATENCY_WINDOW_SECONDS = 60
+LATENCY_WINDOWS = 5
+
+# ═══════════════════════════════════════════════════════════
+# Metrics Exporter
+# ═══════════════════════════════════════════════════════════
+
+# Serve Prometheus metrics (per-port CPU, RAM, uptime) at
+# http://127.0.0.1:9464/metrics, rendered from the latest scan
+# (scrapes never trigger a scan themselves)
+ENABLE_METRICS_EXPORTER = False
+METRICS_EXPORTER_HOST = "127.0.0.1"  # keep on localhost
+METRICS_EXPORTER_PORT = 9464
+
+# ═══════════════════════════════════════════════════════════
+# History
+# ═══════════════════════════════════════════════════════════
+
+# Keep CPU/RAM samples of every listening process in a local SQLite
+# database, rolled up into 1-minute and 1-hour aggregates over time
+ENABLE_HISTORY = False
+HISTORY_DB_PATH = os.path.expanduser(
+    "~/Library/Application Support/Localhost Monitor/history.db"
+)
+HISTORY_BATCH_CYCLES = 10  # scans buffered per database write
+HISTORY_ROLLUP_INTERVAL = 600  # seconds between rollup/retention runs
+HISTORY_RAW_RETENTION = 24 * 3600  # raw samples: 1 day
+HISTORY_MINUTE_RETENTION = 14 * 24 * 3600  # 1-minute aggregates: 2 weeks
+HISTORY_HOUR_RETENTION = 365 * 24 * 3600  # 1-hour aggregates: 1 year
+
+# ═══════════════════════════════════════════════════════════
+# Instrumentation (debugging)
+# ═══════════════════════════════════════════════════════════
+
+# Time each pipeline stage (scan, filter, process info, menu build) into
+# per-stage histograms; see instrumentation.get_stats()
+ENABLE_INSTRUMENTATION = True
+
+# Show a "Performance Stats" item (stage timings) in the ABOUT section
+SHOW_DEBUG_MENU = False
+
+# Profile the first PROFILE_CYCLES scan cycles at launch and write the
+# result to PROFILE_OUTPUT_DIR: None (off), "cprofile" (.prof file) or
+# "sample" (stack samples every PROFILE_SAMPLE_INTERVAL s, .folded file)
+PROFILE_MODE = None
+PROFILE_CYCLES = 10
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_OUTPUT_DIR = os.path.expanduser("~/Library/Logs/Localhost Monitor")
+
 # ═══════════════════════════════════════════════════════════
 # Auto-Update Settings (v0.3.0)
 # ═══════════════════════════════════════════════════════════
@@ -175,3 +291,15 @@ AUTO_UPDATE_CHECK_INTERVAL = 86400
 # Delay before checking for updates on startup (in seconds)
 # This allows the app to fully initialize before checking
 UPDATE_CHECK_ON_STARTUP_DELAY = 5
+
+# Latest-release endpoint (GitHub API)
+UPDATE_CHECK_URL = "https://api.github.com/repos/elberdalfidan/localhost-monitor/releases/latest"
+
+# Timeout for one update request (in seconds); the request runs off the UI thread
+UPDATE_CHECK_TIMEOUT = 10
+
+# Last check time, ETag and release info, so restarts don't re-check inside
+# the interval and unchanged releases come back as "304 Not Modified"
+UPDATE_STATE_PATH = os.path.expanduser(
+    "~/Library/Application Support/Localhost Monitor/update_state.json"
+)
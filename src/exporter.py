@@ -0,0 +1,200 @@
+"""Prometheus /metrics endpoint served from the latest scan snapshot.
+
+The exporter never scans: every scrape renders the snapshot the scan
+engine last published, and the rendered text is cached per snapshot
+generation, so scrapes between two scans are a lock and a socket write.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+import src.config as config
+from src.scan_engine import Snapshot
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Per-process metrics: (name, help, snapshot field, scale to base unit)
+_PROCESS_METRICS = (
+    ("localhost_monitor_process_cpu_percent",
+     "CPU usage of the listening process since the previous scan, in percent.",
+     'cpu_percent', 1),
+    ("localhost_monitor_process_resident_memory_bytes",
+     "Resident memory of the listening process in bytes.",
+     'memory_mb', 1024 * 1024),
+    ("localhost_monitor_process_uptime_seconds",
+     "Time since the listening process started, in seconds.",
+     'uptime_seconds', 1),
+    ("localhost_monitor_probe_connect_seconds",
+     "Time the latest health probe took to connect, in seconds.",
+     'connect_ms', 0.001),
+    ("localhost_monitor_probe_first_byte_seconds",
+     "Time from the latest probe's HEAD request to the first byte of the reply, in seconds.",
+     'first_byte_ms', 0.001),
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value (integers without a trailing .0)."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def render_metrics(snapshot: Snapshot) -> str:
+    """
+    Render a snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot: Snapshot published by the scan engine
+
+    Returns:
+        Exposition text (one sample per listening port and process)
+    """
+    lines: List[str] = []
+
+    def gauge(name: str, help_text: str, samples: List[Tuple[str, float]]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {_format_value(value)}")
+
+    entries = [
+        (f'{{port="{entry["port"]}",pid="{entry["pid"]}",'
+         f'name="{_escape(str(entry.get("name", "")))}"}}', entry)
+        for entry in snapshot.ports
+    ]
+
+    gauge("localhost_monitor_listeners",
+          "Number of listening (port, process) pairs in the latest scan.",
+          [("", len(snapshot.ports))])
+
+    for name, help_text, field, scale in _PROCESS_METRICS:
+        gauge(name, help_text, [
+            (labels, round(entry[field] * scale, 6))
+            for labels, entry in entries
+            if entry.get(field) is not None
+        ])
+
+    gauge("localhost_monitor_scan_duration_seconds",
+          "Time the latest scan took, in seconds.",
+          [("", round(snapshot.scan_seconds, 6))])
+    gauge("localhost_monitor_last_scan_timestamp_seconds",
+          "Unix time the latest scan finished.",
+          [("", round(snapshot.taken_at, 3))])
+    gauge("localhost_monitor_scan_generation",
+          "Number of scans published since the app started.",
+          [("", snapshot.generation)])
+    gauge("localhost_monitor_scan_error",
+          "1 if the latest scan failed, 0 otherwise.",
+          [("", 1 if snapshot.error else 0)])
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the exporter's cache."""
+
+    server_version = "LocalhostMonitorExporter"
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404, "Try /metrics")
+            return
+
+        body = self.server.exporter.render()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep scrapes out of the app's output."""
+
+
+class MetricsExporter:
+    """
+    Localhost HTTP server exposing the latest snapshot as Prometheus metrics.
+
+    Runs on its own daemon thread (plus one short-lived thread per
+    request) and only ever reads snapshots, so a scrape never starts a
+    scan or touches the menubar.
+    """
+
+    def __init__(self, latest: Callable[[], Snapshot],
+                 host: str = config.METRICS_EXPORTER_HOST,
+                 port: int = config.METRICS_EXPORTER_PORT):
+        """
+        Initialize the exporter.
+
+        Args:
+            latest: Returns the current snapshot (e.g. ScanEngine.latest)
+            host: Address to bind (keep it on localhost)
+            port: TCP port to listen on (0 picks a free port)
+        """
+        self.latest = latest
+        self.host = host
+        self.port = port
+
+        self._lock = threading.Lock()
+        self._cached: Tuple[int, bytes] = (-1, b"")
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """(host, port) the server is bound to, or None if not running."""
+        return self._server.server_address[:2] if self._server else None
+
+    def render(self) -> bytes:
+        """
+        Return the exposition text for the latest snapshot.
+
+        Rendering happens at most once per snapshot generation.
+        """
+        snapshot = self.latest()
+        with self._lock:
+            generation, body = self._cached
+            if generation != snapshot.generation:
+                body = render_metrics(snapshot).encode("utf-8")
+                self._cached = (snapshot.generation, body)
+            return body
+
+    def start(self):
+        """
+        Bind the server and start serving on a background thread.
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        if self._server is not None:
+            return
+
+        server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        server.daemon_threads = True
+        server.exporter = self
+        self._server = server
+
+        self._thread = threading.Thread(
+            target=server.serve_forever,
+            name="metrics-exporter",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and release the port."""
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
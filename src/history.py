@@ -0,0 +1,338 @@
+"""Persistent process history in SQLite.
+
+Subscribed to the scan engine, the store buffers one row per listener and
+writes them in a single transaction every few scan cycles. The database
+runs in WAL mode with synchronous=NORMAL, so a batch is an append to the
+write-ahead log instead of an fsync per tick. A periodic rollup folds raw
+samples into 1-minute and 1-hour aggregates and deletes data past its
+retention, so the file stays small while long ranges remain queryable.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import src.config as config
+from src.scan_engine import Snapshot
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    port INTEGER NOT NULL,
+    pid INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    cpu_percent REAL,
+    memory_mb REAL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE INDEX IF NOT EXISTS samples_port_ts ON samples (port, ts);
+CREATE INDEX IF NOT EXISTS samples_name_ts ON samples (name, ts);
+
+-- Raw samples with the same columns as the rollup tables
+CREATE VIEW IF NOT EXISTS samples_raw AS
+SELECT ts AS bucket, port, pid, name, 1 AS samples,
+       cpu_percent AS cpu_avg, cpu_percent AS cpu_max,
+       memory_mb AS memory_avg, memory_mb AS memory_max
+FROM samples;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    bucket INTEGER NOT NULL,  -- bucket start (Unix time)
+    port INTEGER NOT NULL,
+    pid INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    cpu_avg REAL,
+    cpu_max REAL,
+    memory_avg REAL,
+    memory_max REAL,
+    PRIMARY KEY (bucket, port, pid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS {table}_port ON {table} (port, bucket);
+CREATE INDEX IF NOT EXISTS {table}_name ON {table} (name, bucket);
+"""
+
+# Merge a re-aggregated bucket into an existing row (weighted averages)
+_MERGE = """
+ON CONFLICT (bucket, port, pid) DO UPDATE SET
+    cpu_avg = (cpu_avg * samples + excluded.cpu_avg * excluded.samples)
+              / (samples + excluded.samples),
+    memory_avg = (memory_avg * samples + excluded.memory_avg * excluded.samples)
+                 / (samples + excluded.samples),
+    cpu_max = MAX(cpu_max, excluded.cpu_max),
+    memory_max = MAX(memory_max, excluded.memory_max),
+    samples = samples + excluded.samples
+"""
+
+_ROLLUP_MINUTES = """
+INSERT INTO samples_1m
+    (bucket, port, pid, name, samples, cpu_avg, cpu_max, memory_avg, memory_max)
+SELECT CAST(ts / 60 AS INTEGER) * 60, port, pid, MAX(name), COUNT(*),
+       AVG(cpu_percent), MAX(cpu_percent), AVG(memory_mb), MAX(memory_mb)
+FROM samples
+WHERE ts >= ? AND ts < ?
+GROUP BY 1, port, pid
+""" + _MERGE
+
+_ROLLUP_HOURS = """
+INSERT INTO samples_1h
+    (bucket, port, pid, name, samples, cpu_avg, cpu_max, memory_avg, memory_max)
+SELECT bucket / 3600 * 3600, port, pid, MAX(name), SUM(samples),
+       SUM(cpu_avg * samples) / SUM(samples), MAX(cpu_max),
+       SUM(memory_avg * samples) / SUM(samples), MAX(memory_max)
+FROM samples_1m
+WHERE bucket >= ? AND bucket < ?
+GROUP BY 1, port, pid
+""" + _MERGE
+
+# Queryable resolutions: name -> table (or view)
+RESOLUTIONS = {
+    'raw': 'samples_raw',
+    '1m': 'samples_1m',
+    '1h': 'samples_1h',
+}
+
+# Ranking metrics: name -> (peak column, average column)
+_METRIC_COLUMNS = {
+    'memory': ('memory_max', 'memory_avg'),
+    'cpu': ('cpu_max', 'cpu_avg'),
+}
+
+_COLUMNS = "bucket, port, pid, name, samples, cpu_avg, cpu_max, memory_avg, memory_max"
+
+
+class HistoryStore:
+    """
+    SQLite-backed history of listener samples.
+
+    Use record() as a ScanEngine listener. All methods are thread-safe;
+    reads see rows that have been flushed (call flush() for the latest).
+    """
+
+    def __init__(self, path: str = config.HISTORY_DB_PATH,
+                 batch_cycles: int = config.HISTORY_BATCH_CYCLES,
+                 rollup_interval: float = config.HISTORY_ROLLUP_INTERVAL,
+                 raw_retention: float = config.HISTORY_RAW_RETENTION,
+                 minute_retention: float = config.HISTORY_MINUTE_RETENTION,
+                 hour_retention: float = config.HISTORY_HOUR_RETENTION):
+        """
+        Open (or create) the history database.
+
+        Args:
+            path: Database file (":memory:" for a throwaway store)
+            batch_cycles: Scan cycles buffered before rows are written
+            rollup_interval: Seconds between automatic rollup/retention runs
+            raw_retention: Seconds raw samples are kept
+            minute_retention: Seconds 1-minute aggregates are kept
+            hour_retention: Seconds 1-hour aggregates are kept
+        """
+        self.path = path
+        self.batch_cycles = max(1, batch_cycles)
+        self.rollup_interval = rollup_interval
+        self.raw_retention = raw_retention
+        self.minute_retention = minute_retention
+        self.hour_retention = hour_retention
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: List[Tuple] = []
+        self._cycles = 0
+        self._last_rollup = time.monotonic()
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            _SCHEMA
+            + _ROLLUP_SCHEMA.format(table="samples_1m")
+            + _ROLLUP_SCHEMA.format(table="samples_1h")
+        )
+
+    def record(self, snapshot: Snapshot):
+        """
+        Buffer one snapshot's listeners; write and roll up when due.
+
+        Args:
+            snapshot: Snapshot published by the scan engine
+        """
+        if snapshot.error:
+            return
+
+        rows = [
+            (snapshot.taken_at, entry['port'], entry['pid'], entry.get('name', ''),
+             entry.get('cpu_percent'), entry.get('memory_mb'))
+            for entry in snapshot.ports
+        ]
+
+        with self._lock:
+            self._pending.extend(rows)
+            self._cycles += 1
+            if self._cycles < self.batch_cycles:
+                return
+            self._write_pending()
+
+            if time.monotonic() - self._last_rollup < self.rollup_interval:
+                return
+            self._last_rollup = time.monotonic()
+
+        self.rollup()
+
+    def flush(self):
+        """Write buffered rows now."""
+        with self._lock:
+            self._write_pending()
+
+    def rollup(self, now: Optional[float] = None):
+        """
+        Aggregate finished minutes and hours, then apply retention.
+
+        Each raw sample is folded into its 1-minute bucket once the minute
+        is over, and 1-minute buckets into hours likewise, so aggregates
+        exist for recent data too. Watermarks make repeated runs cheap.
+
+        Args:
+            now: Current Unix time (default: time.time())
+        """
+        if now is None:
+            now = time.time()
+
+        minute_end = int(now // 60 * 60)
+        hour_end = int(now // 3600 * 3600)
+
+        with self._lock:
+            self._write_pending()
+            with self._db:
+                minute_start = self._get_meta('rolled_1m')
+                if minute_end > minute_start:
+                    self._db.execute(_ROLLUP_MINUTES, (minute_start, minute_end))
+                    self._set_meta('rolled_1m', minute_end)
+
+                hour_start = self._get_meta('rolled_1h')
+                if hour_end > hour_start:
+                    self._db.execute(_ROLLUP_HOURS, (hour_start, hour_end))
+                    self._set_meta('rolled_1h', hour_end)
+
+                # Raw samples are only dropped once rolled up
+                raw_cutoff = min(now - self.raw_retention, minute_end)
+                self._db.execute("DELETE FROM samples WHERE ts < ?", (raw_cutoff,))
+                self._db.execute("DELETE FROM samples_1m WHERE bucket < ?",
+                                 (min(now - self.minute_retention, hour_end),))
+                self._db.execute("DELETE FROM samples_1h WHERE bucket < ?",
+                                 (now - self.hour_retention,))
+
+    def query(self, port: Optional[int] = None, name: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              resolution: str = 'raw') -> List[Dict[str, any]]:
+        """
+        Fetch samples or aggregates, oldest first.
+
+        Args:
+            port: Only this port
+            name: Only processes with this exact name
+            since: Start of the range (Unix time, inclusive)
+            until: End of the range (Unix time, exclusive)
+            resolution: 'raw', '1m' or '1h'
+
+        Returns:
+            Dictionaries with bucket, port, pid, name, samples,
+            cpu_avg, cpu_max, memory_avg and memory_max
+        """
+        table = RESOLUTIONS[resolution]
+        where, params = self._range_filter(port, name, since, until)
+        sql = f"SELECT {_COLUMNS} FROM {table} {where} ORDER BY bucket"
+
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def top_processes(self, metric: str = 'memory', since: Optional[float] = None,
+                      until: Optional[float] = None, resolution: str = '1m',
+                      limit: int = 10) -> List[Dict[str, any]]:
+        """
+        Rank process names by their peak usage over a time range.
+
+        Example: top_processes('memory', since=time.time() - 7 * 86400)
+        answers "which dev server used the most memory this week?".
+
+        Args:
+            metric: 'memory' (MB) or 'cpu' (percent)
+            since: Start of the range (Unix time, inclusive)
+            until: End of the range (Unix time, exclusive)
+            resolution: 'raw', '1m' or '1h' (must cover the range)
+            limit: Maximum number of processes
+
+        Returns:
+            Dictionaries with name, peak, average and samples, highest peak first
+        """
+        peak, average = _METRIC_COLUMNS[metric]
+        table = RESOLUTIONS[resolution]
+        where, params = self._range_filter(None, None, since, until)
+        sql = (
+            f"SELECT name, MAX({peak}) AS peak, "
+            f"SUM({average} * samples) / SUM(samples) AS average, "
+            f"SUM(samples) AS samples "
+            f"FROM {table} {where} GROUP BY name ORDER BY peak DESC LIMIT ?"
+        )
+
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params + [limit])]
+
+    def close(self):
+        """Write buffered rows and close the database."""
+        with self._lock:
+            self._write_pending()
+            self._db.close()
+
+    def _write_pending(self):
+        """Insert buffered rows in one transaction (lock held)."""
+        self._cycles = 0
+        if not self._pending:
+            return
+
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO samples (ts, port, pid, name, cpu_percent, memory_mb) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending
+            )
+        self._pending = []
+
+    def _get_meta(self, key: str) -> float:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_meta(self, key: str, value: float):
+        self._db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    @staticmethod
+    def _range_filter(port: Optional[int], name: Optional[str], since: Optional[float],
+                      until: Optional[float]) -> Tuple[str, List]:
+        """Build the WHERE clause shared by the queries."""
+        clauses, params = [], []
+        if port is not None:
+            clauses.append("port = ?")
+            params.append(port)
+        if name is not None:
+            clauses.append("name = ?")
+            params.append(name)
+        if since is not None:
+            clauses.append("bucket >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("bucket < ?")
+            params.append(until)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
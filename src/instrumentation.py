@@ -0,0 +1,369 @@
+"""Timing spans for the hot path, and opt-in profiling of scan cycles.
+
+Stages of the refresh pipeline (scan_ports, filter_processes,
+get_processes_info, probe_ports, build_menu and the whole scan_cycle) are
+wrapped in span() and feed one histogram per stage:
+
+    with instrumentation.span("scan_ports"):
+        records = backend.scan(ports)
+
+get_stats() returns count, mean, max and percentiles per stage (also shown
+by the debug menu item, see SHOW_DEBUG_MENU). A span costs two
+perf_counter() calls and one bucket increment, so it stays on by default.
+
+For a closer look, start_profiling() records the next N scan cycles with
+cProfile (a .prof file for pstats/snakeviz) or with a stack sampler
+(a .folded file for flame graph tools); PROFILE_MODE starts it at launch.
+"""
+
+import bisect
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import src.config as config
+
+# Bucket upper bounds in milliseconds: 0.05 ms doubling up to about 13 s
+BUCKET_BOUNDS_MS = tuple(0.05 * 2 ** i for i in range(19))
+
+PERCENTILES = (50, 90, 99)
+
+PROFILE_MODES = ("cprofile", "sample")
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class StageHistogram:
+    """Durations of one stage in fixed log-spaced buckets."""
+
+    __slots__ = ('_lock', 'counts', 'count', 'total_ms', 'min_ms', 'max_ms')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)  # last bucket: overflow
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+
+    def observe(self, milliseconds: float):
+        """Add one duration."""
+        index = bisect.bisect_left(BUCKET_BOUNDS_MS, milliseconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += milliseconds
+            if milliseconds < self.min_ms:
+                self.min_ms = milliseconds
+            if milliseconds > self.max_ms:
+                self.max_ms = milliseconds
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimate a percentile from the buckets.
+
+        Args:
+            percent: Percentile (0-100)
+
+        Returns:
+            Upper bound of the bucket holding that rank (capped at the
+            maximum seen), in milliseconds; 0.0 if empty
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, -(-self.count * percent // 100))  # ceil
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank:
+                    break
+            if index >= len(BUCKET_BOUNDS_MS):
+                return self.max_ms
+            return min(BUCKET_BOUNDS_MS[index], self.max_ms)
+
+    def summary(self) -> Dict[str, float]:
+        """Return count, total, mean, min, max and PERCENTILES (ms)."""
+        with self._lock:
+            count, total_ms = self.count, self.total_ms
+            min_ms, max_ms = self.min_ms, self.max_ms
+
+        summary = {
+            'count': count,
+            'total_ms': total_ms,
+            'mean_ms': total_ms / count if count else 0.0,
+            'min_ms': min_ms if count else 0.0,
+            'max_ms': max_ms,
+        }
+        for percent in PERCENTILES:
+            summary[f'p{percent}_ms'] = self.percentile(percent)
+        return summary
+
+
+class _Span:
+    """Context manager timing one stage (a class is cheaper than @contextmanager)."""
+
+    __slots__ = ('_histogram', '_started')
+
+    def __init__(self, histogram: StageHistogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe((time.perf_counter() - self._started) * 1000)
+        return False
+
+
+_histograms: Dict[str, StageHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _histogram(stage: str) -> StageHistogram:
+    """Return the histogram of a stage, creating it on first use."""
+    histogram = _histograms.get(stage)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(stage, StageHistogram())
+    return histogram
+
+
+def span(stage: str):
+    """
+    Time a block of code as one observation of `stage`.
+
+    Args:
+        stage: Stage name (e.g. "scan_ports")
+
+    Returns:
+        Context manager (a no-op if ENABLE_INSTRUMENTATION is off)
+    """
+    if not config.ENABLE_INSTRUMENTATION:
+        return _NULL_SPAN
+    return _Span(_histogram(stage))
+
+
+def record(stage: str, seconds: float):
+    """
+    Add a duration measured elsewhere (e.g. an existing timer).
+
+    Args:
+        stage: Stage name
+        seconds: Duration in seconds
+    """
+    if config.ENABLE_INSTRUMENTATION:
+        _histogram(stage).observe(seconds * 1000)
+
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Return timing statistics per stage.
+
+    Returns:
+        Dict of stage -> count, total_ms, mean_ms, min_ms, max_ms,
+        p50_ms, p90_ms and p99_ms
+        Example: {'scan_ports': {'count': 12, 'mean_ms': 3.1, ...}}
+    """
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {stage: histograms[stage].summary() for stage in sorted(histograms)}
+
+
+def reset_stats():
+    """Forget all recorded timings."""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def format_stats(stats: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """
+    Format statistics as a small text table (one line per stage).
+
+    Args:
+        stats: Result of get_stats() (default: current statistics)
+
+    Returns:
+        Table text, or a hint if nothing was recorded yet
+    """
+    if stats is None:
+        stats = get_stats()
+    if not stats:
+        return "No timings recorded yet."
+
+    lines = [f"{'stage':<18}{'count':>7}{'mean':>9}{'p50':>9}{'p99':>9}{'max':>9}  (ms)"]
+    for stage, summary in stats.items():
+        lines.append(
+            f"{stage:<18}{summary['count']:>7}{summary['mean_ms']:>9.2f}"
+            f"{summary['p50_ms']:>9.2f}{summary['p99_ms']:>9.2f}{summary['max_ms']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+# ═══ Profiling ═══
+
+class _ProfileSession:
+    """Profiles the scan cycles run between begin_cycle() and end_cycle()."""
+
+    def __init__(self, mode: str, cycles: int, path: str, sample_interval: float):
+        self.mode = mode
+        self.cycles_left = cycles
+        self.path = path
+        self.sample_interval = sample_interval
+
+        self._profiler = None
+        self._stacks: Counter = Counter()
+        self._sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+        if mode == "cprofile":
+            import cProfile  # only when profiling
+            self._profiler = cProfile.Profile()
+
+    def begin_cycle(self):
+        if self._profiler is not None:
+            self._profiler.enable()
+        else:
+            self._sampling.set()
+            self._sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(),),
+                name="profile-sampler",
+                daemon=True
+            )
+            self._sampler.start()
+
+    def end_cycle(self) -> bool:
+        """Stop recording this cycle; returns True when the session is complete."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        else:
+            self._sampling.clear()
+            self._sampler.join()
+        self.cycles_left -= 1
+        return self.cycles_left <= 0
+
+    def stop(self):
+        """Stop a cycle still being recorded (e.g. when written early on quit)."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        else:
+            self._sampling.clear()
+            sampler = self._sampler
+            if sampler is not None and sampler.is_alive():
+                sampler.join()
+
+    def write(self):
+        """Write the profile to self.path."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if self._profiler is not None:
+            self._profiler.dump_stats(self.path)
+            return
+
+        # Folded stacks ("outer;inner count"), most frequent first
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _sample(self, thread_id: int):
+        """Record the scanning thread's stack every sample_interval (sampler thread)."""
+        while self._sampling.is_set():
+            frame = sys._current_frames().get(thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+
+
+_session: Optional[_ProfileSession] = None
+_session_lock = threading.Lock()
+
+
+def start_profiling(mode: Optional[str] = None, cycles: Optional[int] = None,
+                    path: Optional[str] = None) -> str:
+    """
+    Profile the next scan cycles and write the result to a file.
+
+    Only the scanning thread is profiled (ScanEngine.scan_once wraps each
+    cycle in profile_cycle()); the file is written after the last cycle.
+
+    Args:
+        mode: "cprofile" or "sample" (default: PROFILE_MODE)
+        cycles: Number of scan cycles (default: PROFILE_CYCLES)
+        path: Output file (default: a timestamped file in PROFILE_OUTPUT_DIR)
+
+    Returns:
+        Path the profile will be written to
+
+    Raises:
+        ValueError: If the mode is unknown or a session is already running
+    """
+    global _session
+
+    mode = mode or config.PROFILE_MODE
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r} (use {' or '.join(PROFILE_MODES)})")
+    if path is None:
+        extension = "prof" if mode == "cprofile" else "folded"
+        path = os.path.join(config.PROFILE_OUTPUT_DIR,
+                            f"scan-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+    with _session_lock:
+        if _session is not None:
+            raise ValueError("A profiling session is already running")
+        _session = _ProfileSession(mode, cycles or config.PROFILE_CYCLES, path,
+                                   config.PROFILE_SAMPLE_INTERVAL)
+    return path
+
+
+def profiling_active() -> bool:
+    """Return True while a profiling session is collecting cycles."""
+    return _session is not None
+
+
+def stop_profiling():
+    """Write a running session early (e.g. on quit) with the cycles so far."""
+    session = _session
+    if session is not None:
+        _finish(session)
+
+
+@contextlib.contextmanager
+def profile_cycle():
+    """Profile the enclosed scan cycle if a session is running."""
+    session = _session
+    if session is None:
+        yield
+        return
+
+    session.begin_cycle()
+    try:
+        yield
+    finally:
+        if session.end_cycle():
+            _finish(session)
+
+
+def _finish(session: _ProfileSession):
+    """Write a completed session and clear it."""
+    global _session
+
+    with _session_lock:
+        if _session is not session:
+            return  # already written
+        _session = None
+    try:
+        session.stop()
+        session.write()
+        print(f"Profile written to {session.path}")
+    except OSError as e:
+        print(f"Could not write profile: {e}")
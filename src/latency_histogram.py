@@ -0,0 +1,290 @@
+"""Constant-memory latency histograms with rotating time windows.
+
+Buckets are log-linear, as in HdrHistogram: every power of two is split
+into SUB_BUCKETS linear sub-buckets, so any latency from 1 µs to
+MAX_VALUE_US lands in one of BUCKET_COUNT fixed buckets with at most
+1/SUB_BUCKETS (about 6%) relative error. Recording is an index
+computation and one counter increment, memory never grows with the
+number of samples, and percentiles come from one cumulative pass.
+
+A WindowedHistogram keeps a ring of such histograms, one per time window
+(LATENCY_WINDOW_SECONDS), and clears the oldest when time moves on, so a
+query covers the last LATENCY_WINDOWS windows ("the last 5 minutes") and
+a server that recently got slow is not hidden by hours of fast history.
+LatencyStore holds one per (port, pid) and metric, fed by src.prober.
+"""
+
+import bisect
+import itertools
+import threading
+import time
+from array import array
+from typing import Dict, Hashable, Iterable, Optional
+
+import src.config as config
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Larger values are counted in the last bucket (60 s)
+MAX_VALUE_US = 60_000_000
+
+PERCENTILES = (50, 90, 99)
+
+
+def bucket_index(value_us: int) -> int:
+    """
+    Return the bucket of a value.
+
+    Args:
+        value_us: Latency in whole microseconds (clamped to 0..MAX_VALUE_US)
+
+    Returns:
+        Bucket index (values below 2 * SUB_BUCKETS get exact buckets)
+    """
+    value_us = min(max(value_us, 0), MAX_VALUE_US)
+    if value_us < 2 * SUB_BUCKETS:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value_us >> shift) - SUB_BUCKETS
+
+
+def bucket_upper_us(index: int) -> int:
+    """Return the highest value (µs) counted in a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    sub_bucket = index - shift * SUB_BUCKETS
+    return ((sub_bucket + 1) << shift) - 1
+
+
+BUCKET_COUNT = bucket_index(MAX_VALUE_US) + 1
+
+
+class LatencyHistogram:
+    """Latencies in BUCKET_COUNT fixed log-linear buckets."""
+
+    __slots__ = ('counts', 'count', 'total_us', 'max_us')
+
+    def __init__(self):
+        self.counts = array('I', bytes(BUCKET_COUNT * array('I').itemsize))
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, milliseconds: float):
+        """Add one latency."""
+        value_us = int(milliseconds * 1000)
+        self.counts[bucket_index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def add(self, other: "LatencyHistogram"):
+        """Add the counts of another histogram to this one."""
+        self.counts = array('I', map(sum, zip(self.counts, other.counts)))
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def clear(self):
+        """Forget all latencies (keeps the allocated buckets)."""
+        if self.count:
+            for index in range(BUCKET_COUNT):
+                self.counts[index] = 0
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def percentiles(self, percents: Iterable[float] = PERCENTILES) -> Dict[float, float]:
+        """
+        Estimate several percentiles in one pass over the buckets.
+
+        Args:
+            percents: Percentiles (0-100)
+
+        Returns:
+            Dict of percent -> upper bound of the bucket holding that rank
+            (capped at the maximum seen), in milliseconds; 0.0 if empty
+        """
+        if not self.count:
+            return {percent: 0.0 for percent in percents}
+
+        cumulative = list(itertools.accumulate(self.counts))
+        result = {}
+        for percent in percents:
+            rank = max(1, -(-self.count * percent // 100))  # ceil
+            index = bisect.bisect_left(cumulative, rank)
+            result[percent] = min(bucket_upper_us(index), self.max_us) / 1000
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        """Return count, mean_ms, max_ms and PERCENTILES (ms)."""
+        summary = {
+            'count': self.count,
+            'mean_ms': round(self.total_us / self.count / 1000, 3) if self.count else 0.0,
+            'max_ms': self.max_us / 1000,
+        }
+        for percent, value in self.percentiles().items():
+            summary[f'p{percent}_ms'] = value
+        return summary
+
+
+class WindowedHistogram:
+    """
+    A ring of LatencyHistograms, one per time window.
+
+    Memory is fixed at `windows` histograms; recording into a new window
+    clears the oldest one.
+    """
+
+    __slots__ = ('window_seconds', '_ring', '_current', '_window_start', '_summary')
+
+    def __init__(self, window_seconds: float = config.LATENCY_WINDOW_SECONDS,
+                 windows: int = config.LATENCY_WINDOWS):
+        """
+        Initialize the ring.
+
+        Args:
+            window_seconds: Length of one window
+            windows: Number of windows kept (queries cover at most all of them)
+        """
+        self.window_seconds = window_seconds
+        self._ring = [LatencyHistogram() for _ in range(windows)]
+        self._current = 0
+        self._window_start: Optional[float] = None
+        self._summary: Optional[Dict[str, float]] = None  # cached until data changes
+
+    def record(self, milliseconds: float, now: Optional[float] = None):
+        """
+        Add one latency to the current window.
+
+        Args:
+            milliseconds: Latency
+            now: Monotonic time (default: time.monotonic())
+        """
+        self._rotate(time.monotonic() if now is None else now)
+        self._ring[self._current].record(milliseconds)
+        self._summary = None
+
+    def merged(self, windows: Optional[int] = None,
+               now: Optional[float] = None) -> LatencyHistogram:
+        """
+        Combine the most recent windows into one histogram.
+
+        Args:
+            windows: Number of windows, newest first (default: all)
+            now: Monotonic time (default: time.monotonic())
+
+        Returns:
+            New LatencyHistogram
+        """
+        self._rotate(time.monotonic() if now is None else now)
+        size = len(self._ring)
+        merged = LatencyHistogram()
+        for age in range(min(windows or size, size)):
+            histogram = self._ring[(self._current - age) % size]
+            if histogram.count:
+                merged.add(histogram)
+        return merged
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Summarize every window kept (see LatencyHistogram.summary).
+
+        The result is cached until a latency is recorded or a window ends.
+        """
+        if now is None:
+            now = time.monotonic()
+        self._rotate(now)
+        if self._summary is None:
+            self._summary = self.merged(now=now).summary()
+        return dict(self._summary)
+
+    def _rotate(self, now: float):
+        """Move to the window containing `now`, clearing windows that ended."""
+        if self._window_start is None:
+            self._window_start = now
+            return
+
+        elapsed = int((now - self._window_start) // self.window_seconds)
+        if elapsed <= 0:
+            return
+
+        size = len(self._ring)
+        for _ in range(min(elapsed, size)):
+            self._current = (self._current + 1) % size
+            self._ring[self._current].clear()
+        self._window_start += elapsed * self.window_seconds
+        self._summary = None
+
+
+class LatencyStore:
+    """
+    WindowedHistograms per listener and metric (e.g. "connect", "first_byte").
+
+    Thread-safe; forget() drops listeners that are gone, so memory is
+    bounded by the number of live listeners.
+    """
+
+    def __init__(self, window_seconds: float = config.LATENCY_WINDOW_SECONDS,
+                 windows: int = config.LATENCY_WINDOWS):
+        """
+        Initialize the store.
+
+        Args:
+            window_seconds: Length of one window
+            windows: Number of windows kept per histogram
+        """
+        self.window_seconds = window_seconds
+        self.windows = windows
+
+        self._lock = threading.Lock()
+        self._histograms: Dict[Hashable, Dict[str, WindowedHistogram]] = {}
+
+    def record(self, key: Hashable, metric: str, milliseconds: float,
+               now: Optional[float] = None):
+        """
+        Add one latency.
+
+        Args:
+            key: Listener, e.g. (port, pid)
+            metric: Metric name
+            milliseconds: Latency
+            now: Monotonic time (default: time.monotonic())
+        """
+        with self._lock:
+            metrics = self._histograms.setdefault(key, {})
+            histogram = metrics.get(metric)
+            if histogram is None:
+                histogram = metrics[metric] = WindowedHistogram(self.window_seconds, self.windows)
+            histogram.record(milliseconds, now)
+
+    def summaries(self, key: Hashable, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize every metric of a listener over the kept windows.
+
+        Args:
+            key: Listener
+            now: Monotonic time (default: time.monotonic())
+
+        Returns:
+            Dict of metric -> summary (count, mean_ms, max_ms, p50_ms,
+            p90_ms, p99_ms); empty if nothing was recorded
+        """
+        with self._lock:
+            metrics = self._histograms.get(key, {})
+            return {metric: histogram.summary(now) for metric, histogram in metrics.items()}
+
+    def forget(self, keep: Iterable[Hashable]):
+        """Drop the histograms of every listener not in `keep`."""
+        keep = set(keep)
+        with self._lock:
+            self._histograms = {
+                key: metrics for key, metrics in self._histograms.items() if key in keep
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._histograms)
@@ -2,14 +2,22 @@
 
 import rumps
 import threading
-from typing import Dict, List
+import time
+from typing import Callable, Dict, List, Mapping, Tuple
 
 import src.config as config
+import src.instrumentation as instrumentation
+import src.menu_model as menu_model
 import src.port_scanner as port_scanner
-import src.process_monitor as process_monitor
+import src.scan_engine as scan_engine
 import src.ui_helpers as ui_helpers
 import src.quick_actions as quick_actions
-import src.updater as updater
+
+# How often the main thread looks for the result of a running kill (seconds)
+KILL_POLL_INTERVAL = 0.2
+
+# Optional features (history, exporter, updater) are imported when first
+# used, so they add nothing to startup unless enabled
 
 
 class LocalhostMonitorApp(rumps.App):
@@ -23,12 +31,57 @@ class LocalhostMonitorApp(rumps.App):
             quit_button=None  # We'll add our own quit button
         )
 
-        # Store current processes
-        self.processes: Dict[int, Dict] = {}  # port -> process info
-        self.is_scanning = False
-
-        # Initialize update checker
-        self.updater = updater.UpdateChecker(self)
+        # Store current processes (from the latest rendered snapshot)
+        self.ports = port_scanner.PortSnapshot()  # indexed listeners
+        self.processes: Mapping[Tuple[int, int], Mapping] = {}  # (port, pid) -> process info
+        self.rendered_generation = 0
+        self.last_scan_seconds = 0.0
+        self.last_render_seconds = 0.0
+
+        # Rendered process section: view-model nodes and their rumps items
+        self.process_nodes = None  # None forces a full menu build
+        self.menu_items: Dict[str, rumps.MenuItem] = {}  # node key -> item
+        self.menu_keys: Dict[str, str] = {}  # node key -> key in parent menu
+        self.process_anchor_key = None  # Menu key the process items follow
+
+        # Scans run on a background worker that publishes snapshots
+        self.engine = scan_engine.ScanEngine()
+
+        # Kills run on worker threads; their timers deliver the results
+        self.kill_timers: List[rumps.Timer] = []
+
+        # Optional SQLite history, fed with every published snapshot
+        self.history = None
+        if config.ENABLE_HISTORY:
+            import sqlite3
+            import src.history as history
+            try:
+                self.history = history.HistoryStore()
+                self.engine.subscribe(self.history.record)
+            except (OSError, sqlite3.Error) as e:
+                print(f"History disabled: {e}")
+
+        # Optional Prometheus endpoint, served from the same snapshots
+        self.exporter = None
+        if config.ENABLE_METRICS_EXPORTER:
+            import src.exporter as exporter
+            self.exporter = exporter.MetricsExporter(self.engine.latest)
+            try:
+                self.exporter.start()
+            except OSError as e:
+                print(f"Metrics exporter disabled: {e}")
+                self.exporter = None
+
+        # Opt-in profiling of the first scan cycles (see PROFILE_MODE)
+        if config.PROFILE_MODE:
+            instrumentation.start_profiling()
+
+        # Start background scanning now (first scan runs immediately), so
+        # it overlaps with building the menu
+        self.engine.start()
+
+        # Update checker is created on first use (see the updater property)
+        self._updater = None
 
         # Build initial menu
         self.menu = [
@@ -37,62 +90,131 @@ class LocalhostMonitorApp(rumps.App):
             rumps.MenuItem("Quit", callback=self.quit_app)
         ]
 
-        # Start initial scan
-        self.refresh_processes(None)
+        # Fresh data whenever the user opens the menu
+        self.menu_observer = ui_helpers.watch_menu_open(self.menu, self.refresh_processes)
 
         # Check for updates on startup (delayed, silent)
         if config.ENABLE_AUTO_UPDATE_CHECK:
-            rumps.Timer(
+            self.update_timer = rumps.Timer(
                 self._check_updates_startup,
                 config.UPDATE_CHECK_ON_STARTUP_DELAY
-            ).start()
+            )
+            self.update_timer.start()
+
+    @property
+    def updater(self):
+        """Update checker (its module, with urllib and json, is imported on first use)."""
+        if self._updater is None:
+            import src.updater as updater
+            self._updater = updater.UpdateChecker(self)
+        return self._updater
 
     def refresh_processes(self, sender):
-        """Refresh the list of processes and update menu."""
-        if self.is_scanning:
+        """
+        Ask the scan engine for a fresh snapshot (rendered when it arrives).
+
+        Also resets the adaptive refresh interval to its fastest setting.
+        """
+        self.engine.request_refresh()
+
+    @rumps.timer(config.UI_POLL_INTERVAL)
+    def render_latest_snapshot(self, sender):
+        """Swap in the newest snapshot from the scan engine and render it."""
+        snapshot = self.engine.latest()
+        if snapshot.generation == self.rendered_generation:
             return
 
-        self.is_scanning = True
+        self.render_snapshot(snapshot)
+
+    def render_snapshot(self, snapshot: scan_engine.Snapshot):
+        """
+        Render a snapshot into the menubar (main thread only).
+
+        Args:
+            snapshot: Snapshot published by the scan engine
+        """
+        started = time.perf_counter()
+        self.rendered_generation = snapshot.generation
+        self.ports = snapshot.ports
+        self.processes = snapshot.ports.listeners
 
         try:
-            # Scan for ports
-            ports_info = port_scanner.scan_ports(
-                config.PORT_RANGE_START,
-                config.PORT_RANGE_END
-            )
+            if snapshot.error:
+                raise RuntimeError(snapshot.error)
 
-            # Update process cache
-            self.processes.clear()
-            for port_info in ports_info:
-                proc_info = process_monitor.get_process_info(port_info['pid'])
-                if proc_info:
-                    self.processes[port_info['port']] = {**port_info, **proc_info}
+            # Update title (icon shows separately, just show the port count)
+            self.title = f"{len(self.ports.ports)}" if self.processes else ""
 
-            # Update title (icon shows separately, just show count)
-            self.title = f"{len(self.processes)}" if self.processes else ""
+            nodes = menu_model.build_process_nodes(self.processes)
 
-            # Rebuild menu with new section-based structure
-            self.menu.clear()
-            self.menu = self.build_menu()
+            if self.process_nodes is None:
+                # First render (or recovering from an error): build everything
+                self.menu.clear()
+                self.menu_items.clear()
+                self.menu_keys.clear()
+                self.menu = self.build_menu(nodes)
+            else:
+                # Usually only CPU/RAM titles changed: patch just those items
+                self.apply_menu_patch(menu_model.diff_menu(self.process_nodes, nodes))
+
+            self.process_nodes = nodes
 
         except Exception as e:
             print(f"Error refreshing processes: {e}")
             self.title = "!"  # Error indicator
+            self.process_nodes = None
+            self.menu.clear()
             self.menu = self.build_error_menu(str(e))
-        finally:
-            self.is_scanning = False
 
-    def build_menu(self) -> List:
+        # Scan and render are timed separately to see which one is slow
+        self.last_scan_seconds = snapshot.scan_seconds
+        self.last_render_seconds = time.perf_counter() - started
+        instrumentation.record("build_menu", self.last_render_seconds)
+        if config.LOG_TIMINGS:
+            print(
+                f"Refresh #{snapshot.generation}: "
+                f"scan {self.last_scan_seconds * 1000:.1f} ms, "
+                f"render {self.last_render_seconds * 1000:.1f} ms"
+            )
+
+    def apply_menu_patch(self, patch: menu_model.MenuPatch):
+        """
+        Apply a view-model patch to the process section of the live menu.
+
+        Args:
+            patch: Changes computed by menu_model.diff_menu()
+        """
+        for key in patch.remove:
+            del self.menu[self.menu_keys.pop(key)]
+            self.forget_menu_item(key)
+
+        for after_key, node in patch.add:
+            item = self.create_menu_item(node)
+            if after_key is not None:
+                self.menu.insert_after(self.menu_keys[after_key], item)
+            elif self.process_anchor_key is not None:
+                self.menu.insert_after(self.process_anchor_key, item)
+            else:
+                self.menu.insert_before(next(iter(self.menu.keys())), item)
+            self.menu_keys[node.key] = item.title
+
+        for key, title in patch.retitle:
+            self.menu_items[key].title = title
+
+    def build_menu(self, process_nodes) -> List:
         """
         Build the complete menu with section-based structure.
 
+        Args:
+            process_nodes: View-model nodes for the ACTIVE PROCESSES section
+
         Returns:
             List of menu items
         """
         menu = []
 
         # ═══ ACTIVE PROCESSES Section ═══
-        menu.extend(self.build_processes_section())
+        menu.extend(self.build_processes_section(process_nodes))
 
         # ═══ QUICK ACTIONS Section ═══
         menu.extend(self.build_quick_actions_section())
@@ -106,23 +228,21 @@ class LocalhostMonitorApp(rumps.App):
 
         return menu
 
-    def build_processes_section(self) -> List:
+    def build_processes_section(self, process_nodes) -> List:
         """Build the ACTIVE PROCESSES section."""
         section = []
 
         # Section header
         header = ui_helpers.create_section_header("ACTIVE PROCESSES")
+        self.process_anchor_key = header.title if header else None
         if header:
             section.append(header)
 
         # Process list
-        if not self.processes:
-            section.append(rumps.MenuItem("No active processes", callback=None))
-        else:
-            for port in sorted(self.processes.keys()):
-                proc_info = self.processes[port]
-                proc_menu = self.create_process_menu(port, proc_info)
-                section.append(proc_menu)
+        for node in process_nodes:
+            item = self.create_menu_item(node)
+            self.menu_keys[node.key] = item.title
+            section.append(item)
 
         return section
 
@@ -174,6 +294,10 @@ class LocalhostMonitorApp(rumps.App):
         section.append(rumps.separator)
         section.append(rumps.MenuItem("Check for Updates", callback=self.check_for_updates_callback))
 
+        # Stage timings (debugging)
+        if config.SHOW_DEBUG_MENU:
+            section.append(rumps.MenuItem("Performance Stats", callback=self.performance_stats_callback))
+
         # Settings (coming soon)
         if config.ENABLE_SETTINGS_GUI:
             section.append(rumps.MenuItem("Settings", callback=self.settings_callback))
@@ -192,57 +316,72 @@ class LocalhostMonitorApp(rumps.App):
             rumps.MenuItem("Quit", callback=self.quit_app)
         ]
 
-    def create_process_menu(self, port: int, proc_info: Dict) -> rumps.MenuItem:
+    def create_menu_item(self, node: menu_model.MenuNode):
         """
-        Create a menu item for a process with submenu.
+        Create the rumps item (with submenu) for a view-model node.
 
         Args:
-            port: Port number
-            proc_info: Process information dictionary
+            node: View-model node
 
         Returns:
-            rumps.MenuItem with submenu
+            rumps.MenuItem, or rumps.separator for separator nodes
         """
-        # Main item: Port and process name (with favorite support)
-        is_favorite = False  # TODO: Check favorites in Phase 2.1
-        title = ui_helpers.format_process_title(port, proc_info['name'], is_favorite)
-        port_item = rumps.MenuItem(title)
+        if node.title is None:
+            return rumps.separator
 
-        # Create submenu items using helper
-        submenu_items = []
+        callback = None
+        if node.action and node.action[0] == "kill":
+            _, port, pid = node.action
+            callback = lambda sender: self.kill_process_callback(port, pid)
 
-        if config.SHOW_PID:
-            submenu_items.append(
-                ui_helpers.create_process_stat_item("PID", str(proc_info['pid']))
-            )
+        item = rumps.MenuItem(node.title, callback=callback)
+        self.menu_items[node.key] = item
 
-        if config.SHOW_RAM:
-            submenu_items.append(
-                ui_helpers.create_process_stat_item("RAM", f"{proc_info['memory_mb']} MB")
-            )
+        if node.children:
+            item.update([self.create_menu_item(child) for child in node.children])
 
-        if config.SHOW_CPU:
-            submenu_items.append(
-                ui_helpers.create_process_stat_item("CPU", f"{proc_info['cpu_percent']}%")
-            )
+        return item
 
-        if config.SHOW_UPTIME:
-            submenu_items.append(
-                rumps.MenuItem(f"Uptime: {proc_info['uptime_formatted']}", callback=None)
-            )
+    def forget_menu_item(self, key: str):
+        """Drop a removed node (and its children) from the item registry."""
+        self.menu_items.pop(key, None)
+        prefix = f"{key}/"
+        for child_key in [k for k in self.menu_items if k.startswith(prefix)]:
+            del self.menu_items[child_key]
 
-        # Add separator and kill button
-        submenu_items.append(rumps.separator)
-        kill_button = rumps.MenuItem(
-            "Kill Process",
-            callback=lambda sender: self.kill_process_callback(port, proc_info['pid'])
-        )
-        submenu_items.append(kill_button)
+    def run_kill(self, name: str, kill: Callable, on_done: Callable):
+        """
+        Run a kill on a worker thread, so the menu stays responsive.
 
-        # Assign submenu
-        port_item.update(submenu_items)
+        Killing waits up to KILL_TIMEOUT for processes to exit; the result
+        is picked up by a short rumps timer and handed to `on_done` on the
+        main thread, where notifications and menu updates are safe.
 
-        return port_item
+        Args:
+            name: Worker thread name
+            kill: Function doing the kill (worker thread)
+            on_done: Called as on_done(result, error) on the main thread
+        """
+        outcome = {'result': None, 'error': None}
+
+        def work():
+            try:
+                outcome['result'] = kill()
+            except Exception as e:
+                outcome['error'] = e
+
+        def deliver(sender):
+            if worker.is_alive():
+                return
+            sender.stop()
+            self.kill_timers.remove(sender)
+            on_done(outcome['result'], outcome['error'])
+
+        worker = threading.Thread(target=work, name=name, daemon=True)
+        timer = rumps.Timer(deliver, KILL_POLL_INTERVAL)
+        self.kill_timers.append(timer)  # keep the timer alive until it fires
+        worker.start()
+        timer.start()
 
     def kill_process_callback(self, port: int, pid: int):
         """
@@ -252,52 +391,81 @@ class LocalhostMonitorApp(rumps.App):
             port: Port number
             pid: Process ID to kill
         """
-        try:
-            # Confirmation dialog
-            response = rumps.alert(
-                title="Kill Process",
-                message=f"Are you sure you want to kill process on port {port} (PID: {pid})?",
-                ok="Kill",
-                cancel="Cancel"
+        # Confirmation dialog
+        response = rumps.alert(
+            title="Kill Process",
+            message=f"Are you sure you want to kill process on port {port} (PID: {pid})?",
+            ok="Kill",
+            cancel="Cancel"
+        )
+
+        if response == 1:  # OK clicked
+            self.run_kill(
+                f"kill-{pid}",
+                lambda: quick_actions.kill_processes_freeing_ports([pid]),
+                lambda result, error: self.kill_process_done(port, pid, result, error)
             )
 
-            if response == 1:  # OK clicked
-                success = process_monitor.kill_process(pid)
-
-                if success:
-                    rumps.notification(
-                        title="Process Killed",
-                        subtitle=f"Port {port}",
-                        message=f"Process {pid} has been terminated"
-                    )
-
-                    # Refresh menu after short delay
-                    threading.Timer(0.5, lambda: self.refresh_processes(None)).start()
-                else:
-                    rumps.alert(
-                        title="Error",
-                        message=f"Failed to kill process {pid}. Try again or use force kill.",
-                        ok="OK"
-                    )
+    def kill_process_done(self, port: int, pid: int, result, error):
+        """
+        Report a finished single-process kill (main thread).
 
-        except Exception as e:
+        Args:
+            port: Port number
+            pid: Process ID that was killed
+            result: (results, freed ports) from kill_processes_freeing_ports
+            error: Exception raised by the kill, if any
+        """
+        if error is not None:
             rumps.alert(
                 title="Error",
-                message=f"Error killing process: {str(e)}",
+                message=f"Error killing process: {str(error)}",
                 ok="OK"
             )
+            return
 
-    @rumps.timer(config.REFRESH_INTERVAL)
-    def auto_refresh(self, sender):
-        """Auto-refresh timer callback."""
-        self.refresh_processes(None)
+        results, freed_ports = result
+        if results.get(pid):
+            message = f"Process {pid} has been terminated"
+            if freed_ports:
+                message += f", freed {quick_actions.format_ports(freed_ports)}"
+            rumps.notification(
+                title="Process Killed",
+                subtitle=f"Port {port}",
+                message=message
+            )
+
+            # Rescan right away and poll fast for a while
+            self.refresh_processes(None)
+        else:
+            rumps.alert(
+                title="Error",
+                message=f"Failed to kill process {pid}. Try again or use force kill.",
+                ok="OK"
+            )
 
     def kill_all_callback(self, sender):
         """Callback for Kill All Ports action."""
-        quick_actions.execute_kill_all(self.processes)
+        # One PID can listen on several ports; count processes, not ports
+        if not quick_actions.confirm_kill_all(len(self.ports.pids)):
+            return
+
+        ports = self.ports
+        self.run_kill(
+            "kill-all",
+            lambda: quick_actions.kill_all_processes(ports),
+            self.kill_all_done
+        )
 
-        # Refresh menu after short delay
-        threading.Timer(1.0, lambda: self.refresh_processes(None)).start()
+    def kill_all_done(self, result, error):
+        """Report a finished Kill All (main thread) and rescan."""
+        if error is not None:
+            print(f"Error killing processes: {error}")
+        else:
+            quick_actions.notify_kill_all(*result)
+
+        # Rescan right away and poll fast for a while
+        self.refresh_processes(None)
 
     def favorites_callback(self, sender):
         """Callback for Favorites action (placeholder)."""
@@ -313,8 +481,20 @@ class LocalhostMonitorApp(rumps.App):
             message="Settings GUI will be available in v0.2.2"
         )
 
+    def performance_stats_callback(self, sender):
+        """Show per-stage timings of the refresh pipeline."""
+        ui_helpers.show_info_dialog(
+            title="Performance Stats",
+            message=instrumentation.format_stats()
+        )
+
     def _check_updates_startup(self, sender):
-        """Check for updates on startup (runs once, silent mode)."""
+        """Check for updates after startup, then once per check interval (silent mode)."""
+        if sender.interval != config.AUTO_UPDATE_CHECK_INTERVAL:
+            sender.stop()
+            self.update_timer = rumps.Timer(self._check_updates_startup,
+                                            config.AUTO_UPDATE_CHECK_INTERVAL)
+            self.update_timer.start()
         self.updater.check_for_updates(silent=True)
 
     def check_for_updates_callback(self, sender):
@@ -323,6 +503,16 @@ class LocalhostMonitorApp(rumps.App):
 
     def quit_app(self, sender):
         """Quit the application."""
+        self.engine.stop(timeout=1.0)
+        try:
+            instrumentation.stop_profiling()
+        except Exception as e:
+            # Never keep the exporter and history from shutting down
+            print(f"Could not write profile: {e}")
+        if self.exporter is not None:
+            self.exporter.stop()
+        if self.history is not None:
+            self.history.close()
         rumps.quit_application()
 
 
@@ -0,0 +1,285 @@
+"""Pure-Python menu view-model with incremental diffing.
+
+The process section of the menu is described as a tree of MenuNode values
+built from a scan snapshot. Comparing the previous tree with the new one
+yields a MenuPatch listing only the items to add, remove or retitle, which
+the rumps layer applies instead of rebuilding the whole menu. Nothing here
+imports rumps, so it can be tested headless.
+"""
+
+from collections import Counter
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import src.config as config
+
+# Key of the placeholder shown when no process is listening
+EMPTY_KEY = "process:none"
+
+# RAM trends smaller than this (MB per minute) are not shown
+_MIN_SHOWN_TREND = 0.1
+
+# How unsuccessful probes are shown (keys are src.prober outcomes)
+_PROBE_FAILURES = {
+    "no_response": "no response",
+    "closed": "closed without reply",
+    "refused": "connection refused",
+    "timeout": "connect timed out",
+    "error": "probe failed",
+}
+
+
+class MenuNode(NamedTuple):
+    """One menu item in the view-model."""
+
+    key: str  # Stable identity across refreshes
+    title: Optional[str]  # None for a separator
+    children: Tuple["MenuNode", ...] = ()
+    action: Optional[Tuple] = None  # e.g. ("kill", port, pid)
+
+
+class MenuPatch(NamedTuple):
+    """Changes needed to turn one list of nodes into another."""
+
+    remove: Tuple[str, ...]  # Keys of top-level nodes to remove
+    add: Tuple[Tuple[Optional[str], MenuNode], ...]  # (key to insert after, node)
+    retitle: Tuple[Tuple[str, str], ...]  # (key, new title), nested keys included
+
+    def is_empty(self) -> bool:
+        """Return True if the patch changes nothing."""
+        return not (self.remove or self.add or self.retitle)
+
+
+def format_process_title(port: int, name: str, is_favorite: bool = False,
+                         protocol: str = "tcp", pid: Optional[int] = None) -> str:
+    """
+    Format process menu item title.
+
+    rumps keys menu items by title, so processes sharing a port pass
+    their pid to keep the titles unique.
+
+    Args:
+        port: Port number
+        name: Process name
+        is_favorite: Whether this is a favorite process
+        protocol: "udp" if the process only has UDP sockets on the port
+        pid: Process ID to show (only when several processes share the port)
+
+    Returns:
+        Formatted title string
+    """
+    status = "[FAVORITE]" if is_favorite else "[ACTIVE]"
+    suffix = "/udp" if protocol == "udp" else ""
+    title = f"{status} :{port}{suffix} → {name}"
+    if pid is not None:
+        title += f" (PID {pid})"
+    return title
+
+
+def format_sockets(sockets) -> str:
+    """
+    Format the sockets of a listener, grouped by protocol.
+
+    Args:
+        sockets: (protocol, family, address) tuples, sorted
+
+    Returns:
+        e.g. "TCP 127.0.0.1, [::1] · UDP 0.0.0.0"
+    """
+    groups: Dict[str, List[str]] = {}
+    for protocol, family, address in sockets:
+        shown = f"[{address}]" if family == "ipv6" else address
+        groups.setdefault(protocol.upper(), []).append(shown)
+    return " · ".join(f"{protocol} {', '.join(addresses)}" for protocol, addresses in groups.items())
+
+
+def format_latency(proc_info: Mapping[str, any]) -> str:
+    """
+    Format the probe result of a listener.
+
+    Args:
+        proc_info: Process information with probe_status, connect_ms and
+            first_byte_ms (see src.prober)
+
+    Returns:
+        e.g. "Latency: connect 0.3 ms · first byte 12.4 ms"
+    """
+    status = proc_info['probe_status']
+    if 'connect_ms' not in proc_info:
+        return f"Latency: {_PROBE_FAILURES.get(status, status)}"
+
+    parts = [f"connect {proc_info['connect_ms']:.1f} ms"]
+    if 'first_byte_ms' in proc_info:
+        parts.append(f"first byte {proc_info['first_byte_ms']:.1f} ms")
+    elif status in _PROBE_FAILURES:
+        parts.append(_PROBE_FAILURES[status])
+    return "Latency: " + " · ".join(parts)
+
+
+def format_latency_window(latency: Mapping[str, Mapping[str, float]]) -> Optional[str]:
+    """
+    Format the latency percentiles of a listener over the kept windows.
+
+    Args:
+        latency: Metric -> summary (see Snapshot.latency); first-byte
+            latency is shown if measured, connect latency otherwise
+
+    Returns:
+        e.g. "Last 5 min: p50 12.1 · p90 20.4 · p99 48.0 ms", or None
+        if there are no samples
+    """
+    summary = latency.get('first_byte') or latency.get('connect')
+    if not summary or not summary['count']:
+        return None
+
+    minutes = config.LATENCY_WINDOW_SECONDS * config.LATENCY_WINDOWS / 60
+    return (
+        f"Last {minutes:g} min: p50 {summary['p50_ms']:.1f} · "
+        f"p90 {summary['p90_ms']:.1f} · p99 {summary['p99_ms']:.1f} ms"
+    )
+
+
+def _only_udp(proc_info: Mapping[str, any]) -> bool:
+    """Whether every socket of a listener is UDP."""
+    sockets = proc_info.get('sockets')
+    if sockets:
+        return all(protocol == "udp" for protocol, _, _ in sockets)
+    return proc_info.get('protocol') == "udp"
+
+
+def build_process_node(port: int, proc_info: Mapping[str, any],
+                       shared_port: bool = False) -> MenuNode:
+    """
+    Build the node (with stat submenu) for one listening process.
+
+    Args:
+        port: Port number
+        proc_info: Process information dictionary
+        shared_port: Whether other processes listen on the same port
+            (the title then includes the pid)
+
+    Returns:
+        MenuNode for the process
+    """
+    pid = proc_info['pid']
+    key = f"process:{port}:{pid}"
+
+    # Main item: Port and process name (with favorite support)
+    is_favorite = False  # TODO: Check favorites in Phase 2.1
+    title = format_process_title(port, proc_info['name'], is_favorite,
+                                 "udp" if _only_udp(proc_info) else "tcp",
+                                 pid if shared_port else None)
+
+    children = []
+
+    if config.SHOW_PID:
+        children.append(MenuNode(f"{key}/pid", f"PID: {pid}"))
+
+    if config.SHOW_SOCKETS and proc_info.get('sockets'):
+        children.append(MenuNode(f"{key}/sockets", f"Listening: {format_sockets(proc_info['sockets'])}"))
+
+    if config.SHOW_RAM:
+        ram_title = f"RAM: {proc_info['memory_mb']} MB"
+        trend = proc_info.get('memory_mb_trend')
+        if config.SHOW_TRENDS and trend and abs(trend) >= _MIN_SHOWN_TREND:
+            ram_title += f" ({trend:+.1f} MB/min)"
+        children.append(MenuNode(f"{key}/ram", ram_title))
+
+    if config.SHOW_CPU:
+        children.append(MenuNode(f"{key}/cpu", f"CPU: {proc_info['cpu_percent']}%"))
+
+    if config.SHOW_UPTIME:
+        children.append(MenuNode(f"{key}/uptime", f"Uptime: {proc_info['uptime_formatted']}"))
+
+    if config.SHOW_LATENCY and 'probe_status' in proc_info:
+        children.append(MenuNode(f"{key}/latency", format_latency(proc_info)))
+
+        window_title = format_latency_window(proc_info.get('latency', {}))
+        if window_title:
+            children.append(MenuNode(f"{key}/latency_window", window_title))
+
+    # Separator and kill button
+    children.append(MenuNode(f"{key}/separator", None))
+    children.append(MenuNode(f"{key}/kill", "Kill Process", action=("kill", port, pid)))
+
+    return MenuNode(key, title, tuple(children))
+
+
+def build_process_nodes(
+    processes: Mapping[Tuple[int, int], Mapping[str, any]]
+) -> Tuple[MenuNode, ...]:
+    """
+    Build the ACTIVE PROCESSES section nodes, sorted by port.
+
+    Args:
+        processes: Dictionary of (port, pid) -> process info, so several
+            processes sharing a port each get their own item
+
+    Returns:
+        Tuple of top-level nodes (a placeholder if there are no processes)
+    """
+    if not processes:
+        return (MenuNode(EMPTY_KEY, "No active processes"),)
+
+    keys = sorted(processes.keys())
+    listeners_per_port = Counter(port for port, _ in keys)
+    return tuple(
+        build_process_node(key[0], processes[key], listeners_per_port[key[0]] > 1)
+        for key in keys
+    )
+
+
+def _same_shape(old: MenuNode, new: MenuNode) -> bool:
+    """Return True if two nodes differ at most in their titles."""
+    if old.action != new.action or len(old.children) != len(new.children):
+        return False
+
+    return all(
+        o.key == n.key and (o.title is None) == (n.title is None) and _same_shape(o, n)
+        for o, n in zip(old.children, new.children)
+    )
+
+
+def _collect_retitles(old: MenuNode, new: MenuNode, retitle: List[Tuple[str, str]]):
+    """Append (key, title) for every node whose title changed."""
+    if old.title != new.title:
+        retitle.append((new.key, new.title))
+
+    for o, n in zip(old.children, new.children):
+        _collect_retitles(o, n, retitle)
+
+
+def diff_menu(old: Tuple[MenuNode, ...], new: Tuple[MenuNode, ...]) -> MenuPatch:
+    """
+    Compute the patch turning the old node list into the new one.
+
+    Nodes are matched by key. A node whose submenu structure changed (e.g.
+    a display setting was toggled) is replaced rather than patched.
+
+    Args:
+        old: Previously rendered top-level nodes
+        new: Top-level nodes to render
+
+    Returns:
+        MenuPatch with removals, insertions (in order) and retitles
+    """
+    old_by_key: Dict[str, MenuNode] = {node.key: node for node in old}
+    new_by_key: Dict[str, MenuNode] = {node.key: node for node in new}
+
+    remove = tuple(
+        node.key for node in old
+        if node.key not in new_by_key or not _same_shape(node, new_by_key[node.key])
+    )
+
+    add = []
+    retitle = []
+    previous_key = None
+
+    for node in new:
+        old_node = old_by_key.get(node.key)
+        if old_node is None or not _same_shape(old_node, node):
+            add.append((previous_key, node))
+        else:
+            _collect_retitles(old_node, node, retitle)
+        previous_key = node.key
+
+    return MenuPatch(remove, tuple(add), tuple(retitle))
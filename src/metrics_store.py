@@ -0,0 +1,354 @@
+"""Per-process metric history in fixed-size ring buffers.
+
+Every refresh appends one sample (CPU %, RSS, ...) per process. Samples
+live in preallocated ring buffers, so each series uses constant memory no
+matter how long the app runs. Series are keyed on (pid, create_time): a
+reused PID starts a fresh history. Window queries (min/max/mean/
+percentiles/trend) run over a contiguous slice of the buffer, using NumPy
+when it is installed and the C-level builtins otherwise.
+"""
+
+import bisect
+import math
+import operator
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import src.config as config
+
+# NumPy is optional and slow to import: loaded when the first buffer is made
+numpy = None
+_numpy_checked = False
+
+# Metrics recorded for every process
+METRICS = ('cpu_percent', 'memory_mb')
+
+# One process instance: (pid, create_time)
+SeriesKey = Tuple[int, float]
+
+
+def _load_numpy():
+    """Import NumPy once if it is installed; return the module or None."""
+    global numpy, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy as np
+            numpy = np
+        except ImportError:  # Optional: the array module is used instead
+            pass
+    return numpy
+
+
+class RingBuffer:
+    """Preallocated circular buffer of floats (NumPy array or array('d'))."""
+
+    __slots__ = ('capacity', '_data', '_next', '_count')
+
+    def __init__(self, capacity: int, use_numpy: Optional[bool] = None):
+        """
+        Allocate the buffer.
+
+        Args:
+            capacity: Number of values kept (older values are overwritten)
+            use_numpy: Force or disable NumPy storage (default: if installed)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if use_numpy is None:
+            use_numpy = _load_numpy() is not None
+        elif use_numpy:
+            _load_numpy()
+
+        self.capacity = capacity
+        self._data = numpy.zeros(capacity) if use_numpy else array('d', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        """Add a value, overwriting the oldest one when full."""
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def latest(self, count: Optional[int] = None) -> Sequence[float]:
+        """
+        Return the newest values, oldest first.
+
+        Args:
+            count: Number of values (default: all stored values)
+
+        Returns:
+            Contiguous copy of the values (same array type as the buffer)
+        """
+        count = self._count if count is None else max(0, min(count, self._count))
+        start = self._next - count
+        is_numpy = numpy is not None and isinstance(self._data, numpy.ndarray)
+
+        if start >= 0:
+            values = self._data[start:self._next]
+            return values.copy() if is_numpy else values
+
+        # Wrapped around: stitch the tail and the head together
+        if is_numpy:
+            return numpy.concatenate((self._data[start:], self._data[:self._next]))
+        return self._data[start:] + self._data[:self._next]
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile of sorted values (NumPy's default method)."""
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: Sequence[float], percentiles: Iterable[float] = (50, 95)) -> Dict[str, float]:
+    """
+    Compute summary statistics over a window of values.
+
+    Args:
+        values: Values from RingBuffer.latest()
+        percentiles: Percentiles to include, e.g. (50, 95) -> 'p50', 'p95'
+
+    Returns:
+        Dictionary with count, min, max, mean and the percentiles
+        (only count if there are no values)
+    """
+    count = len(values)
+    if not count:
+        return {'count': 0}
+
+    percentiles = tuple(percentiles)
+
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        stats = {
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+        }
+        if percentiles:
+            for q, value in zip(percentiles, numpy.percentile(values, percentiles)):
+                stats[f'p{q:g}'] = float(value)
+    else:
+        stats = {
+            'min': min(values),
+            'max': max(values),
+            'mean': sum(values) / count,
+        }
+        if percentiles:
+            ordered = sorted(values)
+            for q in percentiles:
+                stats[f'p{q:g}'] = _percentile(ordered, q)
+
+    stats['count'] = count
+    return stats
+
+
+def slope(times: Sequence[float], values: Sequence[float]) -> Optional[float]:
+    """
+    Least-squares slope of values over time.
+
+    Args:
+        times: Sample timestamps in seconds
+        values: Sample values (same length)
+
+    Returns:
+        Change per second, or None with fewer than two distinct timestamps
+    """
+    count = len(values)
+    if count < 2 or times[-1] == times[0]:
+        return None
+
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        t = times - times.mean()
+        return float((t * (values - values.mean())).sum() / (t * t).sum())
+
+    # Closed form from plain sums; map(mul) keeps the loops in C
+    sum_t = sum(times)
+    sum_v = sum(values)
+    covariance = sum(map(operator.mul, times, values)) - sum_t * sum_v / count
+    variance = sum(map(operator.mul, times, times)) - sum_t * sum_t / count
+    return covariance / variance if variance > 0 else None
+
+
+class ProcessHistory:
+    """Sample timestamps and one ring buffer per metric for a process."""
+
+    __slots__ = ('times', 'series')
+
+    def __init__(self, capacity: int, metrics: Iterable[str], use_numpy: Optional[bool]):
+        self.times = RingBuffer(capacity, use_numpy)
+        self.series = {metric: RingBuffer(capacity, use_numpy) for metric in metrics}
+
+    def window_size(self, seconds: Optional[float], now: float) -> int:
+        """Return how many of the newest samples are within `seconds` of `now`."""
+        if seconds is None:
+            return len(self.times)
+
+        times = self.times.latest()
+        cutoff = now - seconds
+        if numpy is not None and isinstance(times, numpy.ndarray):
+            return len(times) - int(numpy.searchsorted(times, cutoff))
+        return len(times) - bisect.bisect_left(times, cutoff)
+
+
+class MetricsStore:
+    """
+    Bounded store of per-process metric histories.
+
+    Holds at most `max_series` histories (least recently updated evicted
+    first), each with `capacity` samples per metric. Safe to read from any
+    thread while the scan worker records.
+    """
+
+    def __init__(self, capacity: int = config.METRICS_HISTORY_SIZE,
+                 max_series: int = config.PROCESS_CACHE_MAX_SIZE,
+                 metrics: Iterable[str] = METRICS,
+                 use_numpy: Optional[bool] = None):
+        """
+        Initialize the store.
+
+        Args:
+            capacity: Samples kept per metric and process
+            max_series: Maximum number of processes tracked
+            metrics: Names of the recorded metrics
+            use_numpy: Force or disable NumPy storage (default: if installed)
+        """
+        self.capacity = capacity
+        self.max_series = max_series
+        self.metrics = tuple(metrics)
+        self.use_numpy = use_numpy
+
+        self._lock = threading.Lock()
+        self._histories: "OrderedDict[SeriesKey, ProcessHistory]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._histories)
+
+    def __contains__(self, key: SeriesKey) -> bool:
+        return key in self._histories
+
+    def record(self, key: SeriesKey, sample: Mapping[str, float],
+               timestamp: Optional[float] = None):
+        """
+        Append one sample for a process.
+
+        Args:
+            key: (pid, create_time) of the process
+            sample: Metric name -> value (missing metrics are stored as NaN)
+            timestamp: Sample time (default: time.monotonic())
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                history = ProcessHistory(self.capacity, self.metrics, self.use_numpy)
+                self._histories[key] = history
+                while len(self._histories) > self.max_series:
+                    self._histories.popitem(last=False)
+            else:
+                self._histories.move_to_end(key)
+
+            history.times.append(timestamp)
+            for metric, buffer in history.series.items():
+                buffer.append(sample.get(metric, math.nan))
+
+    def window(self, key: SeriesKey, metric: str, seconds: Optional[float] = None,
+               now: Optional[float] = None) -> Sequence[float]:
+        """
+        Return the samples of one metric within a time window, oldest first.
+
+        Args:
+            key: (pid, create_time) of the process
+            metric: Metric name
+            seconds: Window length (default: everything stored)
+            now: End of the window (default: time.monotonic())
+
+        Returns:
+            Array of values (empty if the process has no history)
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                return ()
+            return history.series[metric].latest(history.window_size(seconds, now))
+
+    def stats(self, key: SeriesKey, metric: str, seconds: Optional[float] = None,
+              percentiles: Iterable[float] = (50, 95),
+              now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Summarize one metric over a time window.
+
+        Returns:
+            Dictionary with count, min, max, mean and percentiles (see summarize())
+        """
+        return summarize(self.window(key, metric, seconds, now), percentiles)
+
+    def trend(self, key: SeriesKey, metric: str, seconds: Optional[float] = None,
+              now: Optional[float] = None) -> Optional[float]:
+        """
+        Estimate how fast a metric is changing.
+
+        Args:
+            key: (pid, create_time) of the process
+            metric: Metric name
+            seconds: Window length (default: everything stored)
+            now: End of the window (default: time.monotonic())
+
+        Returns:
+            Least-squares change per minute, or None with too few samples
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                return None
+            count = history.window_size(seconds, now)
+            times = history.times.latest(count)
+            values = history.series[metric].latest(count)
+
+        per_second = slope(times, values)
+        return None if per_second is None else per_second * 60
+
+    def keys(self) -> Tuple[SeriesKey, ...]:
+        """Return the keys of all tracked processes."""
+        with self._lock:
+            return tuple(self._histories)
+
+    def discard_pid(self, pid: int):
+        """Drop every history recorded for a PID (e.g. after it died)."""
+        with self._lock:
+            for key in [key for key in self._histories if key[0] == pid]:
+                del self._histories[key]
+
+    def sweep(self, active_pids: Iterable[int]):
+        """
+        Drop histories of processes that are no longer listening.
+
+        Args:
+            active_pids: PIDs seen in the latest scan
+        """
+        active = set(active_pids)
+        with self._lock:
+            for key in [key for key in self._histories if key[0] not in active]:
+                del self._histories[key]
+
+    def clear(self):
+        """Drop all histories."""
+        with self._lock:
+            self._histories.clear()
@@ -1,94 +1,933 @@
-"""Port scanning functionality using lsof."""
-
+"""Port scanning functionality with pluggable backends (lsof, /proc/net).
+
+Every backend finds TCP listeners and bound (unconnected) UDP sockets,
+IPv4 and IPv6, in a single pass. Each raw record is one socket: port, pid,
+name, protocol ('tcp'/'udp'), family ('ipv4'/'ipv6') and bind address.
+PortSnapshot merges the sockets of one (port, pid) into a single entry.
+"""
+
+import functools
+import os
+import shutil
+import signal
+import socket
+import struct
 import subprocess
 import re
-from typing import List, Dict, Optional
+import sys
+import threading
+from types import MappingProxyType
+from typing import FrozenSet, Iterable, Iterator, List, Dict, Mapping, Optional, Tuple
 
 import src.config as config
+import src.instrumentation as instrumentation
+import src.port_set as port_set
+from src.port_set import PortSet, PortSpec
+
+# Seconds before a hanging lsof is killed
+_LSOF_TIMEOUT = 5
+
+# Most ranges passed to lsof -i / compiled into inet_diag bytecode; larger
+# port sets get a covering filter and are narrowed with the bitset after
+_MAX_LSOF_RANGES = 64
+_MAX_BYTECODE_RANGES = 256
+
+# /proc/net tables: name -> (protocol, family, state code of a listener).
+# UDP has no LISTEN state: a bound, unconnected socket is in TCP_CLOSE (07).
+_PROC_NET_TABLES = {
+    "tcp": ("tcp", "ipv4", "0A"),
+    "tcp6": ("tcp", "ipv6", "0A"),
+    "udp": ("udp", "ipv4", "07"),
+    "udp6": ("udp", "ipv6", "07"),
+}
+
+# Address family names used in records
+_FAMILIES = {"ipv4": socket.AF_INET, "ipv6": socket.AF_INET6}
+
+# Netlink sock_diag constants (linux/netlink.h, linux/sock_diag.h, linux/inet_diag.h)
+_NETLINK_SOCK_DIAG = 4
+_SOCK_DIAG_BY_FAMILY = 20
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_INET_DIAG_REQ_BYTECODE = 1
+_INET_DIAG_BC_JMP = 1
+_INET_DIAG_BC_S_GE = 2
+_INET_DIAG_BC_S_LE = 3
+_TCP_LISTEN = 10
+_TCP_CLOSE = 7
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_INET_DIAG_REQ_V2 = struct.Struct("=BBBBI48s")
+_INET_DIAG_MSG = struct.Struct("=BBBB2s2s16s16sI8sIIIII")
+_RTATTR = struct.Struct("=HH")
+_BC_OP = struct.Struct("=BBH")
+
+
+def _socket_record(port: int, pid: int, name: str, listener: Tuple[int, str, str, str]) -> Dict[str, any]:
+    """Build the record for one socket from a (port, protocol, family, address) tuple."""
+    return {
+        'port': port,
+        'pid': pid,
+        'name': name,
+        'protocol': listener[1],
+        'family': listener[2],
+        'address': listener[3]
+    }
+
+
+class ScannerBackend:
+    """
+    Base class for port scanner backends.
 
-
-def scan_ports(start_port: int, end_port: int) -> List[Dict[str, any]]:
+    A backend returns raw socket records for a PortSet; filtering,
+    merging and indexing are handled by scan_snapshot().
     """
-    Scan for processes listening on localhost ports in the given range.
 
-    Args:
-        start_port: Starting port number
-        end_port: Ending port number
+    name = "base"
+
+    def __init__(self, protocols: Iterable[str] = ()):
+        """
+        Initialize the backend.
+
+        Args:
+            protocols: 'tcp' and/or 'udp' (default: config.SCAN_PROTOCOLS)
+        """
+        self.protocols = tuple(protocols) or tuple(config.SCAN_PROTOCOLS)
+
+    def is_available(self) -> bool:
+        """Return True if the backend can run on this machine."""
+        return False
+
+    def scan(self, ports: PortSet) -> List[Dict[str, any]]:
+        """
+        Find TCP listeners and bound UDP sockets on the given ports.
+
+        Args:
+            ports: Ports to report (see src.port_set)
+
+        Returns:
+            List of dictionaries with port, pid, process name, protocol,
+            family and bind address (one per socket)
+        """
+        raise NotImplementedError
 
-    Returns:
-        List of dictionaries with port, pid, and process name
-        Example: [{'port': 3000, 'pid': 12345, 'name': 'node'}]
-    """
-    processes = []
 
-    try:
-        # Run lsof to find listening TCP connections
-        # -i TCP - only TCP connections
-        # -sTCP:LISTEN - only listening sockets
+class LsofBackend(ScannerBackend):
+    """Scan listening sockets by running lsof (works on macOS and Linux)."""
+
+    name = "lsof"
+
+    def is_available(self) -> bool:
+        return shutil.which("lsof") is not None
+
+    def scan(self, ports: PortSet) -> List[Dict[str, any]]:
+        if not ports:
+            return []
+        try:
+            return parse_lsof_fields(self._lsof_lines(ports), ports)
+        except FileNotFoundError:
+            print("lsof command not found")
+        except Exception as e:
+            print(f"Error scanning ports: {e}")
+        return []
+
+    def _lsof_lines(self, ports: PortSet) -> Iterator[str]:
+        """
+        Run lsof for the port set and stream its field output line by line.
+
+        Yields:
+            Lines of `lsof -F pcfnPtT` output
+        """
         # -n - no hostname resolution (faster)
         # -P - no port name resolution (show numbers)
-        cmd = ["lsof", "-i", "TCP", "-sTCP:LISTEN", "-n", "-P"]
+        # -iTCP:<ports> / -iUDP:<ports> - only sockets on these ports (lsof
+        # skips the rest); <ports> is a list such as "3000-3999,5173"
+        cmd = ["lsof", "-n", "-P"]
+        port_list = ",".join(
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in ports.covering_ranges(_MAX_LSOF_RANGES)
+        )
+        for protocol in self.protocols:
+            cmd.append(f"-i{protocol.upper()}:{port_list}")
+
+        if "udp" in self.protocols:
+            # A TCP state inclusion list would hide UDP sockets, so only drop
+            # the bulk of non-listeners; the parser keeps TST=LISTEN
+            cmd.append("-sTCP:^ESTABLISHED,^CLOSE_WAIT")
+        else:
+            cmd.append("-sTCP:LISTEN")
 
-        result = subprocess.run(
+        # -F - machine-readable fields: pid, command, fd, name, protocol,
+        # type (IPv4/IPv6) and TCP info (state)
+        cmd += ["-F", "pcfnPtT"]
+
+        process = subprocess.Popen(
             cmd,
-            capture_output=True,
-            text=True,
-            timeout=5
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+
+        # Kill lsof if it hangs instead of blocking the scan forever
+        watchdog = threading.Timer(_LSOF_TIMEOUT, process.kill)
+        watchdog.start()
+        try:
+            yield from process.stdout
+        finally:
+            watchdog.cancel()
+            process.stdout.close()
+            process.wait()
+            if process.returncode == -signal.SIGKILL:
+                print("lsof command timed out")
+
+
+class ProcNetBackend(ScannerBackend):
+    """
+    Scan listening sockets by reading /proc/net/{tcp,udp}{,6} directly (Linux).
+
+    Avoids forking lsof on every refresh: the kernel tables are parsed for
+    listeners in range, and the socket inodes of all four tables are
+    resolved to PIDs in one walk of /proc/<pid>/fd.
+    """
+
+    name = "proc"
+
+    def __init__(self, proc_root: str = "/proc", protocols: Iterable[str] = ()):
+        """
+        Initialize the backend.
+
+        Args:
+            proc_root: Mount point of procfs (overridable for tests)
+            protocols: 'tcp' and/or 'udp' (default: config.SCAN_PROTOCOLS)
+        """
+        super().__init__(protocols)
+        self.proc_root = proc_root
+
+    def is_available(self) -> bool:
+        return sys.platform.startswith("linux") and os.path.exists(
+            os.path.join(self.proc_root, "net", "tcp")
         )
 
-        if result.returncode != 0:
-            # lsof returns 1 if no files found, which is ok
-            if result.returncode == 1:
+    def scan(self, ports: PortSet) -> List[Dict[str, any]]:
+        processes = []
+
+        try:
+            listeners = self._read_listening_inodes(ports)
+            if not listeners:
                 return processes
-            return processes
 
-        # Parse lsof output
-        lines = result.stdout.strip().split('\n')
+            processes = self._build_records(listeners)
 
-        # Skip header line
-        for line in lines[1:]:
-            parts = line.split()
-            if len(parts) < 9:
+        except Exception as e:
+            print(f"Error scanning ports: {e}")
+
+        return processes
+
+    def _build_records(self, listeners: Dict[int, Tuple[int, str, str, str]]) -> List[Dict[str, any]]:
+        """Resolve socket inodes to processes and build one record per socket."""
+        processes = []
+        for pid, inodes in self._map_inodes_to_pids(listeners).items():
+            name = self._read_process_name(pid)
+            if name is None:
                 continue
+            for inode in inodes:
+                listener = listeners[inode]
+                processes.append(_socket_record(listener[0], pid, name, listener))
+        return processes
 
-            process_name = parts[0]
-            pid = int(parts[1])
+    def _read_listening_inodes(self, ports: PortSet) -> Dict[int, Tuple[int, str, str, str]]:
+        """
+        Parse /proc/net/{tcp,udp}{,6} for listeners on the given ports.
 
-            # The network info is usually in format like: *:3000 or localhost:3000 or 127.0.0.1:3000
-            network_info = parts[8]
+        Returns:
+            Dictionary of socket inode -> (port, protocol, family, address)
+        """
+        listeners = {}
 
-            # Extract port number
-            port_match = re.search(r':(\d+)', network_info)
-            if not port_match:
+        for table, (protocol, family, listen_state) in _PROC_NET_TABLES.items():
+            if protocol not in self.protocols:
                 continue
 
-            port = int(port_match.group(1))
-
-            # Filter by port range
-            if start_port <= port <= end_port:
-                # Check if already in list (sometimes lsof shows same process multiple times)
-                if not any(p['port'] == port and p['pid'] == pid for p in processes):
-                    processes.append({
-                        'port': port,
-                        'pid': pid,
-                        'name': process_name
-                    })
-
-    except subprocess.TimeoutExpired:
-        print("lsof command timed out")
-    except FileNotFoundError:
-        print("lsof command not found")
-    except Exception as e:
-        print(f"Error scanning ports: {e}")
+            path = os.path.join(self.proc_root, "net", table)
+            try:
+                with open(path) as f:
+                    lines = f.readlines()
+            except OSError:
+                continue
+
+            # Skip header line
+            for line in lines[1:]:
+                parts = line.split()
+                if len(parts) < 10 or parts[3] != listen_state:
+                    continue
+
+                # local_address is HEXADDR:HEXPORT
+                address, port = parts[1].split(":")
+                port = int(port, 16)
+                if port not in ports:
+                    continue
+
+                inode = int(parts[9])
+                if inode:
+                    listeners[inode] = (port, protocol, family, _decode_proc_address(family, address))
+
+        return listeners
+
+    def _map_inodes_to_pids(self, listeners: Dict[int, int]) -> Dict[int, List[int]]:
+        """
+        Find the processes holding the given socket inodes.
+
+        A listening socket may be shared by several processes (e.g. forked
+        workers), so every owner is reported, matching lsof.
+
+        Returns:
+            Dictionary of pid -> list of socket inodes it holds
+        """
+        owners = {}
+
+        for entry in os.scandir(self.proc_root):
+            if not entry.name.isdigit():
+                continue
+
+            fd_dir = os.path.join(entry.path, "fd")
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                # Process exited or belongs to another user
+                continue
+
+            for fd in fds:
+                try:
+                    target = os.readlink(os.path.join(fd_dir, fd))
+                except OSError:
+                    continue
+
+                # Socket fds link to "socket:[<inode>]"
+                if not target.startswith("socket:["):
+                    continue
+
+                inode = int(target[8:-1])
+                if inode in listeners:
+                    owners.setdefault(int(entry.name), []).append(inode)
+
+        return owners
+
+    def _read_process_name(self, pid: int) -> Optional[str]:
+        """Read the command name of a process, or None if it has exited."""
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "comm")) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+
+def _decode_proc_address(family: str, hex_address: str) -> str:
+    """
+    Decode an address from /proc/net (32-bit words in host byte order).
+
+    Args:
+        family: 'ipv4' or 'ipv6'
+        hex_address: e.g. "0100007F" for 127.0.0.1
+
+    Returns:
+        Printable address ("0.0.0.0" and "::" for wildcard binds)
+    """
+    packed = bytes.fromhex(hex_address)
+    if sys.byteorder == "little":
+        packed = b"".join(packed[i:i + 4][::-1] for i in range(0, len(packed), 4))
+    return socket.inet_ntop(_FAMILIES[family], packed)
+
+
+def build_port_range_bytecode(ranges: List[Tuple[int, int]]) -> bytes:
+    """
+    Compile port ranges into an inet_diag bytecode filter.
+
+    The kernel runs the program for every socket: a condition jumps `yes`
+    bytes forward when true and `no` bytes when false. Landing exactly on
+    the end of the program accepts the socket, jumping past it rejects.
+    Ranges are OR-ed the way ss(8) does it: a failed range falls through to
+    the next one, and a matched range hits a JMP that skips to the end.
+
+    Args:
+        ranges: List of (start_port, end_port) tuples (inclusive)
+
+    Returns:
+        Bytecode accepting sockets whose local port is in any of the ranges
+    """
+    op_size = _BC_OP.size
+    bytecode = b""
+
+    # Build from the last range backwards so each range knows what follows it
+    for start_port, end_port in reversed(ranges):
+        if bytecode:
+            # Matched: always jump over the remaining ranges (JMP takes `no`)
+            bytecode = _BC_OP.pack(_INET_DIAG_BC_JMP, op_size, len(bytecode) + op_size) + bytecode
+
+        # Port comparisons use two ops: the condition and the port operand.
+        # A miss skips this range and its JMP: onto the next range, or out of the program.
+        range_bytecode = (
+            _BC_OP.pack(_INET_DIAG_BC_S_GE, 2 * op_size, 4 * op_size + op_size)
+            + _BC_OP.pack(0, 0, start_port)
+            + _BC_OP.pack(_INET_DIAG_BC_S_LE, 2 * op_size, 2 * op_size + op_size)
+            + _BC_OP.pack(0, 0, end_port)
+        )
+        bytecode = range_bytecode + bytecode
+
+    return bytecode
+
+
+class NetlinkBackend(ProcNetBackend):
+    """
+    Scan listening sockets with NETLINK_SOCK_DIAG (inet_diag) on Linux.
+
+    The kernel only returns listeners (TCP LISTEN, unconnected UDP) whose
+    port passes a bytecode filter, so nothing outside the range is copied
+    to user space; all dumps share one netlink socket. The dump
+    also doubles as a cheap change detector: when the set of (inode, port)
+    pairs is unchanged since the previous scan, the cached records are
+    returned without walking /proc/<pid>/fd again.
+    """
+
+    name = "netlink"
+
+    def __init__(self, proc_root: str = "/proc", protocols: Iterable[str] = ()):
+        super().__init__(proc_root, protocols)
+        self._fingerprint: Optional[FrozenSet[Tuple[int, Tuple]]] = None
+        self._cached: List[Dict[str, any]] = []
+        self._sequence = 0
+
+    def is_available(self) -> bool:
+        if not sys.platform.startswith("linux") or not hasattr(socket, "AF_NETLINK"):
+            return False
+        try:
+            with self._open() as sock:
+                self._dump_listeners(sock, "ipv4", "tcp", PortSet([(0, 0)]))
+            return True
+        except OSError:
+            return False
+
+    def listeners_changed(self, ports: PortSet) -> bool:
+        """
+        Check whether the set of listening sockets changed since the last scan.
+
+        Args:
+            ports: Ports to check
+
+        Returns:
+            True if a scan would do full work
+        """
+        try:
+            listeners = self._read_listening_inodes(ports)
+        except OSError:
+            return True
+        return frozenset(listeners.items()) != self._fingerprint
+
+    def scan(self, ports: PortSet) -> List[Dict[str, any]]:
+        try:
+            listeners = self._read_listening_inodes(ports)
+        except OSError as e:
+            print(f"Error scanning ports: {e}")
+            return []
+
+        fingerprint = frozenset(listeners.items())
+        if fingerprint == self._fingerprint and self._owners_alive():
+            return list(self._cached)
+
+        processes = self._build_records(listeners)
+
+        self._fingerprint = fingerprint
+        self._cached = processes
+        return list(processes)
+
+    def _owners_alive(self) -> bool:
+        """Return True if every PID in the cached result still exists."""
+        return all(
+            os.path.exists(os.path.join(self.proc_root, str(proc['pid'])))
+            for proc in self._cached
+        )
+
+    def _read_listening_inodes(self, ports: PortSet) -> Dict[int, Tuple[int, str, str, str]]:
+        listeners = {}
+        if not ports:
+            return listeners
+        with self._open() as sock:
+            for protocol in self.protocols:
+                for family in _FAMILIES:
+                    listeners.update(self._dump_listeners(sock, family, protocol, ports))
+        return listeners
+
+    @staticmethod
+    def _open() -> socket.socket:
+        """Open a sock_diag netlink socket."""
+        return socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_SOCK_DIAG)
+
+    def _dump_listeners(self, sock: socket.socket, family: str, protocol: str,
+                        ports: PortSet) -> Dict[int, Tuple[int, str, str, str]]:
+        """
+        Dump the listeners of one protocol and address family on the given ports.
+
+        The kernel filters on the port ranges (or, for very fragmented
+        sets, on covering ranges narrowed here with the bitset).
+
+        Args:
+            sock: Netlink socket from _open()
+            family: 'ipv4' or 'ipv6'
+            protocol: 'tcp' (LISTEN sockets) or 'udp' (unconnected sockets)
+            ports: Ports to report
+
+        Returns:
+            Dictionary of socket inode -> (port, protocol, family, address)
+
+        Raises:
+            OSError: If the netlink request fails
+        """
+        if protocol == "udp":
+            ip_protocol, states = socket.IPPROTO_UDP, 1 << _TCP_CLOSE
+        else:
+            ip_protocol, states = socket.IPPROTO_TCP, 1 << _TCP_LISTEN
+        address_family = _FAMILIES[family]
+        address_size = 4 if address_family == socket.AF_INET else 16
+
+        bytecode = build_port_range_bytecode(list(ports.covering_ranges(_MAX_BYTECODE_RANGES)))
+        attribute = _RTATTR.pack(_RTATTR.size + len(bytecode), _INET_DIAG_REQ_BYTECODE)
+        request = _INET_DIAG_REQ_V2.pack(
+            address_family, ip_protocol, 0, 0, states, b""
+        ) + attribute + bytecode
+
+        self._sequence += 1
+        header = _NLMSGHDR.pack(
+            _NLMSGHDR.size + len(request), _SOCK_DIAG_BY_FAMILY,
+            _NLM_F_REQUEST | _NLM_F_DUMP, self._sequence, 0
+        )
+
+        listeners = {}
+        sock.sendall(header + request)
+
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+                if msg_type == _NLMSG_DONE:
+                    return listeners
+                if msg_type == _NLMSG_ERROR:
+                    error = -struct.unpack_from("=i", data, offset + _NLMSGHDR.size)[0]
+                    raise OSError(error, os.strerror(error))
+
+                msg = _INET_DIAG_MSG.unpack_from(data, offset + _NLMSGHDR.size)
+                inode = msg[-1]
+                port = int.from_bytes(msg[4], "big")
+                if inode and port in ports:
+                    address = socket.inet_ntop(address_family, msg[6][:address_size])
+                    listeners[inode] = (port, protocol, family, address)
+
+                # Messages are 4-byte aligned
+                offset += (length + 3) & ~3
+
+            if not data:
+                return listeners
+
+
+# Available backends
+BACKENDS = {
+    "netlink": NetlinkBackend,
+    "proc": ProcNetBackend,
+    "lsof": LsofBackend,
+}
+
+# Backends tried by "auto", in order (netlink is opt-in)
+AUTO_BACKENDS = ("proc", "lsof")
+
+_backend: Optional[ScannerBackend] = None
+
+
+def select_backend(preference: str = "auto") -> ScannerBackend:
+    """
+    Pick a scanner backend.
+
+    Args:
+        preference: Backend name from BACKENDS, or "auto" to use the first
+                    available one (falls back to lsof)
+
+    Returns:
+        Scanner backend instance
+    """
+    if preference != "auto":
+        backend_class = BACKENDS.get(preference)
+        if backend_class is None:
+            print(f"Unknown scanner backend '{preference}', using auto-detection")
+        else:
+            backend = backend_class()
+            if backend.is_available():
+                return backend
+            print(f"Scanner backend '{preference}' is not available, using auto-detection")
+
+    for name in AUTO_BACKENDS:
+        backend = BACKENDS[name]()
+        if backend.is_available():
+            return backend
+
+    return LsofBackend()
+
+
+def get_backend() -> ScannerBackend:
+    """Return the active scanner backend, selecting one on first use."""
+    global _backend
+    if _backend is None:
+        _backend = select_backend(config.SCANNER_BACKEND)
+    return _backend
+
+
+def set_backend(backend: Optional[ScannerBackend]):
+    """Override the active scanner backend (None re-runs auto-selection)."""
+    global _backend
+    _backend = backend
+
+
+def parse_lsof_fields(lines: Iterable[str], ports: PortSet) -> List[Dict[str, any]]:
+    """
+    Parse `lsof -F pcfnPtT` field output.
+
+    Each line starts with a field letter: 'p' opens a process set, 'c' is
+    its command name, 'f' opens one of its files (sockets), followed by
+    't' (IPv4/IPv6), 'P' (TCP/UDP), 'n' (for example "*:3000",
+    "127.0.0.1:3000" or "[::1]:3000") and 'T' lines ("ST=LISTEN").
+    Connected sockets ("->" in the name) and TCP sockets in any state other
+    than LISTEN are skipped. Missing fields default to TCP, a family
+    guessed from the address and LISTEN, so plain `-F pcn` output parses.
+
+    Args:
+        lines: lsof output lines (any iterable, e.g. a pipe)
+        ports: Ports to report (others are skipped)
+
+    Returns:
+        List of dictionaries with port, pid, process name, protocol,
+        family and address
+    """
+    processes = []
+    pid = None
+    process_name = None
+    socket_fields: Dict[str, str] = {}
+
+    def finish_socket():
+        """Turn the fields collected for the current socket into a record."""
+        name = socket_fields.get('n')
+        if pid is None or name is None or '->' in name:
+            return
+        if socket_fields.get('T', 'LISTEN') != 'LISTEN':
+            return
+
+        # Port is after the last colon (IPv6 addresses contain colons)
+        colon = name.rfind(':')
+        port_text = name[colon + 1:]
+        if not port_text.isdigit():
+            return
+        port = int(port_text)
+        if port not in ports:
+            return
+
+        address = name[:colon].strip('[]')
+        family = socket_fields.get('t', '').lower()
+        if family not in _FAMILIES:
+            family = 'ipv6' if ':' in address else 'ipv4'
+        if address == '*':
+            address = '0.0.0.0' if family == 'ipv4' else '::'
+
+        processes.append({
+            'port': port,
+            'pid': pid,
+            'name': process_name,
+            'protocol': socket_fields.get('P', 'TCP').lower(),
+            'family': family,
+            'address': address
+        })
+
+    for line in lines:
+        field = line[:1]
+        value = line[1:].rstrip('\n')
+
+        if field == 'T':
+            # TCP info: only the state matters ("ST=LISTEN")
+            if value.startswith('ST='):
+                socket_fields['T'] = value[3:]
+
+        elif field in ('f', 'p') or (field == 'n' and 'n' in socket_fields):
+            # A new socket (or process) starts: the previous socket is complete
+            finish_socket()
+            socket_fields = {}
+            if field == 'p':
+                pid = int(value)
+                process_name = None
+            elif field == 'n':
+                socket_fields['n'] = value
+
+        elif field == 'c':
+            process_name = value
+
+        elif field in ('n', 't', 'P'):
+            socket_fields[field] = value
+
+    finish_socket()
+    return processes
+
+
+# Per-socket record fields, folded into 'sockets' by PortSnapshot
+_SOCKET_FIELDS = ('protocol', 'family', 'address')
+
+
+def _merge_sockets(group: List[Mapping[str, any]]) -> Mapping[str, any]:
+    """
+    Merge the records of one (port, pid) into a read-only entry.
+
+    Args:
+        group: Records for the same listener, first one wins for other fields
+
+    Returns:
+        Entry with a 'sockets' tuple if any record has socket details
+    """
+    record = group[0]
+    if len(group) == 1 and 'protocol' not in record:
+        # Nothing to merge (e.g. an entry from a previous snapshot)
+        return record if isinstance(record, MappingProxyType) else MappingProxyType(dict(record))
+
+    sockets = set()
+    for duplicate in group:
+        sockets.update(duplicate.get('sockets', ()))
+        if 'protocol' in duplicate:
+            sockets.add((duplicate['protocol'], duplicate['family'], duplicate['address']))
+
+    entry = {k: v for k, v in record.items() if k not in _SOCKET_FIELDS}
+    if sockets:
+        entry['sockets'] = tuple(sorted(sockets))
+    return MappingProxyType(entry)
+
+
+class PortSnapshot:
+    """
+    Immutable, indexed view of the listeners found by one scan.
+
+    Records are merged per (port, pid) and indexed by listener, port and
+    pid, so lookups in any direction are dictionary hits. Each entry is a
+    read-only mapping with at least 'port', 'pid' and 'name' (the scan
+    engine adds process metrics). When records carry socket details, the
+    entry lists every merged socket in 'sockets' as sorted
+    (protocol, family, address) tuples instead, so a dual-stack server on
+    *:3000 and [::]:3000 is one entry. Entries are ordered by (port, pid).
+    """
+
+    __slots__ = ('_entries', '_listeners', '_by_port', '_by_pid', '_primary')
+
+    def __init__(self, records: Iterable[Mapping[str, any]] = ()):
+        """
+        Build the snapshot and its indexes.
+
+        Args:
+            records: Dictionaries with port, pid and name, optionally with
+                     protocol, family and address (duplicates allowed)
+        """
+        groups: Dict[Tuple[int, int], List[Mapping[str, any]]] = {}
+        for record in records:
+            key = (record['port'], record['pid'])
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [record]
+            else:
+                # Another socket of the same listener (IPv4/IPv6, TCP/UDP)
+                group.append(record)
+
+        listeners: Dict[Tuple[int, int], Mapping[str, any]] = {}
+        by_port: Dict[int, List[Mapping[str, any]]] = {}
+        by_pid: Dict[int, List[int]] = {}
+
+        for key in sorted(groups):
+            entry = _merge_sockets(groups[key])
+            listeners[key] = entry
+            by_port.setdefault(key[0], []).append(entry)
+            by_pid.setdefault(key[1], []).append(key[0])
+
+        self._listeners = MappingProxyType(listeners)
+        self._by_port = {port: tuple(entries) for port, entries in by_port.items()}
+        self._by_pid = {pid: tuple(ports) for pid, ports in by_pid.items()}
+        self._entries = tuple(listeners.values())
+
+        # First process on each port
+        self._primary = MappingProxyType({port: entries[0] for port, entries in self._by_port.items()})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Mapping[str, any]]:
+        return iter(self._entries)
+
+    def __contains__(self, port: int) -> bool:
+        return port in self._by_port
+
+    def __repr__(self) -> str:
+        return f"PortSnapshot({len(self._entries)} entries, {len(self._by_pid)} pids)"
+
+    @property
+    def ports(self) -> Tuple[int, ...]:
+        """Listening ports, sorted."""
+        return tuple(self._by_port)
+
+    @property
+    def pids(self) -> Tuple[int, ...]:
+        """PIDs with at least one listening socket, in port order."""
+        return tuple(self._by_pid)
+
+    @property
+    def listeners(self) -> Mapping[Tuple[int, int], Mapping[str, any]]:
+        """Read-only (port, pid) -> entry mapping (what the menu shows)."""
+        return self._listeners
+
+    @property
+    def primary(self) -> Mapping[int, Mapping[str, any]]:
+        """Read-only port -> entry mapping (first process per port)."""
+        return self._primary
+
+    def lookup(self, port: int) -> Optional[Mapping[str, any]]:
+        """
+        Get the process listening on a port.
+
+        Args:
+            port: Port number
+
+        Returns:
+            First entry for the port, or None if nothing listens on it
+        """
+        return self._primary.get(port)
+
+    def entries_for_port(self, port: int) -> Tuple[Mapping[str, any], ...]:
+        """Return every entry for a port (several processes can share one)."""
+        return self._by_port.get(port, ())
+
+    def ports_of(self, pid: int) -> Tuple[int, ...]:
+        """Return the sorted ports a process listens on."""
+        return self._by_pid.get(pid, ())
+
+    def records(self) -> List[Dict[str, any]]:
+        """Return the entries as a list of plain dictionaries."""
+        return [dict(entry) for entry in self._entries]
+
+
+# Most recent scan_snapshot() result (swapped atomically, never mutated)
+_latest_snapshot: Optional[PortSnapshot] = None
+
+
+def scan_snapshot(ports: Optional[PortSpec] = None,
+                  end_port: Optional[int] = None) -> PortSnapshot:
+    """
+    Scan the given ports and build a filtered, indexed snapshot.
+
+    The result also becomes the one returned by latest_port_snapshot().
+
+    Args:
+        ports: PortSet, spec string such as "3000-3999, 5173", (start, end)
+            tuple or None for config.PORTS; with end_port, the start port
+        end_port: Ending port number of a start_port, end_port range
+
+    Returns:
+        PortSnapshot of the listening processes
+    """
+    global _latest_snapshot
+
+    with instrumentation.span("scan_ports"):
+        if end_port is not None:
+            ports = (ports, end_port)
+        records = get_backend().scan(port_set.coerce(ports))
 
     # Apply filtering
     if config.FILTER_MODE != "off":
-        processes = filter_processes(processes)
+        with instrumentation.span("filter_processes"):
+            records = filter_processes(records)
 
-    # Sort by port number
-    processes.sort(key=lambda x: x['port'])
+    snapshot = PortSnapshot(records)
+    _latest_snapshot = snapshot
+    return snapshot
 
-    return processes
+
+def latest_port_snapshot() -> Optional[PortSnapshot]:
+    """Return the most recent scan_snapshot() result (None before the first scan)."""
+    return _latest_snapshot
+
+
+def scan_ports(ports: Optional[PortSpec] = None,
+               end_port: Optional[int] = None) -> List[Dict[str, any]]:
+    """
+    Scan for processes listening on the given localhost ports.
+
+    Accepts the old scan_ports(start_port, end_port) form as well.
+
+    Args:
+        ports: PortSet, spec string such as "3000-3999, 5173", (start, end)
+            tuple or None for config.PORTS; with end_port, the start port
+        end_port: Ending port number of a start_port, end_port range
+
+    Returns:
+        List of dictionaries with port, pid, and process name, sorted by port
+        Example: [{'port': 3000, 'pid': 12345, 'name': 'node'}]
+    """
+    return scan_snapshot(ports, end_port).records()
+
+
+class ProcessMatcher:
+    """
+    Case-insensitive substring matcher for process names.
+
+    All patterns are compiled into a single alternation regex, and match
+    decisions are memoized per process name in a bounded LRU cache, so a
+    name seen on a previous refresh costs one dictionary lookup.
+    """
+
+    def __init__(self, patterns: List[str], cache_size: int = 4096):
+        """
+        Compile the patterns.
+
+        Args:
+            patterns: Substrings to look for in process names
+            cache_size: Maximum number of memoized process names
+        """
+        # Longest first so the alternation prefers the most specific pattern
+        unique = sorted({p.lower() for p in patterns if p}, key=len, reverse=True)
+        self._regex = re.compile("|".join(map(re.escape, unique))) if unique else None
+        self.matches = functools.lru_cache(maxsize=cache_size)(self._matches)
+
+    def _matches(self, name: str) -> bool:
+        """Return True if any pattern occurs in the name."""
+        return self._regex is not None and self._regex.search(name.lower()) is not None
+
+
+# Compiled matcher and the config it was built from
+_matcher: Optional[ProcessMatcher] = None
+_matcher_source: Optional[Tuple] = None
+
+
+def get_process_matcher() -> Optional[ProcessMatcher]:
+    """
+    Return the matcher for the current filter mode.
+
+    The matcher is rebuilt only when FILTER_MODE or the configured
+    whitelist/blacklist changes.
+
+    Returns:
+        ProcessMatcher for the active list, or None if filtering is off
+    """
+    global _matcher, _matcher_source
+
+    if config.FILTER_MODE == "whitelist":
+        source = (config.FILTER_MODE, tuple(config.DEV_PROCESS_WHITELIST))
+    elif config.FILTER_MODE == "blacklist":
+        source = (config.FILTER_MODE, tuple(config.SYSTEM_PROCESS_BLACKLIST))
+    else:
+        return None
+
+    if source != _matcher_source:
+        _matcher = ProcessMatcher(list(source[1]))
+        _matcher_source = source
+
+    return _matcher
 
 
 def filter_processes(processes: List[Dict[str, any]]) -> List[Dict[str, any]]:
@@ -104,64 +943,35 @@ def filter_processes(processes: List[Dict[str, any]]) -> List[Dict[str, any]]:
     if config.FILTER_MODE == "off":
         return processes
 
-    filtered = []
-
-    for proc in processes:
-        process_name_lower = proc['name'].lower()
-
-        if config.FILTER_MODE == "whitelist":
-            # Only include if in whitelist
-            if any(dev_tool.lower() in process_name_lower
-                   for dev_tool in config.DEV_PROCESS_WHITELIST):
-                filtered.append(proc)
+    matcher = get_process_matcher()
+    if matcher is None:
+        # Unknown filter mode
+        return []
 
-        elif config.FILTER_MODE == "blacklist":
-            # Include unless in blacklist
-            if not any(sys_app.lower() in process_name_lower
-                      for sys_app in config.SYSTEM_PROCESS_BLACKLIST):
-                filtered.append(proc)
+    if config.FILTER_MODE == "whitelist":
+        # Only include if in whitelist
+        return [proc for proc in processes if matcher.matches(proc['name'])]
 
-    return filtered
+    # Blacklist: include unless in blacklist
+    return [proc for proc in processes if not matcher.matches(proc['name'])]
 
 
 def get_process_by_port(port: int) -> Optional[Dict[str, any]]:
     """
     Get process information for a specific port.
 
+    Answered from the latest scan snapshot; a scan only runs if there has
+    not been one yet.
+
     Args:
         port: Port number to check
 
     Returns:
         Dictionary with process info or None if not found
     """
-    try:
-        cmd = ["lsof", "-i", f"TCP:{port}", "-sTCP:LISTEN", "-n", "-P"]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+    snapshot = latest_port_snapshot()
+    if snapshot is None:
+        snapshot = scan_snapshot()
 
-        if result.returncode != 0:
-            return None
-
-        lines = result.stdout.strip().split('\n')
-        if len(lines) < 2:
-            return None
-
-        # Parse first matching line
-        parts = lines[1].split()
-        if len(parts) < 9:
-            return None
-
-        return {
-            'port': port,
-            'pid': int(parts[1]),
-            'name': parts[0]
-        }
-
-    except Exception as e:
-        print(f"Error getting process for port {port}: {e}")
-        return None
+    entry = snapshot.lookup(port)
+    return dict(entry) if entry is not None else None
@@ -0,0 +1,180 @@
+"""Sparse port selections compiled into a 65536-bit bitset.
+
+PORTS in config.py is a list of ranges and single ports:
+
+    PORTS = "3000-3999, 5173, 5432, 8000-8999, 9229"
+
+PortSet.parse() turns it into merged, sorted ranges (for the backends'
+own filters: lsof -i port lists, inet_diag bytecode) and an 8 KiB bitset,
+so `port in ports` in the scan loops is one byte lookup and a shift
+however many ranges there are.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import src.config as config
+
+MAX_PORT = 65535
+
+_BITSET_BYTES = (MAX_PORT + 1) // 8
+
+
+class PortSet:
+    """Immutable set of ports: merged ranges plus a membership bitset."""
+
+    __slots__ = ('ranges', '_bits', '_count')
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]] = ()):
+        """
+        Build a set from (start, end) ranges (inclusive, any order, may overlap).
+
+        Args:
+            ranges: Port ranges within 0..MAX_PORT
+
+        Raises:
+            ValueError: If a port is out of range or a range is reversed
+        """
+        merged: List[List[int]] = []
+        for start, end in sorted(ranges):
+            if not 0 <= start <= end <= MAX_PORT:
+                raise ValueError(f"Invalid port range {start}-{end}")
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        self.ranges: Tuple[Tuple[int, int], ...] = tuple((start, end) for start, end in merged)
+
+        mask = 0
+        for start, end in self.ranges:
+            mask |= ((1 << (end - start + 1)) - 1) << start
+        self._bits = mask.to_bytes(_BITSET_BYTES, "little")
+        self._count = sum(end - start + 1 for start, end in self.ranges)
+
+    @classmethod
+    def parse(cls, spec: str) -> "PortSet":
+        """
+        Parse a port list such as "3000-3999, 5173, 8000-8999".
+
+        Args:
+            spec: Comma-separated single ports and inclusive ranges
+
+        Returns:
+            PortSet
+
+        Raises:
+            ValueError: If an item is not a port or a range of ports
+        """
+        ranges = []
+        for item in spec.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            start, separator, end = item.partition("-")
+            try:
+                start_port = int(start)
+                end_port = int(end) if separator else start_port
+            except ValueError:
+                raise ValueError(f"Invalid port or range {item!r} in {spec!r}") from None
+            ranges.append((start_port, end_port))
+        return cls(ranges)
+
+    def __contains__(self, port: int) -> bool:
+        return 0 <= port <= MAX_PORT and bool(self._bits[port >> 3] >> (port & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in self.ranges:
+            yield from range(start, end + 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return bool(self.ranges)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PortSet) and self.ranges == other.ranges
+
+    def __hash__(self) -> int:
+        return hash(self.ranges)
+
+    def __str__(self) -> str:
+        return ", ".join(
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in self.ranges
+        )
+
+    def __repr__(self) -> str:
+        return f"PortSet({str(self)!r})"
+
+    def covering_ranges(self, max_ranges: int) -> Tuple[Tuple[int, int], ...]:
+        """
+        Return at most `max_ranges` ranges covering every port of the set.
+
+        For filters that only take a limited number of ranges: the
+        smallest gaps between ranges are closed first, so the result lets
+        through as few extra ports as possible (check membership after).
+
+        Args:
+            max_ranges: Maximum number of ranges (at least 1)
+
+        Returns:
+            Sorted (start, end) tuples; the exact ranges if they fit
+        """
+        if len(self.ranges) <= max_ranges:
+            return self.ranges
+
+        gaps = sorted(
+            range(len(self.ranges) - 1),
+            key=lambda index: self.ranges[index + 1][0] - self.ranges[index][1]
+        )
+        closed = set(gaps[:len(self.ranges) - max(max_ranges, 1)])
+
+        covering = []
+        start = self.ranges[0][0]
+        for index, (_, end) in enumerate(self.ranges):
+            if index not in closed:
+                covering.append((start, end))
+                if index + 1 < len(self.ranges):
+                    start = self.ranges[index + 1][0]
+        return tuple(covering)
+
+
+PortSpec = Union[PortSet, str, int, Tuple[int, int]]
+
+
+def coerce(ports: Optional[PortSpec]) -> PortSet:
+    """
+    Turn any accepted port selection into a PortSet.
+
+    Args:
+        ports: PortSet, spec string ("3000-3999, 5173"), single port,
+            (start, end) tuple, or None for config.PORTS
+
+    Returns:
+        PortSet
+    """
+    if ports is None:
+        return configured_ports()
+    if isinstance(ports, PortSet):
+        return ports
+    if isinstance(ports, str):
+        return PortSet.parse(ports)
+    if isinstance(ports, int):
+        return PortSet([(ports, ports)])
+    return PortSet([tuple(ports)])
+
+
+# config.PORTS and its compiled PortSet (recompiled only when the setting changes)
+_configured: Tuple[Optional[str], PortSet] = (None, PortSet())
+
+
+def configured_ports() -> PortSet:
+    """Return config.PORTS as a PortSet (parsed once per distinct value)."""
+    global _configured
+
+    spec, ports = _configured
+    if spec != config.PORTS:
+        ports = PortSet.parse(config.PORTS)
+        _configured = (config.PORTS, ports)
+    return ports
@@ -0,0 +1,246 @@
+"""Concurrent health and latency probes of listening ports.
+
+A process holding a port is not necessarily answering on it: a dev server
+stuck in a blocking call still shows up in the scan. With ENABLE_PROBING
+the scan engine hands every TCP listener of a snapshot to the Prober,
+which connects to all of them concurrently on one asyncio event loop and
+(with PROBE_HTTP) sends "HEAD /" to time the first byte of the reply:
+
+    results = prober.probe_listeners(ports)
+    results[(3000, 4242)]
+    # {'probe_status': 'ok', 'connect_ms': 0.21, 'first_byte_ms': 14.8,
+    #  'latency': {'connect': {'p50_ms': 0.2, ...}, 'first_byte': {...}}}
+
+At most PROBE_CONCURRENCY probes are in flight, each bounded by its own
+timeouts. A listener is probed at most once per PROBE_INTERVAL, since dev
+servers usually log every request; in between the last result is reused.
+Every fresh latency also goes into the listener's windowed histograms
+(src.latency_histogram), summarized under 'latency'.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import src.config as config
+from src.latency_histogram import LatencyStore
+
+# Probe outcomes (probe_status)
+OK = "ok"  # connected and, with HTTP probes, got a first byte back
+NO_RESPONSE = "no_response"  # connected, but no reply within the timeout
+CLOSED = "closed"  # connected, then closed without replying
+REFUSED = "refused"  # nothing accepted the connection
+TIMEOUT = "timeout"  # the connection did not complete within the timeout
+ERROR = "error"  # any other socket error
+
+# Result fields kept in the latency histograms -> metric name
+_TIMED_FIELDS = (('connect_ms', 'connect'), ('first_byte_ms', 'first_byte'))
+
+# Where to connect for a wildcard bind address
+_LOOPBACK = {"0.0.0.0": "127.0.0.1", "::": "::1"}
+
+
+def probe_target(entry: Mapping[str, any]) -> Optional[str]:
+    """
+    Pick the address to probe a listener on.
+
+    Args:
+        entry: Snapshot entry (with 'sockets', or the singular protocol,
+            family and address fields of a raw record)
+
+    Returns:
+        Host to connect to, preferring IPv4; None if the listener has no
+        TCP socket (UDP-only). Entries without socket details use 127.0.0.1.
+    """
+    sockets = entry.get('sockets')
+    if sockets is None:
+        if 'protocol' not in entry:
+            return "127.0.0.1"
+        sockets = ((entry['protocol'], entry['family'], entry['address']),)
+
+    tcp = [(family, address) for protocol, family, address in sockets if protocol == "tcp"]
+    if not tcp:
+        return None
+    family, address = min(tcp, key=lambda socket_info: socket_info[0] != "ipv4")
+    return _LOOPBACK.get(address, address)
+
+
+async def probe_port(host: str, port: int, http: bool = True,
+                     connect_timeout: float = 1.0,
+                     response_timeout: float = 2.0) -> Dict[str, any]:
+    """
+    Probe one port: TCP connect, then optionally HEAD / and wait for a byte.
+
+    Args:
+        host: Address to connect to
+        port: Port number
+        http: Send "HEAD /" and time the first byte of the reply
+        connect_timeout: Seconds allowed for the connection
+        response_timeout: Seconds allowed for the first byte
+
+    Returns:
+        Dict with probe_status (see the outcomes above), connect_ms once
+        connected and first_byte_ms (from sending the request) if a byte came
+    """
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), connect_timeout
+        )
+    except asyncio.TimeoutError:
+        return {'probe_status': TIMEOUT}
+    except ConnectionRefusedError:
+        return {'probe_status': REFUSED}
+    except OSError:
+        return {'probe_status': ERROR}
+
+    result = {
+        'probe_status': OK,
+        'connect_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+    try:
+        if http:
+            host_header = f"[{host}]" if ":" in host else host
+            writer.write(
+                f"HEAD / HTTP/1.1\r\nHost: {host_header}:{port}\r\n"
+                f"User-Agent: localhost-monitor\r\nConnection: close\r\n\r\n".encode()
+            )
+            await writer.drain()
+            sent = time.perf_counter()
+
+            first = await asyncio.wait_for(reader.read(1), response_timeout)
+            if first:
+                result['first_byte_ms'] = round((time.perf_counter() - sent) * 1000, 2)
+            else:
+                result['probe_status'] = CLOSED
+    except asyncio.TimeoutError:
+        result['probe_status'] = NO_RESPONSE
+    except OSError:
+        result['probe_status'] = CLOSED
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    return result
+
+
+class Prober:
+    """
+    Probes listeners concurrently and remembers the latest result of each.
+
+    probe() runs its own event loop to completion, so call it from a
+    worker thread (the scan engine's), never from the UI thread.
+    """
+
+    def __init__(self, concurrency: int = config.PROBE_CONCURRENCY,
+                 connect_timeout: float = config.PROBE_CONNECT_TIMEOUT,
+                 response_timeout: float = config.PROBE_RESPONSE_TIMEOUT,
+                 interval: float = config.PROBE_INTERVAL,
+                 http: bool = config.PROBE_HTTP):
+        """
+        Initialize the prober.
+
+        Args:
+            concurrency: Maximum number of probes in flight
+            connect_timeout: Seconds allowed per connection
+            response_timeout: Seconds allowed per first byte
+            interval: Seconds before the same listener is probed again
+            http: Send "HEAD /" after connecting
+        """
+        self.concurrency = concurrency
+        self.connect_timeout = connect_timeout
+        self.response_timeout = response_timeout
+        self.interval = interval
+        self.http = http
+
+        self._lock = threading.Lock()
+        # (port, pid) -> (monotonic time probed, result)
+        self._results: Dict[Tuple[int, int], Tuple[float, Dict[str, any]]] = {}
+        self.latency = LatencyStore()  # (port, pid) -> windowed histograms
+
+    def probe(self, entries: Iterable[Mapping[str, any]]) -> Dict[Tuple[int, int], Dict[str, any]]:
+        """
+        Probe the listeners that are due and return results for all of them.
+
+        Args:
+            entries: Snapshot entries (port, pid and socket details)
+
+        Returns:
+            Dict of (port, pid) -> result of probe_port() plus 'latency'
+            (metric -> LatencyStore summary over the kept windows, once
+            a latency was measured);
+            UDP-only listeners are left out. Results and histograms of
+            listeners that are gone are forgotten.
+        """
+        now = time.monotonic()
+        targets: Dict[Tuple[int, int], Tuple[str, int]] = {}
+        with self._lock:
+            due: Dict[Tuple[int, int], Tuple[str, int]] = {}
+            for entry in entries:
+                host = probe_target(entry)
+                if host is None:
+                    continue
+                key = (entry['port'], entry['pid'])
+                targets[key] = (host, entry['port'])
+                previous = self._results.get(key)
+                if previous is None or not 0 <= now - previous[0] < self.interval:
+                    due[key] = targets[key]
+
+        fresh = asyncio.run(self._probe_all(due)) if due else {}
+
+        with self._lock:
+            for key, result in fresh.items():
+                self._results[key] = (now, result)
+                for field, metric in _TIMED_FIELDS:
+                    if field in result:
+                        self.latency.record(key, metric, result[field], now)
+            self._results = {
+                key: self._results[key] for key in targets if key in self._results
+            }
+            self.latency.forget(self._results)
+            results = {}
+            for key, (_, result) in self._results.items():
+                latency = self.latency.summaries(key, now)
+                results[key] = {**result, 'latency': latency} if latency else result
+            return results
+
+    async def _probe_all(self, targets: Mapping[Tuple[int, int], Tuple[str, int]]
+                         ) -> Dict[Tuple[int, int], Dict[str, any]]:
+        """Run the probes, at most `concurrency` at a time."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(host: str, port: int) -> Dict[str, any]:
+            async with semaphore:
+                return await probe_port(host, port, self.http,
+                                        self.connect_timeout, self.response_timeout)
+
+        results = await asyncio.gather(*(bounded(host, port) for host, port in targets.values()))
+        return dict(zip(targets, results))
+
+
+_prober: Optional[Prober] = None
+_prober_lock = threading.Lock()
+
+
+def probe_listeners(entries: Iterable[Mapping[str, any]]) -> Dict[Tuple[int, int], Dict[str, any]]:
+    """
+    Probe listeners with the shared Prober (created on first use from config).
+
+    Args:
+        entries: Snapshot entries
+
+    Returns:
+        Dict of (port, pid) -> probe result (see Prober.probe)
+    """
+    global _prober
+
+    with _prober_lock:
+        if _prober is None:
+            _prober = Prober()
+        prober = _prober
+    return prober.probe(entries)
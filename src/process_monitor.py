@@ -4,20 +4,353 @@ import psutil
 import time
 import signal
 import os
-from typing import Dict, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import src.config as config
+from src.metrics_store import MetricsStore
 
-# Cache for process objects to maintain CPU measurement state
-_process_cache: Dict[int, psutil.Process] = {}
 
+class ProcessRecord:
+    """Cached psutil.Process for one (pid, create_time) identity."""
 
-def get_process_info(pid: int) -> Optional[Dict[str, any]]:
+    __slots__ = ('pid', 'create_time', 'process', 'last_used')
+
+    def __init__(self, pid: int, create_time: float, process: psutil.Process, last_used: float):
+        self.pid = pid
+        self.create_time = create_time
+        self.process = process
+        self.last_used = last_used
+
+
+class ProcessCache:
+    """
+    Bounded cache of psutil.Process objects.
+
+    Records are keyed on (pid, create_time), so a reused PID never returns
+    the previous process's object. Memory stays flat over long runs:
+    records are evicted least-recently-used beyond `max_size`, after
+    `ttl` seconds without use, and when their PID drops out of a scan.
+    Thread-safe: kills on worker threads discard records while the scan
+    worker looks processes up and sweeps.
+    """
+
+    def __init__(self, max_size: int = config.PROCESS_CACHE_MAX_SIZE,
+                 ttl: float = config.PROCESS_CACHE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached processes
+            ttl: Seconds an unused record is kept
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._records: "OrderedDict[Tuple[int, float], ProcessRecord]" = OrderedDict()
+        self._keys: Dict[int, Tuple[int, float]] = {}  # pid -> current key
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def get(self, pid: int) -> psutil.Process:
+        """
+        Return the process object for a PID, creating it on a miss.
+
+        Raises:
+            psutil.NoSuchProcess: If the process does not exist
+        """
+        now = time.monotonic()
+        with self._lock:
+            key = self._keys.get(pid)
+
+            if key is not None:
+                record = self._records[key]
+                # is_running() compares create_time, catching PID reuse
+                if now - record.last_used <= self.ttl and record.process.is_running():
+                    record.last_used = now
+                    self._records.move_to_end(key)
+                    self.hits += 1
+                    return record.process
+                self._evict(key)
+
+            self.misses += 1
+            process = psutil.Process(pid)
+            key = (pid, process.create_time())
+            self._records[key] = ProcessRecord(pid, key[1], process, now)
+            self._keys[pid] = key
+
+            while len(self._records) > self.max_size:
+                self._evict(next(iter(self._records)))
+
+            return process
+
+    def discard(self, pid: int):
+        """Drop the record for a PID (e.g. after it died)."""
+        with self._lock:
+            key = self._keys.get(pid)
+            if key is not None:
+                self._evict(key)
+
+    def sweep(self, active_pids: Iterable[int]):
+        """
+        Evict records whose PID is not in the latest scan or whose TTL expired.
+
+        Args:
+            active_pids: PIDs seen in the latest scan
+        """
+        active = set(active_pids)
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            for key, record in list(self._records.items()):
+                if record.pid not in active or record.last_used < deadline:
+                    self._evict(key)
+
+    def clear(self):
+        """Drop all records (counters are kept)."""
+        with self._lock:
+            self._records.clear()
+            self._keys.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return cache counters.
+
+        Returns:
+            Dictionary with size, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                'size': len(self._records),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _evict(self, key: Tuple[int, float]):
+        """Remove one record (the lock is held by the caller)."""
+        self._records.pop(key, None)
+        if self._keys.get(key[0]) == key:
+            del self._keys[key[0]]
+        self.evictions += 1
+
+
+# Cache for process objects (avoids re-creating psutil.Process every refresh)
+_process_cache = ProcessCache()
+
+# Seconds to wait for processes to disappear after SIGKILL
+_FORCE_KILL_WAIT = 1.0
+
+# Attributes read per process by get_processes_info() in one as_dict() call
+_BATCH_ATTRS = ('name', 'create_time', 'memory_info', 'cpu_times')
+
+
+class CpuSampler:
+    """
+    Non-blocking CPU usage sampler.
+
+    Instead of sleeping inside cpu_percent(interval=...) for every PID, the
+    sampler records each process's cumulative CPU time and computes the
+    percentage from the delta since the previous refresh. The first sample
+    of a process returns 0.0, like psutil's cpu_percent(interval=None).
+    """
+
+    def __init__(self):
+        # pid -> (create_time, total cpu seconds, monotonic timestamp)
+        self._last: Dict[int, Tuple[float, float, float]] = {}
+
+    def sample_times(self, readings: Dict[int, Tuple[float, float]]) -> Dict[int, float]:
+        """
+        Compute CPU usage for all given processes from CPU times already read.
+
+        State for PIDs that are not in `readings` is dropped, so memory is
+        bounded by the number of listening processes.
+
+        Args:
+            readings: pid -> (create_time, user + system CPU seconds)
+
+        Returns:
+            Dictionary of pid -> CPU percent
+        """
+        now = time.monotonic()
+        previous = self._last
+        self._last = {}
+
+        return {
+            pid: self._update(pid, create_time, total, now, previous)
+            for pid, (create_time, total) in readings.items()
+        }
+
+    def sample_one(self, pid: int) -> Optional[float]:
+        """
+        Sample CPU usage for a single PID without dropping other state.
+
+        Args:
+            pid: Process ID
+
+        Returns:
+            CPU percent, or None if the process is gone or inaccessible
+        """
+        return self._measure(pid, time.monotonic(), self._last)
+
+    def clear(self):
+        """Forget all recorded CPU times."""
+        self._last.clear()
+
+    def _measure(self, pid: int, now: float,
+                 previous: Dict[int, Tuple[float, float, float]]) -> Optional[float]:
+        """Record the CPU time of a process and return usage since the last record."""
+        try:
+            process = _get_cached_process(pid)
+            with process.oneshot():
+                cpu_times = process.cpu_times()
+                create_time = process.create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            _process_cache.discard(pid)
+            return None
+
+        return self._update(pid, create_time, cpu_times.user + cpu_times.system, now, previous)
+
+    def _update(self, pid: int, create_time: float, total: float, now: float,
+                previous: Dict[int, Tuple[float, float, float]]) -> float:
+        """Store a CPU time reading and return usage since the previous one."""
+        last = previous.get(pid)
+        self._last[pid] = (create_time, total, now)
+
+        # No baseline yet, or the PID was reused by a new process
+        if last is None or last[0] != create_time or now <= last[2]:
+            return 0.0
+
+        return max(0.0, (total - last[1]) / (now - last[2]) * 100)
+
+
+_cpu_sampler = CpuSampler()
+
+# CPU/RAM history per (pid, create_time), trimmed together with the process cache
+_metrics_store = MetricsStore()
+
+
+def _get_cached_process(pid: int) -> psutil.Process:
+    """
+    Return a cached psutil.Process for a PID, replacing it if the PID was reused.
+
+    Raises:
+        psutil.NoSuchProcess: If the process does not exist
+    """
+    return _process_cache.get(pid)
+
+
+def sweep_process_cache(active_pids: Iterable[int]):
+    """
+    Drop cached processes (and their metric history) that are no longer listening.
+
+    Args:
+        active_pids: PIDs seen in the latest scan
+    """
+    active_pids = set(active_pids)
+    _process_cache.sweep(active_pids)
+    _metrics_store.sweep(active_pids)
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Return process cache counters (size, hits, misses, evictions).
+
+    Useful to confirm memory stays flat over long runs.
+    """
+    return _process_cache.stats()
+
+
+def get_metrics_store() -> MetricsStore:
+    """Return the store holding per-process CPU/RAM history."""
+    return _metrics_store
+
+
+def get_processes_info(pids: Iterable[int]) -> Dict[int, Dict[str, any]]:
+    """
+    Get process information for many PIDs in one pass.
+
+    Every attribute a refresh needs (name, create time, memory, CPU times)
+    is read in a single as_dict() call, which runs under oneshot(), and CPU
+    usage comes from the same reading, so there is no separate CPU pass.
+    Access-denied attributes come back as None instead of raising; such
+    processes, like dead ones, are left out.
+
+    Args:
+        pids: Process IDs (duplicates are looked up once)
+
+    Returns:
+        Dictionary of pid -> process information (see get_process_info)
+    """
+    readings = {}
+    for pid in dict.fromkeys(pids):
+        try:
+            values = _get_cached_process(pid).as_dict(_BATCH_ATTRS, ad_value=None)
+        except psutil.NoSuchProcess:
+            _process_cache.discard(pid)
+            _metrics_store.discard_pid(pid)
+            continue
+        except Exception as e:
+            print(f"Error getting process info for PID {pid}: {e}")
+            continue
+
+        if values['memory_info'] is None or values['create_time'] is None:
+            continue  # access denied
+        readings[pid] = values
+
+    cpu_usage = _cpu_sampler.sample_times({
+        pid: (values['create_time'], values['cpu_times'].user + values['cpu_times'].system)
+        for pid, values in readings.items()
+        if values['cpu_times'] is not None
+    })
+
+    now = time.time()
+    return {
+        pid: _describe(pid, values['name'] or '', values['create_time'],
+                       values['memory_info'].rss, cpu_usage.get(pid, 0.0), now)
+        for pid, values in readings.items()
+    }
+
+
+def _describe(pid: int, name: str, create_time: float, rss: int,
+              cpu_percent: float, now: float) -> Dict[str, any]:
+    """Record a sample in the metric history and build the process info dict."""
+    memory_mb = rss / (1024 * 1024)
+    uptime_seconds = int(now - create_time)
+
+    # Record this sample and read the recent trend back
+    key = (pid, create_time)
+    _metrics_store.record(key, {'cpu_percent': cpu_percent, 'memory_mb': memory_mb})
+    window = config.METRICS_TREND_WINDOW
+    memory_trend = _metrics_store.trend(key, 'memory_mb', window) or 0.0
+    cpu_avg = _metrics_store.stats(key, 'cpu_percent', window, percentiles=()).get(
+        'mean', cpu_percent)
+
+    return {
+        'pid': pid,
+        'name': name,
+        'memory_mb': round(memory_mb, 1),
+        'cpu_percent': round(cpu_percent, 1),
+        'uptime_seconds': uptime_seconds,
+        'uptime_formatted': format_uptime(uptime_seconds),
+        'memory_mb_trend': round(memory_trend, 2),
+        'cpu_percent_avg': round(cpu_avg, 1)
+    }
+
+
+def get_process_info(pid: int, cpu_percent: Optional[float] = None) -> Optional[Dict[str, any]]:
     """
     Get detailed information about a process.
 
     Args:
         pid: Process ID
+        cpu_percent: CPU usage measured by the caller; sampled on the spot if omitted
 
     Returns:
         Dictionary with process information or None if process not found
@@ -27,53 +360,29 @@ def get_process_info(pid: int) -> Optional[Dict[str, any]]:
             'memory_mb': 245.6,
             'cpu_percent': 12.5,
             'uptime_seconds': 8456,
-            'uptime_formatted': '2h 20m'
+            'uptime_formatted': '2h 20m',
+            'memory_mb_trend': 1.25,  # MB per minute over METRICS_TREND_WINDOW
+            'cpu_percent_avg': 8.3  # mean CPU over METRICS_TREND_WINDOW
         }
     """
     try:
-        # Use cached process object if available for accurate CPU measurement
-        if pid in _process_cache:
-            process = _process_cache[pid]
-            # Verify process is still the same (not reused PID)
-            if not process.is_running():
-                del _process_cache[pid]
-                process = psutil.Process(pid)
-                _process_cache[pid] = process
-        else:
-            process = psutil.Process(pid)
-            _process_cache[pid] = process
+        process = _get_cached_process(pid)
 
-        # Get memory info (in bytes, convert to MB)
-        memory_info = process.memory_info()
-        memory_mb = memory_info.rss / (1024 * 1024)
+        # CPU usage is the delta since the previous sample (non-blocking)
+        if cpu_percent is None:
+            cpu_percent = _cpu_sampler.sample_one(pid) or 0.0
 
-        # Get CPU percent with longer interval for more accurate measurement
-        # Using cached process object, subsequent calls return actual usage
-        # First call initializes the measurement, returns 0.0
-        # Subsequent calls return actual CPU usage since last call
-        cpu_percent = process.cpu_percent(interval=config.CPU_MEASUREMENT_INTERVAL)
+        with process.oneshot():
+            rss = process.memory_info().rss
+            create_time = process.create_time()
+            name = process.name()
 
-        # Get uptime
-        create_time = process.create_time()
-        uptime_seconds = int(time.time() - create_time)
-        uptime_formatted = format_uptime(uptime_seconds)
-
-        # Get process name
-        name = process.name()
-
-        return {
-            'pid': pid,
-            'name': name,
-            'memory_mb': round(memory_mb, 1),
-            'cpu_percent': round(cpu_percent, 1),
-            'uptime_seconds': uptime_seconds,
-            'uptime_formatted': uptime_formatted
-        }
+        return _describe(pid, name, create_time, rss, cpu_percent, time.time())
 
     except psutil.NoSuchProcess:
-        # Clean up cache if process no longer exists
-        if pid in _process_cache:
-            del _process_cache[pid]
+        # Clean up cache and history if process no longer exists
+        _process_cache.discard(pid)
+        _metrics_store.discard_pid(pid)
         return None
     except psutil.AccessDenied:
         # Sometimes we can't access process info
@@ -87,6 +396,8 @@ def clear_process_cache():
     """Clear the process cache. Useful for testing or cleanup."""
     global _process_cache
     _process_cache.clear()
+    _cpu_sampler.clear()
+    _metrics_store.clear()
 
 
 def format_uptime(seconds: int) -> str:
@@ -133,35 +444,113 @@ def kill_process(pid: int, force: bool = False) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        process = psutil.Process(pid)
+    return kill_processes([pid], force=force)[pid]
 
-        if force:
-            # Force kill
-            process.kill()  # SIGKILL
-        else:
-            # Graceful termination
-            process.terminate()  # SIGTERM
 
-        # Wait for process to terminate
-        try:
-            process.wait(timeout=3)
-        except psutil.TimeoutExpired:
-            # If still running after timeout, force kill
-            if not force:
-                return kill_process(pid, force=True)
+def collect_process_tree(pids: Iterable[int]) -> List[int]:
+    """
+    Expand PIDs to include all of their descendants.
 
-        return True
+    Dev servers started through npm, yarn or a gunicorn master keep the
+    listening socket in a child, so killing only the parent can leave the
+    port bound or orphan the children.
 
-    except psutil.NoSuchProcess:
-        # Process already dead
-        return True
-    except psutil.AccessDenied:
-        print(f"Access denied when trying to kill PID {pid}")
-        return False
-    except Exception as e:
-        print(f"Error killing process {pid}: {e}")
-        return False
+    Args:
+        pids: Root process IDs
+
+    Returns:
+        Roots and descendants, deepest first (safe order for bottom-up signals)
+    """
+    # One pass over the process table instead of children() per root
+    children_of: Dict[int, List[int]] = {}
+    for process in psutil.process_iter(['ppid']):
+        ppid = process.info['ppid']
+        if ppid:
+            children_of.setdefault(ppid, []).append(process.pid)
+
+    order = list(dict.fromkeys(pids))
+    depth = {pid: 0 for pid in order}
+
+    # Breadth-first walk; `order` grows while we iterate it
+    for pid in order:
+        for child in children_of.get(pid, ()):
+            if child not in depth:
+                depth[child] = depth[pid] + 1
+                order.append(child)
+
+    return sorted(order, key=lambda pid: depth[pid], reverse=True)
+
+
+def kill_processes(pids: Iterable[int], force: bool = False,
+                   timeout: Optional[float] = None, tree: bool = False) -> Dict[int, bool]:
+    """
+    Kill several processes concurrently.
+
+    SIGTERM is sent to every target at once, in the given order, then all
+    of them are waited on together against a single deadline; only the
+    survivors get SIGKILL. Total time is bounded by one timeout, not one
+    timeout per process.
+
+    Args:
+        pids: Process IDs to kill
+        force: If True, send SIGKILL right away
+        timeout: Seconds to wait for graceful exit (default: config.KILL_TIMEOUT)
+        tree: If True, also kill all descendants, children before parents
+
+    Returns:
+        Dictionary of pid -> True if the process is gone, False otherwise
+        (descendants included when tree=True)
+    """
+    if timeout is None:
+        timeout = config.KILL_TIMEOUT
+
+    if tree:
+        pids = collect_process_tree(pids)
+
+    results = {}
+    targets = []
+
+    # dict.fromkeys drops duplicates (one PID can hold several ports)
+    for pid in dict.fromkeys(pids):
+        try:
+            process = psutil.Process(pid)
+            if force:
+                process.kill()  # SIGKILL
+            else:
+                process.terminate()  # SIGTERM
+            targets.append(process)
+        except psutil.NoSuchProcess:
+            # Process already dead
+            results[pid] = True
+        except psutil.AccessDenied:
+            print(f"Access denied when trying to kill PID {pid}")
+            results[pid] = False
+        except Exception as e:
+            print(f"Error killing process {pid}: {e}")
+            results[pid] = False
+
+    # Wait for all processes to terminate against one shared deadline
+    gone, alive = psutil.wait_procs(targets, timeout=0 if force else timeout)
+
+    # If still running after timeout, force kill only the survivors
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+        except Exception as e:
+            print(f"Error killing process {process.pid}: {e}")
+
+    killed, survivors = psutil.wait_procs(alive, timeout=_FORCE_KILL_WAIT)
+
+    for process in gone + killed:
+        results[process.pid] = True
+        _process_cache.discard(process.pid)
+    for process in survivors:
+        print(f"Process {process.pid} survived SIGKILL")
+        results[process.pid] = False
+
+    return results
 
 
 def is_process_running(pid: int) -> bool:
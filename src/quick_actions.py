@@ -1,38 +1,75 @@
 """Quick action functions for batch operations."""
 
 import rumps
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
+import src.config as config
+import src.port_scanner as port_scanner
+import src.port_set as port_set
 import src.process_monitor as process_monitor
 import src.ui_helpers as ui_helpers
 
 
-def kill_all_processes(processes: Dict[int, Dict]) -> tuple[int, int]:
+def kill_processes_freeing_ports(pids: List[int]) -> Tuple[Dict[int, bool], List[int]]:
     """
-    Kill all active processes.
+    Kill processes (and, if enabled, their process trees) in one batch.
+
+    With config.KILL_PROCESS_TREE, each target's descendants are collected
+    and signalled children-first, and the whole set is waited on together.
+    The listening sockets are checked before and after, so the caller
+    learns which ports were actually released.
 
     Args:
-        processes: Dictionary of port -> process info
+        pids: Process IDs to kill
 
     Returns:
-        Tuple of (successful_kills, total_processes)
+        Tuple of (pid -> True if stopped, sorted list of freed ports)
     """
-    if not processes:
-        return 0, 0
+    if config.KILL_PROCESS_TREE:
+        targets = process_monitor.collect_process_tree(pids)
+    else:
+        targets = list(dict.fromkeys(pids))
+
+    # A backend of our own: kills run on worker threads, and the scan
+    # engine's backend keeps per-scan state (netlink sequence, caches)
+    backend = port_scanner.select_backend(config.SCANNER_BACKEND)
+    ports = port_set.configured_ports()
+
+    # Unfiltered scans: ports held by anything in the tree, including unlisted children
+    before = port_scanner.PortSnapshot(backend.scan(ports))
+    held = {port for pid in targets for port in before.ports_of(pid)}
+
+    results = process_monitor.kill_processes(targets)
 
-    total = len(processes)
-    successful = 0
+    after = port_scanner.PortSnapshot(backend.scan(ports))
+    return results, sorted(held.difference(after.ports))
 
-    for port, proc_info in processes.items():
-        pid = proc_info.get('pid')
-        if pid:
-            try:
-                if process_monitor.kill_process(pid):
-                    successful += 1
-            except Exception as e:
-                print(f"Error killing process {pid}: {e}")
 
-    return successful, total
+def kill_all_processes(ports: port_scanner.PortSnapshot) -> Tuple[Dict[int, bool], List[int]]:
+    """
+    Kill all active processes concurrently.
+
+    Every process gets SIGTERM at once and all of them share a single
+    config.KILL_TIMEOUT deadline before survivors are force killed.
+
+    Args:
+        ports: Snapshot of the listed processes
+
+    Returns:
+        Tuple of (pid -> True if stopped, list of freed ports)
+    """
+    pids = list(ports.pids)
+    if not pids:
+        return {}, []
+
+    try:
+        results, freed_ports = kill_processes_freeing_ports(pids)
+    except Exception as e:
+        print(f"Error killing processes: {e}")
+        return {pid: False for pid in pids}, []
+
+    # Report on the listed processes; descendants are an implementation detail
+    return {pid: results.get(pid, False) for pid in pids}, freed_ports
 
 
 def confirm_kill_all(process_count: int) -> bool:
@@ -66,28 +103,22 @@ def confirm_kill_all(process_count: int) -> bool:
     )
 
 
-def execute_kill_all(processes: Dict[int, Dict]) -> None:
+def notify_kill_all(results: Dict[int, bool], freed_ports: List[int]) -> None:
     """
-    Execute kill all action with confirmation and notification.
+    Show the result notification of a Kill All.
 
     Args:
-        processes: Dictionary of port -> process info
+        results: pid -> True if stopped (from kill_all_processes)
+        freed_ports: Ports released by the kill
     """
-    process_count = len(processes)
-
-    # Show confirmation dialog
-    if not confirm_kill_all(process_count):
-        return
+    successful, total = sum(results.values()), len(results)
 
-    # Execute kills
-    successful, total = kill_all_processes(processes)
-
-    # Show result notification
     if successful == total:
         rumps.notification(
             title="Kill All Complete",
             subtitle=f"Successfully killed {successful} processes",
-            message="All development servers have been stopped"
+            message=f"Freed {format_ports(freed_ports)}" if freed_ports
+            else "All development servers have been stopped"
         )
     else:
         failed = total - successful
@@ -98,6 +129,20 @@ def execute_kill_all(processes: Dict[int, Dict]) -> None:
         )
 
 
+def format_ports(ports: List[int]) -> str:
+    """
+    Format a list of ports for notifications.
+
+    Args:
+        ports: Port numbers
+
+    Returns:
+        String like "ports :3000, :5173" or "port :3000"
+    """
+    label = "port" if len(ports) == 1 else "ports"
+    return f"{label} " + ", ".join(f":{port}" for port in ports)
+
+
 def restart_process(pid: int, command: str = None) -> bool:
     """
     Restart a process (kill and start again).
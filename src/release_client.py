@@ -0,0 +1,187 @@
+"""Latest-release lookup with conditional requests and persisted state.
+
+The client has no UI code (notifications stay in src.updater), so it can
+run on a worker thread and be tested against a local HTTP server. The
+time of the last check, the response ETag and the parsed release are kept
+in a small JSON file: a check inside the interval makes no request at all,
+and any other check sends If-None-Match, so an unchanged release costs a
+"304 Not Modified" instead of a full response.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Optional
+
+import src.config as config
+
+# Check outcomes
+SKIPPED = "skipped"  # inside the interval, no request made
+NOT_MODIFIED = "not_modified"  # server answered 304, cached release reused
+FETCHED = "fetched"  # new release data downloaded
+
+
+def is_newer(latest: str, current: str) -> bool:
+    """
+    Compare version strings (e.g., '0.3.0' > '0.2.0').
+
+    Args:
+        latest: Latest version string
+        current: Current version string
+
+    Returns:
+        True if latest is newer than current
+    """
+    try:
+        latest_parts = [int(x) for x in latest.split(".")]
+        current_parts = [int(x) for x in current.split(".")]
+
+        return latest_parts > current_parts
+    except (ValueError, AttributeError):
+        return False
+
+
+def parse_release(data: Dict[str, any]) -> Dict[str, any]:
+    """
+    Extract what the app needs from a GitHub release payload.
+
+    Args:
+        data: Decoded JSON of the releases/latest endpoint
+
+    Returns:
+        Dict with version, url, download_url (DMG or None) and release_notes
+    """
+    download_url = None
+    for asset in data.get("assets", []):
+        if asset["name"].endswith(".dmg"):
+            download_url = asset["browser_download_url"]
+            break
+
+    return {
+        "version": data["tag_name"].lstrip("v"),
+        "url": data["html_url"],
+        "download_url": download_url,
+        "release_notes": data["body"][:200] if data.get("body") else ""
+    }
+
+
+class ReleaseClient:
+    """
+    Fetches the latest release at most once per interval.
+
+    Thread-safe; check() blocks for up to `timeout` seconds when it makes
+    a request, so call it off the UI thread.
+    """
+
+    def __init__(self, url: str = config.UPDATE_CHECK_URL,
+                 state_path: str = config.UPDATE_STATE_PATH,
+                 interval: float = config.AUTO_UPDATE_CHECK_INTERVAL,
+                 timeout: float = config.UPDATE_CHECK_TIMEOUT):
+        """
+        Initialize the client.
+
+        Args:
+            url: Latest-release endpoint
+            state_path: JSON file holding last_check, etag and release
+            interval: Seconds between requests for non-forced checks
+            timeout: Socket timeout for one request
+        """
+        self.url = url
+        self.state_path = state_path
+        self.interval = interval
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, any]] = None  # loaded on first use
+
+    @property
+    def release(self) -> Optional[Dict[str, any]]:
+        """Release info from the last successful check (possibly a previous run)."""
+        with self._lock:
+            return self._load_state().get("release")
+
+    def is_due(self, now: Optional[float] = None) -> bool:
+        """
+        Whether the interval since the last successful check has passed.
+
+        Args:
+            now: Current Unix time (default: time.time())
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            last_check = self._load_state().get("last_check")
+        # A last check "in the future" means the clock moved: check again
+        return last_check is None or not 0 <= now - last_check < self.interval
+
+    def check(self, force: bool = False) -> Dict[str, any]:
+        """
+        Look up the latest release.
+
+        Args:
+            force: Make a request even inside the interval (manual checks)
+
+        Returns:
+            Dict with status (SKIPPED, NOT_MODIFIED or FETCHED) and release
+            (see parse_release; None if never fetched)
+
+        Raises:
+            urllib.error.URLError, OSError or ValueError: If the request
+            or the response fails; the state is left unchanged
+        """
+        if not force and not self.is_due():
+            return {"status": SKIPPED, "release": self.release}
+
+        with self._lock:
+            state = dict(self._load_state())
+
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        # Without a cached release a 304 would leave nothing to report
+        if state.get("etag") and state.get("release"):
+            headers["If-None-Match"] = state["etag"]
+
+        request = urllib.request.Request(self.url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read())
+                etag = response.headers.get("ETag")
+            status = FETCHED
+            state["release"] = parse_release(data)
+            state["etag"] = etag
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            status = NOT_MODIFIED
+
+        state["last_check"] = time.time()
+        with self._lock:
+            self._state = state
+            self._save_state(state)
+
+        return {"status": status, "release": state["release"]}
+
+    def _load_state(self) -> Dict[str, any]:
+        """Read the state file once (lock held); missing or corrupt means empty."""
+        if self._state is None:
+            try:
+                with open(self.state_path, encoding="utf-8") as f:
+                    self._state = json.load(f)
+                if not isinstance(self._state, dict):
+                    self._state = {}
+            except (OSError, ValueError):
+                self._state = {}
+        return self._state
+
+    def _save_state(self, state: Dict[str, any]):
+        """Write the state file atomically (lock held)."""
+        temp_path = f"{self.state_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            print(f"Could not save update state: {e}")
@@ -0,0 +1,258 @@
+"""Background scan engine that publishes immutable process snapshots."""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import src.config as config
+import src.instrumentation as instrumentation
+import src.port_scanner as port_scanner
+import src.port_set as port_set
+import src.process_monitor as process_monitor
+from src.port_scanner import PortSnapshot
+from src.scheduler import RefreshScheduler
+
+# Fields that change on every scan and don't count as a snapshot change
+# (probe latencies and metric trends jitter; a change of probe_status does count)
+VOLATILE_FIELDS = ('uptime_seconds', 'uptime_formatted', 'connect_ms', 'first_byte_ms', 'latency',
+                   'memory_mb_trend', 'cpu_percent_avg')
+
+
+class Snapshot(NamedTuple):
+    """Immutable result of one scan cycle."""
+
+    generation: int  # Increases by one for every published snapshot
+    ports: PortSnapshot  # Indexed listeners with their process info
+    taken_at: float  # Wall-clock time the scan finished
+    scan_seconds: float  # Time spent scanning and collecting metrics
+    error: Optional[str] = None  # Set if the scan failed
+    changed: bool = True  # False if identical to the previous snapshot
+
+    @property
+    def processes(self) -> Mapping[int, Mapping[str, any]]:
+        """Read-only port -> process info (first process per port)."""
+        return self.ports.primary
+
+    @property
+    def latency(self) -> Mapping[Tuple[int, int], Mapping[str, Mapping[str, float]]]:
+        """
+        Read-only (port, pid) -> probe latency percentiles (ENABLE_PROBING).
+
+        Each value maps a metric ("connect", "first_byte") to count,
+        mean_ms, max_ms, p50_ms, p90_ms and p99_ms over the last
+        LATENCY_WINDOWS * LATENCY_WINDOW_SECONDS.
+        """
+        return MappingProxyType({
+            key: entry['latency']
+            for key, entry in self.ports.listeners.items()
+            if 'latency' in entry
+        })
+
+
+def collect_processes() -> PortSnapshot:
+    """
+    Run one scan and collect metrics for every listening process.
+
+    Returns:
+        PortSnapshot whose entries include the process information
+    """
+    ports = port_scanner.scan_snapshot(port_set.configured_ports())
+
+    pids = ports.pids
+
+    # Forget processes that stopped listening, then read every process in
+    # one batch (one lookup per process, even if it listens on several ports)
+    process_monitor.sweep_process_cache(pids)
+    with instrumentation.span("get_processes_info"):
+        proc_infos = process_monitor.get_processes_info(pids)
+
+    entries = [
+        {**entry, **proc_infos[entry['pid']]}
+        for entry in ports
+        if entry['pid'] in proc_infos
+    ]
+
+    if config.ENABLE_PROBING:
+        from src import prober  # asyncio only when probing is on
+        with instrumentation.span("probe_ports"):
+            probes = prober.probe_listeners(entries)
+        for entry in entries:
+            entry.update(probes.get((entry['port'], entry['pid']), ()))
+
+    return PortSnapshot(entries)
+
+
+def stable_fields(entry: Mapping[str, any]) -> Dict[str, any]:
+    """
+    Return the fields of an entry that count as a change.
+
+    VOLATILE_FIELDS are dropped; CPU and memory are reduced to steps of
+    config.CHANGE_CPU_STEP and config.CHANGE_MEMORY_STEP_MB, so scan-to-scan
+    jitter does not reset the refresh backoff.
+
+    Args:
+        entry: Snapshot entry
+
+    Returns:
+        Dictionary to compare with the same listener's previous fields
+    """
+    steps = {'cpu_percent': config.CHANGE_CPU_STEP, 'memory_mb': config.CHANGE_MEMORY_STEP_MB}
+    stable = {}
+    for field, value in entry.items():
+        if field in VOLATILE_FIELDS:
+            continue
+        step = steps.get(field)
+        stable[field] = value if step is None or value is None else int(value // step)
+    return stable
+
+
+def _stable_view(ports: PortSnapshot) -> List[Dict[str, any]]:
+    """Return the entries without fields that change on every scan."""
+    return [stable_fields(entry) for entry in ports]
+
+
+class ScanEngine:
+    """
+    Runs scans on a dedicated worker thread.
+
+    The worker publishes a new Snapshot after every scan; readers (the
+    rumps main thread) only ever swap in the latest snapshot, so a slow
+    lsof or psutil call never blocks the menubar. When scans run is up to
+    the RefreshScheduler, which backs off while nothing changes.
+    """
+
+    def __init__(self, collector: Callable[[], PortSnapshot] = collect_processes,
+                 scheduler: Optional[RefreshScheduler] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            collector: Function returning the PortSnapshot for one scan
+            scheduler: Decides when scans run (adaptive defaults from config)
+        """
+        self.collector = collector
+        self.scheduler = scheduler or RefreshScheduler()
+
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Snapshot], None]] = []
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot = Snapshot(
+            generation=0,
+            ports=PortSnapshot(),
+            taken_at=0.0,
+            scan_seconds=0.0
+        )
+
+    def start(self):
+        """Start the worker thread (the first scan runs immediately)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="scan-engine",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the worker thread.
+
+        Args:
+            timeout: Seconds to wait for the current scan to finish
+        """
+        self._stopped.set()
+        self.scheduler.request()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def request_refresh(self):
+        """
+        Ask the worker to scan now and return to the fast interval.
+
+        Requests made while the worker is busy are merged into one scan.
+        """
+        self.scheduler.request()
+
+    def subscribe(self, listener: Callable[[Snapshot], None]):
+        """
+        Call `listener` with every published snapshot.
+
+        Listeners run on the thread that scanned, right after publishing,
+        so they should be quick (or hand work off); errors are printed
+        and do not stop the engine.
+
+        Args:
+            listener: Function taking the new Snapshot
+        """
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def unsubscribe(self, listener: Callable[[Snapshot], None]):
+        """Stop calling a listener added with subscribe()."""
+        with self._lock:
+            self._listeners = [existing for existing in self._listeners if existing != listener]
+
+    def latest(self) -> Snapshot:
+        """Return the most recently published snapshot."""
+        with self._lock:
+            return self._snapshot
+
+    def scan_once(self) -> Snapshot:
+        """
+        Run one scan on the calling thread and publish the result.
+
+        Returns:
+            The published snapshot
+        """
+        started = time.perf_counter()
+        error = None
+
+        try:
+            with instrumentation.profile_cycle():
+                ports = self.collector()
+        except Exception as e:
+            print(f"Error refreshing processes: {e}")
+            ports = PortSnapshot()
+            error = str(e)
+
+        scan_seconds = time.perf_counter() - started
+        instrumentation.record("scan_cycle", scan_seconds)
+
+        with self._lock:
+            previous = self._snapshot
+            changed = (
+                previous.generation == 0
+                or error != previous.error
+                or _stable_view(ports) != _stable_view(previous.ports)
+            )
+            snapshot = Snapshot(
+                generation=previous.generation + 1,
+                ports=ports,
+                taken_at=time.time(),
+                scan_seconds=scan_seconds,
+                error=error,
+                changed=changed
+            )
+            self._snapshot = snapshot
+            listeners = self._listeners
+
+        for listener in listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Error in snapshot listener: {e}")
+
+        return snapshot
+
+    def _run(self):
+        """Worker loop: scan, publish, then sleep until the scheduler says otherwise."""
+        while not self._stopped.is_set():
+            snapshot = self.scan_once()
+            self.scheduler.record(snapshot.changed)
+            self.scheduler.wait()
@@ -0,0 +1,76 @@
+"""Adaptive refresh scheduling for the scan engine."""
+
+import threading
+
+import src.config as config
+
+
+class RefreshScheduler:
+    """
+    Decide when the next scan runs.
+
+    While scans keep producing identical snapshots the interval backs off
+    exponentially up to `max_interval`; a change, a kill or a menu open
+    snaps it back to `min_interval`. Refresh requests are coalesced: any
+    number of requests made before the worker wakes up cause one scan.
+    """
+
+    def __init__(self, min_interval: float = config.REFRESH_INTERVAL_MIN,
+                 max_interval: float = config.REFRESH_INTERVAL_MAX,
+                 backoff: float = config.REFRESH_BACKOFF):
+        """
+        Initialize the scheduler.
+
+        Args:
+            min_interval: Seconds between scans right after a change
+            max_interval: Upper bound for the backed-off interval
+            backoff: Factor applied to the interval after an unchanged scan
+        """
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+
+        self._lock = threading.Lock()
+        self._requested = threading.Event()
+        self._interval = min_interval
+
+    @property
+    def interval(self) -> float:
+        """Seconds the worker will wait before the next scan."""
+        with self._lock:
+            return self._interval
+
+    def request(self):
+        """
+        Ask for a scan as soon as possible and reset to the fast interval.
+
+        Safe to call from any thread; repeated calls before the worker wakes
+        up are merged into a single scan.
+        """
+        with self._lock:
+            self._interval = self.min_interval
+        self._requested.set()
+
+    def record(self, changed: bool):
+        """
+        Adjust the interval after a scan.
+
+        Args:
+            changed: Whether the scan produced a different snapshot
+        """
+        with self._lock:
+            if changed:
+                self._interval = self.min_interval
+            else:
+                self._interval = min(self.max_interval, self._interval * self.backoff)
+
+    def wait(self) -> bool:
+        """
+        Block until the interval elapses or a scan is requested.
+
+        Returns:
+            True if woken by a request, False if the interval elapsed
+        """
+        requested = self._requested.wait(self.interval)
+        self._requested.clear()
+        return requested
@@ -1,10 +1,10 @@
 """UI helper functions for menubar app."""
 
 import rumps
-import webbrowser
-from typing import Optional
+from typing import Callable, Optional
 
 import src.config as config
+import src.menu_model as menu_model
 
 
 def create_section_header(title: str) -> rumps.MenuItem:
@@ -65,6 +65,7 @@ def show_about_dialog():
 def open_website():
     """Open the app website in default browser."""
     try:
+        import webbrowser
         webbrowser.open(config.WEBSITE_URL)
     except Exception as e:
         rumps.alert(
@@ -112,20 +113,8 @@ def show_info_dialog(title: str, message: str):
     )
 
 
-def format_process_title(port: int, name: str, is_favorite: bool = False) -> str:
-    """
-    Format process menu item title.
-
-    Args:
-        port: Port number
-        name: Process name
-        is_favorite: Whether this is a favorite process
-
-    Returns:
-        Formatted title string
-    """
-    status = "[FAVORITE]" if is_favorite else "[ACTIVE]"
-    return f"{status} :{port} → {name}"
+# Title formatting lives in the rumps-free menu view-model
+format_process_title = menu_model.format_process_title
 
 
 def create_disabled_feature_item(title: str, coming_version: str) -> rumps.MenuItem:
@@ -156,3 +145,44 @@ def create_process_stat_item(label: str, value: str) -> rumps.MenuItem:
         Disabled menu item
     """
     return rumps.MenuItem(f"{label}: {value}", callback=None)
+
+
+_menu_delegate_class = None
+
+
+def watch_menu_open(menu: rumps.Menu, callback: Callable) -> Optional[object]:
+    """
+    Call `callback(menu)` every time the menu is about to open.
+
+    rumps has no menu-open event, so this installs an NSMenu delegate.
+    Keep a reference to the returned object: NSMenu holds its delegate weakly.
+
+    Args:
+        menu: Top-level rumps menu (app.menu)
+        callback: Function called on the main thread when the menu opens
+
+    Returns:
+        The delegate object, or None if PyObjC is unavailable
+    """
+    global _menu_delegate_class
+
+    try:
+        from Foundation import NSObject
+    except ImportError:
+        return None
+
+    # Objective-C class names are global, so define the delegate class only once
+    if _menu_delegate_class is None:
+        class MenuOpenDelegate(NSObject):
+            def menuWillOpen_(self, nsmenu):
+                try:
+                    self.callback(nsmenu)
+                except Exception as e:
+                    print(f"Error in menu open callback: {e}")
+
+        _menu_delegate_class = MenuOpenDelegate
+
+    delegate = _menu_delegate_class.alloc().init()
+    delegate.callback = callback
+    menu._menu.setDelegate_(delegate)
+    return delegate
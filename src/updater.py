@@ -1,16 +1,23 @@
-"""Simple update checker for Localhost Monitor."""
+"""Simple update checker for Localhost Monitor.
 
-import urllib.request
-import json
+The release lookup (src.release_client) runs on a background thread, so a
+slow or unreachable server never blocks the menu; the result is picked up
+by a short rumps timer and shown from the main thread.
+"""
+
+import threading
 import webbrowser
 import rumps
 import src.config as config
+import src.release_client as release_client
+
+# How often the main thread looks for the result of a running check (seconds)
+RESULT_POLL_INTERVAL = 0.5
 
 
 class UpdateChecker:
     """Check for app updates via GitHub API."""
 
-    REPO_URL = "https://api.github.com/repos/elberdalfidan/localhost-monitor/releases/latest"
     RELEASES_PAGE = "https://github.com/elberdalfidan/localhost-monitor/releases"
 
     def __init__(self, app):
@@ -22,96 +29,97 @@ class UpdateChecker:
         """
         self.app = app
         self.current_version = config.APP_VERSION
+        self.client = release_client.ReleaseClient()
+
+        self._thread = None  # running check, if any
+        self._timer = None  # main-thread timer waiting for its result
+        self._silent = True
+        self._result = None  # (update_info, error) from the worker
+        self._notified_version = None  # silent checks notify once per version
 
     def check_for_updates(self, silent=True):
         """
-        Check if newer version is available.
+        Check if newer version is available (in the background).
+
+        Silent checks make no request while inside
+        AUTO_UPDATE_CHECK_INTERVAL; manual checks always ask the server.
 
         Args:
             silent: If True, only notify if update available
                    If False, always show result
         """
-        try:
-            update_info = self._fetch_latest_release()
+        if self._thread is not None:
+            # A check is running: a manual request makes it report its result
+            self._silent = self._silent and silent
+            return
+
+        self._silent = silent
+        self._result = None
+        self._thread = threading.Thread(
+            target=self._run_check,
+            args=(not silent,),
+            name="update-check",
+            daemon=True
+        )
+        self._thread.start()
+        self._timer = rumps.Timer(self._deliver_result, RESULT_POLL_INTERVAL)
+        self._timer.start()
 
-            if update_info["available"]:
-                self._show_update_notification(update_info)
-            elif not silent:
-                rumps.notification(
-                    title="No Updates Available",
-                    subtitle=f"You have the latest version ({self.current_version})",
-                    message="Localhost Monitor is up to date!"
-                )
+    def _run_check(self, force):
+        """Look up the latest release (worker thread)."""
+        try:
+            self._result = (self._fetch_latest_release(force), None)
         except Exception as e:
+            self._result = (None, e)
+
+    def _deliver_result(self, sender):
+        """Show the finished check's result (main thread timer)."""
+        if self._thread is None or self._thread.is_alive():
+            return
+        sender.stop()
+        self._thread = None
+        self._timer = None
+
+        update_info, error = self._result
+        silent = self._silent
+
+        if error is not None:
             if not silent:
                 rumps.notification(
                     title="Update Check Failed",
                     subtitle="Could not connect to update server",
-                    message=str(e)
+                    message=str(error)
                 )
+        elif update_info["available"]:
+            if not silent or update_info["version"] != self._notified_version:
+                self._notified_version = update_info["version"]
+                self._show_update_notification(update_info)
+        elif not silent:
+            rumps.notification(
+                title="No Updates Available",
+                subtitle=f"You have the latest version ({self.current_version})",
+                message="Localhost Monitor is up to date!"
+            )
 
-    def _fetch_latest_release(self):
+    def _fetch_latest_release(self, force=False):
         """
-        Fetch latest release info from GitHub API.
+        Fetch latest release info (from the server when due or forced).
+
+        Args:
+            force: Ask the server even inside the check interval
 
         Returns:
             Dict with update information
         """
-        request = urllib.request.Request(
-            self.REPO_URL,
-            headers={"Accept": "application/vnd.github.v3+json"}
-        )
-
-        with urllib.request.urlopen(request, timeout=10) as response:
-            data = json.loads(response.read())
-
-        latest_version = data["tag_name"].lstrip("v")
-
-        # Compare versions
-        is_newer = self._is_version_newer(latest_version, self.current_version)
+        release = self.client.check(force=force)["release"]
+        if release is None:
+            return {"available": False}
 
         return {
-            "available": is_newer,
-            "version": latest_version,
-            "url": data["html_url"],
-            "download_url": self._get_dmg_url(data),
-            "release_notes": data["body"][:200] if data.get("body") else ""
+            "available": release_client.is_newer(release["version"], self.current_version),
+            **release
         }
 
-    def _is_version_newer(self, latest, current):
-        """
-        Compare version strings (e.g., '0.3.0' > '0.2.0').
-
-        Args:
-            latest: Latest version string
-            current: Current version string
-
-        Returns:
-            True if latest is newer than current
-        """
-        try:
-            latest_parts = [int(x) for x in latest.split(".")]
-            current_parts = [int(x) for x in current.split(".")]
-
-            return latest_parts > current_parts
-        except (ValueError, AttributeError):
-            return False
-
-    def _get_dmg_url(self, release_data):
-        """
-        Extract DMG download URL from release assets.
-
-        Args:
-            release_data: GitHub release data
-
-        Returns:
-            DMG download URL or None
-        """
-        for asset in release_data.get("assets", []):
-            if asset["name"].endswith(".dmg"):
-                return asset["browser_download_url"]
-        return None
-
     def _show_update_notification(self, update_info):
         """
         Show notification about available update.
@@ -0,0 +1,109 @@
+"""Tests for the command-line entry point and headless mode."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import cli, config, scan_engine
+from src.port_scanner import PortSnapshot
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def make_snapshot(generation, entries):
+    """Build an engine snapshot from listener dictionaries."""
+    return scan_engine.Snapshot(generation, PortSnapshot(entries), 0.0, 0.001)
+
+
+def test_diff_record():
+    """Test added/removed/changed detection, ignoring uptime ticks."""
+    previous = make_snapshot(1, [
+        {'port': 3000, 'pid': 1, 'name': 'node', 'memory_mb': 10.0, 'uptime_seconds': 5},
+        {'port': 5173, 'pid': 2, 'name': 'vite', 'memory_mb': 20.0, 'uptime_seconds': 5},
+        {'port': 8000, 'pid': 3, 'name': 'python3', 'memory_mb': 30.0, 'uptime_seconds': 5},
+    ])
+    current = make_snapshot(2, [
+        {'port': 3000, 'pid': 1, 'name': 'node', 'memory_mb': 10.0, 'uptime_seconds': 8},
+        {'port': 5173, 'pid': 2, 'name': 'vite', 'memory_mb': 25.0, 'uptime_seconds': 8},
+        {'port': 9000, 'pid': 4, 'name': 'ruby', 'memory_mb': 40.0, 'uptime_seconds': 1},
+    ])
+
+    record = cli.diff_record(previous.ports, current)
+
+    assert record['type'] == 'diff'
+    assert record['generation'] == 2
+    assert [e['port'] for e in record['added']] == [9000]
+    assert record['removed'] == [{'port': 8000, 'pid': 3}]
+    assert [(e['port'], e['memory_mb']) for e in record['changed']] == [(5173, 25.0)]
+    json.dumps(record)
+
+
+def test_headless_once_does_not_import_rumps():
+    """Test that --headless --once prints one snapshot without the menubar code."""
+    code = (
+        "import sys; from src import cli; rc = cli.main(['--headless', '--once']); "
+        "assert 'rumps' not in sys.modules and 'src.main' not in sys.modules; sys.exit(rc)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, timeout=30)
+
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record['type'] == 'snapshot'
+    assert isinstance(record['listeners'], list)
+
+
+BUSY_LISTENER = """
+import socket
+sock = socket.socket()
+sock.bind(("127.0.0.1", 0))
+sock.listen()
+print(sock.getsockname()[1], flush=True)
+while True:
+    pass
+"""
+
+
+def test_headless_once_measures_cpu(tmp_path, monkeypatch):
+    """Test that --once reports CPU usage measured against a baseline, not 0.0."""
+    child = subprocess.Popen([sys.executable, "-c", BUSY_LISTENER], stdout=subprocess.PIPE)
+    try:
+        port = int(child.stdout.readline())
+        monkeypatch.setattr(config, "PORTS", str(port))
+        monkeypatch.setattr(config, "FILTER_MODE", "off")
+        output = tmp_path / "once.ndjson"
+
+        assert cli.main(['--headless', '--once', '--output', str(output)]) == 0
+    finally:
+        child.kill()
+        child.wait()
+
+    record = json.loads(output.read_text())
+    listener, = [entry for entry in record['listeners'] if entry['pid'] == child.pid]
+    assert listener['cpu_percent'] > 0
+
+
+def test_headless_watch_appends_to_file(tmp_path):
+    """Test --count with --diff stops even when nothing changes."""
+    output = tmp_path / "scans.ndjson"
+    output.write_text('{"type":"earlier"}\n')
+
+    assert cli.main(['--headless', '--watch', '--interval', '0.01', '--count', '3',
+                     '--diff', '--output', str(output)]) == 0
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert records[0] == {'type': 'earlier'}
+    assert records[1]['type'] == 'snapshot'
+    assert all(record['type'] == 'diff' for record in records[2:])
+
+
+def test_headless_flags_need_headless():
+    """Test that headless-only flags are rejected for the menubar app."""
+    with pytest.raises(SystemExit):
+        cli.main(['--once'])
@@ -1,8 +1,10 @@
 """Test CPU measurement with multiple samples."""
 
+import os
 import sys
 import time
-sys.path.insert(0, '/Users/elberdalfidan/Desktop/personal/localhost-monitor')
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src import process_monitor, port_scanner
 
@@ -47,5 +49,37 @@ def test_cpu_measurement():
         print()
 
 
+def test_cpu_usage_uses_deltas():
+    """Test that batched lookups report CPU usage from deltas between refreshes."""
+    process_monitor.clear_process_cache()
+    pid = os.getpid()
+
+    # First lookup only records a baseline
+    assert process_monitor.get_processes_info([pid])[pid]['cpu_percent'] == 0.0
+
+    # Burn some CPU, then look up again
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        pass
+
+    usage = process_monitor.get_processes_info([pid])[pid]['cpu_percent']
+    assert usage > 10.0
+
+
+def test_cpu_usage_does_not_block():
+    """Test that looking up many PIDs takes no sleep per PID."""
+    process_monitor.clear_process_cache()
+    pids = [os.getpid()] * 50 + [2 ** 22 + 1]  # includes a PID that doesn't exist
+
+    started = time.monotonic()
+    process_monitor.get_processes_info(pids)
+    usage = process_monitor.get_processes_info(pids)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.5
+    assert os.getpid() in usage
+    assert 2 ** 22 + 1 not in usage
+
+
 if __name__ == "__main__":
     test_cpu_measurement()
@@ -0,0 +1,167 @@
+"""Tests for the background scan engine."""
+
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import scan_engine
+from src.port_scanner import PortSnapshot
+from src.scheduler import RefreshScheduler
+
+
+def test_scan_once_publishes_immutable_snapshot():
+    """Test that each scan publishes a new read-only snapshot."""
+    engine = scan_engine.ScanEngine(
+        collector=lambda: PortSnapshot([{'port': 3000, 'pid': 1, 'name': 'node'}])
+    )
+
+    first = engine.scan_once()
+    second = engine.scan_once()
+
+    assert (first.generation, second.generation) == (1, 2)
+    assert engine.latest() is second
+    assert second.processes[3000]['name'] == 'node'
+    assert second.scan_seconds >= 0.0
+
+    with pytest.raises(TypeError):
+        second.processes[4000] = {}
+    with pytest.raises(TypeError):
+        second.processes[3000]['name'] = 'python'
+
+
+def test_unchanged_snapshots_are_flagged():
+    """Test that only real changes (not uptime ticks) mark a snapshot as changed."""
+    uptime = [0]
+
+    def collector():
+        uptime[0] += 1
+        return PortSnapshot([{'port': 3000, 'pid': 1, 'name': 'node', 'uptime_seconds': uptime[0]}])
+
+    engine = scan_engine.ScanEngine(collector=collector)
+
+    assert engine.scan_once().changed
+    assert not engine.scan_once().changed
+
+    engine.collector = PortSnapshot
+    assert engine.scan_once().changed
+
+
+def test_metric_jitter_is_not_a_change():
+    """Test that CPU/RAM noise within a step keeps snapshots unchanged."""
+    readings = iter([(0.0, 100.0), (1.2, 101.5), (3.9, 99.2), (12.0, 100.0), (12.0, 140.0)])
+
+    def collector():
+        cpu, memory = next(readings)
+        return PortSnapshot([{'port': 3000, 'pid': 1, 'name': 'node', 'cpu_percent': cpu,
+                              'memory_mb': memory, 'memory_mb_trend': memory / 10,
+                              'cpu_percent_avg': cpu / 2}])
+
+    engine = scan_engine.ScanEngine(collector=collector)
+
+    assert [engine.scan_once().changed for _ in range(5)] == [True, False, False, True, True]
+
+
+def test_scan_errors_are_published():
+    """Test that a failing scan publishes an error snapshot instead of raising."""
+    def failing_collector():
+        raise RuntimeError("lsof exploded")
+
+    snapshot = scan_engine.ScanEngine(collector=failing_collector).scan_once()
+
+    assert snapshot.error == "lsof exploded"
+    assert len(snapshot.processes) == 0
+    assert len(snapshot.ports) == 0
+
+
+def test_worker_scans_off_the_calling_thread():
+    """Test that the worker scans in the background and wakes on request."""
+    scan_threads = []
+    scanned = threading.Event()
+
+    def collector():
+        scan_threads.append(threading.current_thread())
+        scanned.set()
+        return PortSnapshot()
+
+    engine = scan_engine.ScanEngine(
+        collector=collector,
+        scheduler=RefreshScheduler(min_interval=60, max_interval=60)
+    )
+    engine.start()
+    try:
+        assert scanned.wait(2)
+        scanned.clear()
+
+        # A refresh request must not wait for the 60 s interval
+        engine.request_refresh()
+        assert scanned.wait(2)
+    finally:
+        engine.stop(timeout=2)
+
+    assert threading.current_thread() not in scan_threads
+    assert engine.latest().generation >= 2
+
+
+def test_collect_processes_merges_process_info(monkeypatch):
+    """Test that all processes are looked up in one batch, once each."""
+    monkeypatch.setattr(scan_engine.port_scanner, "scan_snapshot", lambda ports: PortSnapshot([
+        {'port': 3000, 'pid': 1, 'name': 'node'},
+        {'port': 3001, 'pid': 1, 'name': 'node'},
+        {'port': 8000, 'pid': 2, 'name': 'python3'},
+    ]))
+    batches = []
+
+    def get_processes_info(pids):
+        batches.append(sorted(pids))
+        return {1: {'memory_mb': 10.0}}  # pid 2 exited
+
+    monkeypatch.setattr(scan_engine.process_monitor, "get_processes_info", get_processes_info)
+
+    ports = scan_engine.collect_processes()
+
+    assert batches == [[1, 2]]
+    assert ports.ports == (3000, 3001)
+    assert ports.lookup(3001)['memory_mb'] == 10.0
+
+
+def test_collect_processes_adds_probe_results(monkeypatch):
+    """Test that probe results are merged per (port, pid) when probing is on."""
+    from src import prober
+
+    monkeypatch.setattr(scan_engine.config, "ENABLE_PROBING", True)
+    monkeypatch.setattr(scan_engine.port_scanner, "scan_snapshot", lambda ports: PortSnapshot([
+        {'port': 3000, 'pid': 1, 'name': 'node'},
+        {'port': 8000, 'pid': 2, 'name': 'python3'},
+    ]))
+    monkeypatch.setattr(scan_engine.process_monitor, "get_processes_info",
+                        lambda pids: {pid: {'memory_mb': 10.0} for pid in pids})
+    latency = {'first_byte': {'count': 3, 'p50_ms': 9.5, 'p99_ms': 11.0}}
+    monkeypatch.setattr(prober, "probe_listeners", lambda entries: {
+        (3000, 1): {'probe_status': 'ok', 'connect_ms': 0.2, 'first_byte_ms': 9.5, 'latency': latency},
+    })
+
+    snapshot = scan_engine.ScanEngine().scan_once()
+
+    assert snapshot.ports.lookup(3000)['first_byte_ms'] == 9.5
+    assert 'probe_status' not in snapshot.ports.lookup(8000)
+    assert dict(snapshot.latency) == {(3000, 1): latency}
+
+
+def test_listeners_receive_published_snapshots():
+    """Test subscribe/unsubscribe and that a failing listener is contained."""
+    engine = scan_engine.ScanEngine(collector=PortSnapshot)
+    received = []
+
+    def failing(snapshot):
+        raise RuntimeError("listener bug")
+
+    engine.subscribe(failing)
+    engine.subscribe(received.append)
+    first = engine.scan_once()
+    engine.unsubscribe(received.append)
+    engine.scan_once()
+
+    assert received == [first]
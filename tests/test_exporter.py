@@ -0,0 +1,77 @@
+"""Tests for the Prometheus metrics exporter."""
+
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import exporter, scan_engine
+from src.port_scanner import PortSnapshot
+
+
+def make_engine():
+    """Build a scan engine returning two listeners (no real scanning)."""
+    return scan_engine.ScanEngine(collector=lambda: PortSnapshot([
+        {'port': 3000, 'pid': 1, 'name': 'node', 'cpu_percent': 12.5,
+         'memory_mb': 100.0, 'uptime_seconds': 60, 'probe_status': 'ok',
+         'connect_ms': 0.21, 'first_byte_ms': 14.8},
+        {'port': 8000, 'pid': 2, 'name': 'my "app"', 'cpu_percent': 0.0,
+         'memory_mb': 0.5, 'uptime_seconds': 5},
+    ]))
+
+
+def test_render_metrics():
+    """Test the exposition text for a snapshot."""
+    text = exporter.render_metrics(make_engine().scan_once())
+
+    assert "# TYPE localhost_monitor_listeners gauge\nlocalhost_monitor_listeners 2\n" in text
+    assert 'localhost_monitor_process_cpu_percent{port="3000",pid="1",name="node"} 12.5\n' in text
+    assert ('localhost_monitor_process_resident_memory_bytes'
+            '{port="8000",pid="2",name="my \\"app\\""} 524288\n') in text
+    assert 'localhost_monitor_process_uptime_seconds{port="3000",pid="1",name="node"} 60\n' in text
+    assert 'localhost_monitor_probe_first_byte_seconds{port="3000",pid="1",name="node"} 0.0148\n' in text
+    assert 'localhost_monitor_probe_connect_seconds{port="8000"' not in text
+    assert "localhost_monitor_scan_generation 1\n" in text
+    assert "localhost_monitor_scan_error 0\n" in text
+
+
+def test_render_is_cached_per_generation(monkeypatch):
+    """Test that scrapes between two scans reuse the rendered text."""
+    engine = make_engine()
+    engine.scan_once()
+    renders = []
+    monkeypatch.setattr(exporter, "render_metrics",
+                        lambda snapshot: renders.append(snapshot.generation) or "x\n")
+
+    metrics = exporter.MetricsExporter(engine.latest)
+    first = metrics.render()
+    assert metrics.render() is first
+
+    engine.scan_once()
+    metrics.render()
+    assert renders == [1, 2]
+
+
+def test_http_endpoint():
+    """Test serving /metrics over HTTP without triggering scans."""
+    engine = make_engine()
+    engine.scan_once()
+    metrics = exporter.MetricsExporter(engine.latest, host="127.0.0.1", port=0)
+    metrics.start()
+    try:
+        host, port = metrics.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == exporter.CONTENT_TYPE
+            assert b"localhost_monitor_listeners 2" in response.read()
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"http://{host}:{port}/", timeout=5)
+        assert error.value.code == 404
+    finally:
+        metrics.stop()
+
+    assert metrics.address is None
+    assert engine.latest().generation == 1
@@ -0,0 +1,110 @@
+"""Tests for the SQLite history store."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import scan_engine
+from src.history import HistoryStore
+from src.port_scanner import PortSnapshot
+
+# A round hour (Unix time) to make bucket boundaries obvious
+T0 = 1_700_002_800
+
+
+def snapshot_at(taken_at, memory_mb=100.0, cpu_percent=10.0, error=None):
+    """Build a snapshot with two listeners (node on :3000, vite on :5173)."""
+    return scan_engine.Snapshot(1, PortSnapshot([
+        {'port': 3000, 'pid': 1, 'name': 'node', 'memory_mb': memory_mb,
+         'cpu_percent': cpu_percent},
+        {'port': 5173, 'pid': 2, 'name': 'vite', 'memory_mb': 50.0, 'cpu_percent': 1.0},
+    ]), taken_at, 0.01, error)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), batch_cycles=3,
+                         rollup_interval=3600, raw_retention=3600,
+                         minute_retention=3 * 3600, hour_retention=30 * 86400)
+    yield store
+    store.close()
+
+
+def test_inserts_are_batched(store):
+    """Test that rows are written every batch_cycles scans, in WAL mode."""
+    assert store._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    store.record(snapshot_at(T0))
+    store.record(snapshot_at(T0 + 2))
+    store.record(snapshot_at(T0 + 4, error="lsof failed"))  # not stored or counted
+    assert store.query() == []
+
+    store.record(snapshot_at(T0 + 6))
+    rows = store.query(port=3000)
+    assert [row['bucket'] for row in rows] == [T0, T0 + 2, T0 + 6]
+    assert rows[0]['name'] == 'node' and rows[0]['memory_max'] == 100.0
+
+
+def test_rollup_and_retention(store):
+    """Test 1-minute/1-hour aggregates and deletion of expired data."""
+    # Two hours of samples every 30 s; node's memory grows 1 MB per sample
+    for i in range(240):
+        store.record(snapshot_at(T0 + i * 30, memory_mb=100.0 + i, cpu_percent=float(i % 2)))
+    store.rollup(now=T0 + 2 * 3600 + 10)
+
+    minute = store.query(port=3000, since=T0, until=T0 + 60, resolution='1m')
+    assert minute == [{
+        'bucket': T0, 'port': 3000, 'pid': 1, 'name': 'node', 'samples': 2,
+        'cpu_avg': 0.5, 'cpu_max': 1.0, 'memory_avg': 100.5, 'memory_max': 101.0,
+    }]
+
+    hours = store.query(port=3000, resolution='1h')
+    assert [(h['bucket'], h['samples'], h['memory_max']) for h in hours] == [
+        (T0, 120, 219.0), (T0 + 3600, 120, 339.0)
+    ]
+    assert hours[0]['memory_avg'] == pytest.approx(159.5)
+
+    # Raw samples older than one hour are gone, aggregates remain
+    raw = store.query(port=3000)
+    assert raw[0]['bucket'] >= T0 + 3600
+    assert len(store.query(port=3000, resolution='1m')) == 120
+
+    # Running again is a no-op for already rolled-up buckets
+    store.rollup(now=T0 + 2 * 3600 + 20)
+    assert store.query(port=3000, resolution='1h')[0]['samples'] == 120
+
+    # Three hours later the 1-minute aggregates have expired too
+    store.rollup(now=T0 + 5 * 3600)
+    assert store.query(resolution='1m') == []
+    assert len(store.query(port=3000, resolution='1h')) == 2
+
+
+def test_top_processes(store):
+    """Test ranking process names by peak memory."""
+    for i in range(6):
+        store.record(snapshot_at(T0 + i * 10, memory_mb=12.0 * i))
+    store.flush()
+
+    top = store.top_processes('memory', since=T0, resolution='raw')
+    assert [(row['name'], row['peak']) for row in top] == [('node', 60.0), ('vite', 50.0)]
+    assert top[0]['average'] == pytest.approx(30.0)
+
+    top = store.top_processes('cpu', since=T0, resolution='raw', limit=1)
+    assert [(row['name'], row['peak'], row['samples']) for row in top] == [('node', 10.0, 6)]
+
+
+def test_queries_use_indexes(store):
+    """Test that port, name and time-range lookups are index searches."""
+    plans = {
+        sql: " ".join(row[3] for row in store._db.execute("EXPLAIN QUERY PLAN " + sql, params))
+        for sql, params in [
+            ("SELECT * FROM samples_raw WHERE port = ? AND bucket >= ?", (3000, T0)),
+            ("SELECT * FROM samples_1m WHERE name = ? AND bucket >= ?", ('node', T0)),
+            ("SELECT * FROM samples_raw WHERE bucket >= ? AND bucket < ?", (T0, T0 + 60)),
+        ]
+    }
+
+    for sql, plan in plans.items():
+        assert "USING INDEX" in plan or "USING PRIMARY KEY" in plan, (sql, plan)
@@ -0,0 +1,134 @@
+"""Tests for hot-path timing spans and profiling hooks."""
+
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import config, instrumentation, process_monitor, scan_engine
+from src.port_scanner import PortSnapshot
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    instrumentation.reset_stats()
+    yield
+    instrumentation.stop_profiling()
+    instrumentation.reset_stats()
+
+
+def test_spans_feed_stage_histograms():
+    """Test counts, extremes and bucket percentiles per stage."""
+    for milliseconds in [0.04, 0.3, 0.3, 0.3, 7.0]:
+        instrumentation.record("stage", milliseconds / 1000)
+    with instrumentation.span("other"):
+        pass
+
+    stats = instrumentation.get_stats()
+    assert list(stats) == ["other", "stage"]
+    assert stats["other"]["count"] == 1
+
+    stage = stats["stage"]
+    assert stage["count"] == 5
+    assert stage["min_ms"] == pytest.approx(0.04)
+    assert stage["max_ms"] == pytest.approx(7.0)
+    assert stage["mean_ms"] == pytest.approx(7.94 / 5)
+    assert stage["p50_ms"] == pytest.approx(0.4)  # bucket (0.2, 0.4]
+    assert stage["p99_ms"] == pytest.approx(7.0)  # capped at the maximum
+    assert "stage" in instrumentation.format_stats()
+
+
+def test_disabled_spans_record_nothing(monkeypatch):
+    """Test that ENABLE_INSTRUMENTATION = False turns spans into no-ops."""
+    monkeypatch.setattr(config, "ENABLE_INSTRUMENTATION", False)
+    with instrumentation.span("scan_ports"):
+        pass
+    instrumentation.record("build_menu", 0.01)
+
+    assert instrumentation.get_stats() == {}
+    assert instrumentation.format_stats() == "No timings recorded yet."
+
+
+def test_collect_processes_times_each_stage(monkeypatch):
+    """Test spans around scanning, the process batch and the whole cycle."""
+    monkeypatch.setattr(scan_engine.port_scanner, "scan_snapshot",
+                        lambda ports: PortSnapshot([
+                            {'port': 3000, 'pid': 1, 'name': 'node'},
+                            {'port': 3001, 'pid': 2, 'name': 'vite'},
+                        ]))
+    monkeypatch.setattr(process_monitor, "sweep_process_cache", lambda pids: None)
+    monkeypatch.setattr(process_monitor, "get_processes_info",
+                        lambda pids: {pid: {'memory_mb': 1.0} for pid in pids})
+
+    scan_engine.ScanEngine().scan_once()
+
+    stats = instrumentation.get_stats()
+    assert stats["get_processes_info"]["count"] == 1
+    assert stats["scan_cycle"]["count"] == 1
+
+
+def slow_collector():
+    """Collector that spends its time in a recognizable function."""
+    time.sleep(0.03)
+    return PortSnapshot()
+
+
+@pytest.mark.parametrize("mode", instrumentation.PROFILE_MODES)
+def test_profiling_writes_after_n_cycles(tmp_path, mode):
+    """Test that a profile covering exactly N scan cycles is written."""
+    path = tmp_path / "profiles" / f"scan.{mode}"
+    engine = scan_engine.ScanEngine(collector=slow_collector)
+
+    instrumentation.start_profiling(mode, cycles=2, path=str(path))
+    with pytest.raises(ValueError):
+        instrumentation.start_profiling(mode, cycles=2)
+
+    engine.scan_once()
+    assert instrumentation.profiling_active() and not path.exists()
+    engine.scan_once()
+    assert not instrumentation.profiling_active()
+
+    if mode == "cprofile":
+        functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+        assert "slow_collector" in functions
+    else:
+        assert "test_instrumentation.py:slow_collector" in path.read_text()
+
+
+def test_unknown_profile_mode():
+    """Test that an unknown mode is rejected."""
+    with pytest.raises(ValueError):
+        instrumentation.start_profiling("perf", cycles=1)
+
+
+@pytest.mark.parametrize("mode", instrumentation.PROFILE_MODES)
+def test_stop_profiling_during_a_cycle(tmp_path, mode):
+    """Test that writing early (on quit) stops the cycle still running."""
+    path = tmp_path / f"scan.{mode}"
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocked_collector():
+        started.set()
+        release.wait(5)
+        return PortSnapshot()
+
+    engine = scan_engine.ScanEngine(collector=blocked_collector)
+    instrumentation.start_profiling(mode, cycles=5, path=str(path))
+    worker = threading.Thread(target=engine.scan_once)
+    worker.start()
+    try:
+        assert started.wait(5)
+        time.sleep(0.05)  # let the sampler record a few stacks
+        instrumentation.stop_profiling()
+    finally:
+        release.set()
+        worker.join()
+
+    assert path.exists() and not instrumentation.profiling_active()
+    if mode == "sample":
+        assert "blocked_collector" in path.read_text()
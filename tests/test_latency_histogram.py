@@ -0,0 +1,82 @@
+"""Tests for the log-linear latency histograms and their time windows."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import latency_histogram
+from src.latency_histogram import LatencyHistogram, LatencyStore, WindowedHistogram
+
+
+def test_buckets_cover_the_range_without_gaps():
+    """Test that bucket bounds are contiguous and within the relative error."""
+    previous_upper = -1
+    for index in range(latency_histogram.BUCKET_COUNT):
+        upper = latency_histogram.bucket_upper_us(index)
+        lower = previous_upper + 1
+        assert latency_histogram.bucket_index(lower) == index
+        assert (upper - lower) <= max(1, lower / latency_histogram.SUB_BUCKETS)
+        previous_upper = upper
+
+    assert latency_histogram.bucket_index(10 ** 9) == latency_histogram.BUCKET_COUNT - 1
+
+
+def test_percentiles():
+    """Test percentiles against exact values (within one bucket)."""
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):  # 1..1000 ms
+        histogram.record(float(value))
+
+    summary = histogram.summary()
+    assert summary['count'] == 1000
+    assert summary['max_ms'] == 1000.0
+    assert summary['mean_ms'] == pytest.approx(500.5)
+    for percent in (50, 90, 99):
+        exact = percent * 10
+        assert exact <= summary[f'p{percent}_ms'] <= exact * (1 + 1 / latency_histogram.SUB_BUCKETS)
+
+
+def test_memory_is_constant():
+    """Test that recording many samples allocates nothing new."""
+    histogram = LatencyHistogram()
+    counts = histogram.counts
+    for value in range(100000):
+        histogram.record(value * 0.01)
+
+    assert histogram.counts is counts
+    assert len(counts) == latency_histogram.BUCKET_COUNT
+
+
+def test_windows_rotate():
+    """Test that old windows fall out and a recent slowdown shows."""
+    windowed = WindowedHistogram(window_seconds=60, windows=5)
+    for second in range(0, 300, 10):
+        windowed.record(5.0, now=second)  # fast for 5 minutes
+    for second in range(300, 360, 10):
+        windowed.record(500.0, now=second)  # then slow for a minute
+
+    summary = windowed.summary(now=359)
+    assert summary['count'] == 30  # minutes 1-5 kept, minute 0 cleared
+    assert summary['p90_ms'] >= 500.0
+    assert windowed.merged(windows=1, now=359).summary()['p50_ms'] >= 500.0
+
+    # Long idle: everything expires
+    assert windowed.summary(now=10000)['count'] == 0
+
+
+def test_store_per_listener():
+    """Test per-key metrics and forgetting listeners that are gone."""
+    store = LatencyStore(window_seconds=60, windows=5)
+    store.record((3000, 1), 'connect', 0.2, now=0)
+    store.record((3000, 1), 'first_byte', 12.0, now=0)
+    store.record((8000, 2), 'connect', 0.3, now=0)
+
+    summaries = store.summaries((3000, 1), now=1)
+    assert sorted(summaries) == ['connect', 'first_byte']
+    assert summaries['first_byte']['count'] == 1
+    assert store.summaries((5173, 3)) == {}
+
+    store.forget([(8000, 2)])
+    assert len(store) == 1 and store.summaries((3000, 1)) == {}
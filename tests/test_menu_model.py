@@ -0,0 +1,181 @@
+"""Tests for the menu view-model and diffing."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import menu_model
+
+
+def make_process(pid, name, memory_mb=100.0, cpu_percent=1.0, uptime='5m'):
+    """Build a process info dictionary like the scan engine produces."""
+    return {
+        'pid': pid,
+        'name': name,
+        'memory_mb': memory_mb,
+        'cpu_percent': cpu_percent,
+        'uptime_formatted': uptime,
+    }
+
+
+def test_build_process_nodes():
+    """Test that nodes are sorted by port and carry the stat submenu."""
+    nodes = menu_model.build_process_nodes({
+        (8000, 2): make_process(2, 'python3'),
+        (3000, 1): make_process(1, 'node'),
+    })
+
+    assert [node.key for node in nodes] == ['process:3000:1', 'process:8000:2']
+    assert nodes[0].title == '[ACTIVE] :3000 → node'
+
+    titles = [child.title for child in nodes[0].children]
+    assert titles == ['PID: 1', 'RAM: 100.0 MB', 'CPU: 1.0%', 'Uptime: 5m', None, 'Kill Process']
+    assert nodes[0].children[-1].action == ('kill', 3000, 1)
+
+
+def test_sockets_line_and_udp_title():
+    """Test the socket summary line and the title of a UDP-only listener."""
+    dual_stack = dict(make_process(1, 'node'), sockets=(
+        ('tcp', 'ipv4', '127.0.0.1'), ('tcp', 'ipv6', '::1'), ('udp', 'ipv4', '0.0.0.0'),
+    ))
+    dns = dict(make_process(2, 'dnsmock'), sockets=(('udp', 'ipv4', '0.0.0.0'),))
+
+    nodes = menu_model.build_process_nodes({(3000, 1): dual_stack, (5353, 2): dns})
+
+    assert nodes[0].title == '[ACTIVE] :3000 → node'
+    assert nodes[0].children[1] == menu_model.MenuNode(
+        'process:3000:1/sockets', 'Listening: TCP 127.0.0.1, [::1] · UDP 0.0.0.0'
+    )
+    assert nodes[1].title == '[ACTIVE] :5353/udp → dnsmock'
+
+
+def test_processes_sharing_a_port():
+    """Test that two processes on one port (e.g. SO_REUSEPORT) both get an item."""
+    nodes = menu_model.build_process_nodes({
+        (3000, 7): make_process(7, 'node'),
+        (3000, 5): make_process(5, 'node'),
+    })
+
+    assert [node.key for node in nodes] == ['process:3000:5', 'process:3000:7']
+
+    # rumps keys items by title, so the titles must differ too
+    assert [node.title for node in nodes] == [
+        '[ACTIVE] :3000 → node (PID 5)',
+        '[ACTIVE] :3000 → node (PID 7)',
+    ]
+
+
+def test_latency_line():
+    """Test the probe line for answered, silent and refused listeners."""
+    answered = dict(make_process(1, 'node'), probe_status='ok', connect_ms=0.25, first_byte_ms=12.4)
+    silent = dict(make_process(2, 'webpack'), probe_status='no_response', connect_ms=0.3)
+    refused = dict(make_process(3, 'django'), probe_status='refused')
+
+    nodes = menu_model.build_process_nodes({(3000, 1): answered, (8000, 2): silent, (8001, 3): refused})
+
+    assert [node.children[4].title for node in nodes] == [
+        'Latency: connect 0.2 ms · first byte 12.4 ms',
+        'Latency: connect 0.3 ms · no response',
+        'Latency: connection refused',
+    ]
+    assert nodes[0].children[4].key == 'process:3000:1/latency'
+
+
+def test_latency_percentiles_line():
+    """Test the windowed percentile line under the latency line."""
+    summary = {'count': 30, 'mean_ms': 14.0, 'max_ms': 52.0, 'p50_ms': 12.1, 'p90_ms': 20.4, 'p99_ms': 48.0}
+    probed = dict(make_process(1, 'node'), probe_status='ok', connect_ms=0.2, first_byte_ms=12.4,
+                  latency={'connect': dict(summary, p50_ms=0.2), 'first_byte': summary})
+
+    node = menu_model.build_process_nodes({(3000, 1): probed})[0]
+
+    assert node.children[5] == menu_model.MenuNode(
+        'process:3000:1/latency_window', 'Last 5 min: p50 12.1 · p90 20.4 · p99 48.0 ms'
+    )
+
+
+def test_ram_trend_is_shown():
+    """Test that a noticeable RAM trend is appended to the RAM line."""
+    growing = dict(make_process(1, 'node'), memory_mb_trend=1.25)
+    steady = dict(make_process(2, 'vite'), memory_mb_trend=0.04)
+
+    nodes = menu_model.build_process_nodes({(3000, 1): growing, (5173, 2): steady})
+
+    assert nodes[0].children[1].title == 'RAM: 100.0 MB (+1.2 MB/min)'
+    assert nodes[1].children[1].title == 'RAM: 100.0 MB'
+
+
+def test_empty_section_has_placeholder():
+    """Test that an empty snapshot renders a single placeholder node."""
+    nodes = menu_model.build_process_nodes({})
+
+    assert [node.key for node in nodes] == [menu_model.EMPTY_KEY]
+
+
+def test_diff_unchanged_is_empty():
+    """Test that identical snapshots produce an empty patch."""
+    processes = {(3000, 1): make_process(1, 'node')}
+
+    patch = menu_model.diff_menu(
+        menu_model.build_process_nodes(processes),
+        menu_model.build_process_nodes(processes)
+    )
+
+    assert patch.is_empty()
+
+
+def test_diff_only_retitles_changed_stats():
+    """Test that a CPU/RAM change only retitles those submenu items."""
+    old = menu_model.build_process_nodes({(3000, 1): make_process(1, 'node')})
+    new = menu_model.build_process_nodes(
+        {(3000, 1): make_process(1, 'node', memory_mb=120.5, cpu_percent=7.3)}
+    )
+
+    patch = menu_model.diff_menu(old, new)
+
+    assert patch.add == () and patch.remove == ()
+    assert patch.retitle == (
+        ('process:3000:1/ram', 'RAM: 120.5 MB'),
+        ('process:3000:1/cpu', 'CPU: 7.3%'),
+    )
+
+
+def test_diff_adds_and_removes_processes():
+    """Test insertion position for new ports and removal of gone ones."""
+    old = menu_model.build_process_nodes({
+        (3000, 1): make_process(1, 'node'),
+        (8000, 2): make_process(2, 'python3'),
+    })
+    new = menu_model.build_process_nodes({
+        (3000, 1): make_process(1, 'node'),
+        (5173, 3): make_process(3, 'vite'),
+    })
+
+    patch = menu_model.diff_menu(old, new)
+
+    assert patch.remove == ('process:8000:2',)
+    assert [(after, node.key) for after, node in patch.add] == [
+        ('process:3000:1', 'process:5173:3')
+    ]
+
+
+def test_diff_replaces_placeholder():
+    """Test that the first process replaces the placeholder."""
+    old = menu_model.build_process_nodes({})
+    new = menu_model.build_process_nodes({(3000, 1): make_process(1, 'node')})
+
+    patch = menu_model.diff_menu(old, new)
+
+    assert patch.remove == (menu_model.EMPTY_KEY,)
+    assert [(after, node.key) for after, node in patch.add] == [(None, 'process:3000:1')]
+
+
+def test_pid_change_replaces_node():
+    """Test that a different PID on the same port is a new item (new kill target)."""
+    old = menu_model.build_process_nodes({(3000, 1): make_process(1, 'node')})
+    new = menu_model.build_process_nodes({(3000, 9): make_process(9, 'node')})
+
+    patch = menu_model.diff_menu(old, new)
+
+    assert patch.remove == ('process:3000:1',)
+    assert [node.key for _, node in patch.add] == ['process:3000:9']
@@ -0,0 +1,90 @@
+"""Tests for the per-process metric history."""
+
+import math
+import statistics
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import metrics_store
+from src.metrics_store import MetricsStore, RingBuffer
+
+
+STORAGE = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(metrics_store._load_numpy() is None,
+                                                reason="NumPy not installed")),
+]
+
+
+@pytest.mark.parametrize("use_numpy", STORAGE)
+def test_ring_buffer_wraps_around(use_numpy):
+    """Test that the newest values are kept in order once the buffer is full."""
+    buffer = RingBuffer(4, use_numpy=use_numpy)
+    for value in range(1, 7):
+        buffer.append(value)
+
+    assert len(buffer) == 4
+    assert list(buffer.latest()) == [3.0, 4.0, 5.0, 6.0]
+    assert list(buffer.latest(2)) == [5.0, 6.0]
+    assert list(buffer.latest(0)) == []
+
+
+@pytest.mark.parametrize("use_numpy", STORAGE)
+def test_window_stats_match_statistics_module(use_numpy):
+    """Test min/max/mean/percentiles over a time window."""
+    store = MetricsStore(capacity=100, use_numpy=use_numpy)
+    key = (42, 1000.0)
+    values = [float(v * 7 % 31) for v in range(50)]
+    for t, value in enumerate(values):
+        store.record(key, {'cpu_percent': value, 'memory_mb': 100.0}, timestamp=float(t))
+
+    stats = store.stats(key, 'cpu_percent', percentiles=(50, 95), now=49.0)
+    assert stats['count'] == 50
+    assert stats['min'] == min(values)
+    assert stats['max'] == max(values)
+    assert stats['mean'] == pytest.approx(statistics.fmean(values))
+    assert stats['p50'] == pytest.approx(statistics.median(values))
+    assert stats['p95'] == pytest.approx(statistics.quantiles(values, n=20, method='inclusive')[-1])
+
+    # Only the last 10 seconds (timestamps 39..49)
+    recent = store.stats(key, 'cpu_percent', seconds=10, now=49.0)
+    assert recent['count'] == 11
+    assert recent['mean'] == pytest.approx(statistics.fmean(values[-11:]))
+
+
+@pytest.mark.parametrize("use_numpy", STORAGE)
+def test_trend_is_change_per_minute(use_numpy):
+    """Test the least-squares trend of a steadily growing metric."""
+    store = MetricsStore(capacity=10, use_numpy=use_numpy)
+    key = (42, 1000.0)
+    assert store.trend(key, 'memory_mb') is None
+
+    # 0.5 MB every 3 seconds = 10 MB/min, for longer than the buffer holds
+    for step in range(30):
+        store.record(key, {'memory_mb': 100 + step * 0.5}, timestamp=step * 3.0)
+
+    assert store.trend(key, 'memory_mb') == pytest.approx(10.0)
+    assert len(store.window(key, 'memory_mb')) == 10
+    assert math.isnan(store.window(key, 'cpu_percent')[-1])  # not in the samples
+
+
+def test_memory_is_bounded():
+    """Test that series and histories are capped and swept."""
+    store = MetricsStore(capacity=5, max_series=3, use_numpy=False)
+    for pid in range(10):
+        for t in range(20):
+            store.record((pid, 1.0), {'cpu_percent': t}, timestamp=float(t))
+
+    # Least recently updated processes were evicted, each keeps 5 samples
+    assert store.keys() == ((7, 1.0), (8, 1.0), (9, 1.0))
+    assert len(store.window((9, 1.0), 'cpu_percent')) == 5
+
+    store.record((9, 2.0), {'cpu_percent': 1.0})  # PID reused: new history
+    store.sweep([9])
+    assert store.keys() == ((9, 1.0), (9, 2.0))
+
+    store.discard_pid(9)
+    assert len(store) == 0
@@ -1,7 +1,15 @@
 """Tests for process monitor module."""
 
+import os
+import subprocess
 import sys
-sys.path.insert(0, '/Users/elberdalfidan/Desktop/personal/localhost-monitor')
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psutil
+import pytest
 
 from src import process_monitor, port_scanner
 
@@ -36,5 +44,201 @@ def test_process_info():
             print(f"Port {port} (PID {pid}): Could not get info")
 
 
+def test_process_info_reports_trends():
+    """Test that repeated samples build up history and trends."""
+    process_monitor.clear_process_cache()
+    pid = os.getpid()
+
+    for _ in range(3):
+        info = process_monitor.get_process_info(pid, cpu_percent=5.0)
+
+    key = (pid, psutil.Process(pid).create_time())
+    assert len(process_monitor.get_metrics_store().window(key, 'memory_mb')) == 3
+    assert info['cpu_percent_avg'] == 5.0
+    assert isinstance(info['memory_mb_trend'], float)
+
+    process_monitor.sweep_process_cache([])
+    assert key not in process_monitor.get_metrics_store()
+
+
+def test_processes_info_in_one_batch(monkeypatch):
+    """Test the batch lookup: one as_dict() per process, dead and denied PIDs skipped."""
+    process_monitor.clear_process_cache()
+    dead = spawn_sleeper()
+    dead.kill()
+    dead.wait()
+
+    calls = []
+    as_dict = psutil.Process.as_dict
+
+    def counting_as_dict(self, attrs=None, ad_value=None):
+        calls.append(self.pid)
+        values = as_dict(self, attrs, ad_value)
+        if self.pid == os.getppid():
+            values['memory_info'] = ad_value  # as if access were denied
+        return values
+
+    monkeypatch.setattr(psutil.Process, "as_dict", counting_as_dict)
+    pid = os.getpid()
+
+    process_monitor.get_processes_info([pid])
+    infos = process_monitor.get_processes_info([pid, pid, dead.pid, os.getppid()])
+
+    assert list(infos) == [pid]
+    assert calls.count(pid) == 2
+    assert infos[pid]['name'] == psutil.Process(pid).name()
+    assert infos[pid]['memory_mb'] > 0
+    assert infos[pid]['cpu_percent'] >= 0.0
+    assert len(process_monitor.get_metrics_store().window(
+        (pid, psutil.Process(pid).create_time()), 'memory_mb')) == 2
+
+
+def test_process_cache_hits_and_misses():
+    """Test that repeated lookups are served from the cache."""
+    cache = process_monitor.ProcessCache(max_size=8, ttl=60)
+
+    first = cache.get(os.getpid())
+    assert cache.get(os.getpid()) is first
+    assert cache.stats() == {'size': 1, 'hits': 1, 'misses': 1, 'evictions': 0}
+
+
+def test_process_cache_is_bounded():
+    """Test LRU eviction beyond max_size."""
+    cache = process_monitor.ProcessCache(max_size=1, ttl=60)
+
+    cache.get(os.getpid())
+    cache.get(os.getppid())
+
+    assert len(cache) == 1
+    assert cache.stats()['evictions'] == 1
+
+
+def test_process_cache_ttl_and_sweep():
+    """Test that expired records and PIDs gone from the scan are evicted."""
+    cache = process_monitor.ProcessCache(max_size=8, ttl=0)
+    cache.get(os.getpid())
+    cache.get(os.getpid())
+    assert cache.stats()['misses'] == 2  # expired immediately
+
+    cache = process_monitor.ProcessCache(max_size=8, ttl=60)
+    cache.get(os.getpid())
+    cache.get(os.getppid())
+    cache.sweep([os.getppid()])
+    assert len(cache) == 1
+    assert cache.get(os.getppid()) is not None and cache.stats()['hits'] == 1
+
+
+def test_process_cache_drops_dead_processes():
+    """Test that a dead PID is not served from the cache."""
+    cache = process_monitor.ProcessCache(max_size=8, ttl=60)
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        cache.get(child.pid)
+    finally:
+        child.kill()
+        child.wait()
+
+    with pytest.raises(psutil.NoSuchProcess):
+        cache.get(child.pid)
+    assert len(cache) == 0
+
+
+def test_process_cache_discard_from_another_thread():
+    """Test that discards on a kill thread don't break lookups and sweeps."""
+    cache = process_monitor.ProcessCache(max_size=8, ttl=60)
+    pid = os.getpid()
+    errors = []
+
+    def discard():
+        try:
+            for _ in range(2000):
+                cache.discard(pid)
+        except Exception as e:
+            errors.append(e)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        worker = threading.Thread(target=discard)
+        worker.start()
+        for _ in range(2000):
+            assert cache.get(pid).pid == pid
+            cache.sweep([pid])
+        worker.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert errors == []
+
+
+def spawn_sleeper(ignore_sigterm=False):
+    """Start a child process that sleeps (optionally ignoring SIGTERM)."""
+    code = "import signal, time\n"
+    if ignore_sigterm:
+        code += "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    code += "print('ready', flush=True)\ntime.sleep(60)\n"
+    child = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE)
+    child.stdout.readline()  # wait until the signal handler is installed
+    return child
+
+
+def test_kill_processes_shares_one_deadline():
+    """Test that stuck processes are waited on together, then force killed."""
+    stuck = [spawn_sleeper(ignore_sigterm=True) for _ in range(4)]
+    polite = [spawn_sleeper() for _ in range(4)]
+    children = stuck + polite
+
+    try:
+        started = time.monotonic()
+        results = process_monitor.kill_processes(
+            [child.pid for child in children] + [children[0].pid],
+            timeout=1.0
+        )
+        elapsed = time.monotonic() - started
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+    assert results == {child.pid: True for child in children}
+    # One shared 1 s deadline, not 1 s per stuck process
+    assert elapsed < 3.0
+
+
+def test_kill_processes_missing_pid():
+    """Test that an already-dead PID counts as killed."""
+    child = spawn_sleeper()
+    child.kill()
+    child.wait()
+
+    assert process_monitor.kill_processes([child.pid]) == {child.pid: True}
+
+
+TREE_PARENT = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+print(child.pid, flush=True)
+time.sleep(60)
+"""
+
+
+def test_kill_process_tree():
+    """Test that a tree kill reaps the children of a wrapper process."""
+    parent = subprocess.Popen([sys.executable, "-c", TREE_PARENT], stdout=subprocess.PIPE)
+    child_pid = int(parent.stdout.readline())
+
+    try:
+        tree = process_monitor.collect_process_tree([parent.pid])
+        assert tree == [child_pid, parent.pid]  # children first
+
+        results = process_monitor.kill_processes([parent.pid], timeout=1, tree=True)
+    finally:
+        parent.kill()
+        parent.wait()
+
+    assert results == {child_pid: True, parent.pid: True}
+    assert not process_monitor.is_process_running(child_pid)
+
+
 if __name__ == "__main__":
     test_process_info()
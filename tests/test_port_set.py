@@ -0,0 +1,61 @@
+"""Tests for sparse port sets."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import config, port_set
+from src.port_set import PortSet
+
+
+def test_parse_merges_ranges():
+    """Test parsing, merging of overlapping/adjacent ranges and formatting."""
+    ports = PortSet.parse("8000-8999, 3000-3999, 5173,5432, 4000-4010, 3500-3600, 9229")
+
+    assert ports.ranges == ((3000, 4010), (5173, 5173), (5432, 5432), (8000, 8999), (9229, 9229))
+    assert str(ports) == "3000-4010, 5173, 5432, 8000-8999, 9229"
+    assert len(ports) == 1011 + 1 + 1 + 1000 + 1
+    assert PortSet.parse(str(ports)) == ports
+
+
+def test_membership():
+    """Test bitset membership at range edges and outside the port space."""
+    ports = PortSet.parse("3000-3999, 5173, 65535")
+
+    assert 3000 in ports and 3999 in ports and 5173 in ports and 65535 in ports
+    assert 2999 not in ports and 4000 not in ports and 5172 not in ports
+    assert -1 not in ports and 65536 not in ports
+    assert list(PortSet.parse("1-3, 7")) == [1, 2, 3, 7]
+    assert not PortSet() and 0 not in PortSet()
+
+
+@pytest.mark.parametrize("spec", ["3000-", "abc", "9000-3000", "70000", "-5"])
+def test_invalid_specs(spec):
+    """Test that malformed items and out-of-range ports are rejected."""
+    with pytest.raises(ValueError):
+        PortSet.parse(spec)
+
+
+def test_covering_ranges_close_smallest_gaps():
+    """Test reducing a fragmented set to a few covering ranges."""
+    ports = PortSet.parse("10, 12, 100, 200-210, 1000")
+
+    assert ports.covering_ranges(5) == ports.ranges
+    assert ports.covering_ranges(4) == ((10, 12), (100, 100), (200, 210), (1000, 1000))
+    assert ports.covering_ranges(2) == ((10, 210), (1000, 1000))
+    assert ports.covering_ranges(1) == ((10, 1000),)
+
+
+def test_coerce_and_configured(monkeypatch):
+    """Test the accepted selection types and the cached config.PORTS set."""
+    assert port_set.coerce("3000-3001") == PortSet([(3000, 3001)])
+    assert port_set.coerce(5173) == PortSet([(5173, 5173)])
+    assert port_set.coerce((3000, 9000)) == PortSet([(3000, 9000)])
+
+    monkeypatch.setattr(config, "PORTS", "5173, 8000-8999")
+    configured = port_set.configured_ports()
+    assert configured is port_set.configured_ports()
+    assert port_set.coerce(None) is configured
+    assert 8500 in configured and 3000 not in configured
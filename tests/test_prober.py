@@ -0,0 +1,147 @@
+"""Tests for the asyncio health prober (against local servers)."""
+
+import asyncio
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import prober
+
+
+class HeadHandler(BaseHTTPRequestHandler):
+    """Answers HEAD / and counts requests."""
+
+    def do_HEAD(self):
+        self.server.requests += 1
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HeadHandler)
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def silent_port():
+    """A port that accepts connections (in the backlog) but never replies."""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(16)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def free_port():
+    """Return a port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def make_prober(**kwargs):
+    options = dict(concurrency=4, connect_timeout=1.0, response_timeout=0.2, interval=60, http=True)
+    options.update(kwargs)
+    return prober.Prober(**options)
+
+
+def test_probe_target():
+    """Test the address chosen for wildcard, IPv6-only and UDP-only listeners."""
+    assert prober.probe_target({'sockets': (('tcp', 'ipv4', '0.0.0.0'), ('tcp', 'ipv6', '::'))}) == '127.0.0.1'
+    assert prober.probe_target({'sockets': (('tcp', 'ipv6', '::'),)}) == '::1'
+    assert prober.probe_target({'protocol': 'tcp', 'family': 'ipv4', 'address': '10.0.0.5'}) == '10.0.0.5'
+    assert prober.probe_target({'sockets': (('udp', 'ipv4', '0.0.0.0'),)}) is None
+    assert prober.probe_target({'port': 3000, 'pid': 1}) == '127.0.0.1'
+
+
+def test_probe_outcomes(http_server, silent_port):
+    """Test answered, silent and refused ports in one concurrent round."""
+    http_port = http_server.server_address[1]
+    closed_port = free_port()
+    results = make_prober().probe([
+        {'port': http_port, 'pid': 1},
+        {'port': silent_port, 'pid': 2},
+        {'port': closed_port, 'pid': 3},
+        {'port': 5353, 'pid': 4, 'sockets': (('udp', 'ipv4', '0.0.0.0'),)},
+    ])
+
+    answered = results[(http_port, 1)]
+    assert answered['probe_status'] == prober.OK
+    assert answered['connect_ms'] >= 0 and answered['first_byte_ms'] >= 0
+
+    assert results[(silent_port, 2)]['probe_status'] == prober.NO_RESPONSE
+    assert 'first_byte_ms' not in results[(silent_port, 2)]
+    assert results[(closed_port, 3)] == {'probe_status': prober.REFUSED}
+    assert (5353, 4) not in results
+
+
+def test_probes_feed_latency_histograms(http_server, silent_port):
+    """Test that every fresh measurement lands in the listener's histograms."""
+    port = http_server.server_address[1]
+    probes = make_prober(interval=0)
+
+    for _ in range(3):
+        results = probes.probe([{'port': port, 'pid': 1}, {'port': silent_port, 'pid': 2}])
+
+    answered = results[(port, 1)]['latency']
+    assert answered['connect']['count'] == 3 and answered['first_byte']['count'] == 3
+    assert 0 < answered['first_byte']['p50_ms'] <= answered['first_byte']['p99_ms']
+    assert list(results[(silent_port, 2)]['latency']) == ['connect']
+
+    probes.probe([{'port': port, 'pid': 1}])
+    assert len(probes.latency) == 1
+
+
+def test_connect_only_probe(silent_port):
+    """Test that PROBE_HTTP = False only times the connection."""
+    result = make_prober(http=False).probe([{'port': silent_port, 'pid': 1}])[(silent_port, 1)]
+
+    assert result['probe_status'] == prober.OK
+    assert 'first_byte_ms' not in result
+
+
+def test_results_reused_inside_interval(http_server):
+    """Test that a listener is probed once per interval and forgotten when gone."""
+    port = http_server.server_address[1]
+    probes = make_prober()
+
+    first = probes.probe([{'port': port, 'pid': 1}])
+    assert probes.probe([{'port': port, 'pid': 1}]) == first
+    assert http_server.requests == 1
+
+    assert probes.probe([]) == {}
+    probes.probe([{'port': port, 'pid': 1}])
+    assert http_server.requests == 2
+
+
+def test_concurrency_is_bounded(monkeypatch):
+    """Test that no more than `concurrency` probes run at once."""
+    running = []
+    peak = []
+
+    async def fake_probe(host, port, http, connect_timeout, response_timeout):
+        running.append(port)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(port)
+        return {'probe_status': prober.OK, 'connect_ms': 0.1}
+
+    monkeypatch.setattr(prober, "probe_port", fake_probe)
+    results = make_prober(concurrency=3).probe({'port': port, 'pid': port} for port in range(3000, 3010))
+
+    assert len(results) == 10
+    assert max(peak) == 3
@@ -0,0 +1,44 @@
+"""Tests for quick actions (requires rumps, i.e. macOS)."""
+
+import subprocess
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+pytest.importorskip("rumps")
+
+from src import config, quick_actions
+
+
+LISTENER = """
+import socket, sys, time
+sock = socket.socket()
+sock.bind(("127.0.0.1", 0))
+sock.listen()
+print(sock.getsockname()[1], flush=True)
+time.sleep(60)
+"""
+
+
+def test_format_ports():
+    """Test port list formatting for notifications."""
+    assert quick_actions.format_ports([3000]) == "port :3000"
+    assert quick_actions.format_ports([3000, 5173]) == "ports :3000, :5173"
+
+
+def test_kill_reports_freed_ports(monkeypatch):
+    """Test that killing a listener reports its port as freed."""
+    child = subprocess.Popen([sys.executable, "-c", LISTENER], stdout=subprocess.PIPE)
+    port = int(child.stdout.readline())
+    monkeypatch.setattr(config, 'PORTS', str(port))
+
+    try:
+        results, freed_ports = quick_actions.kill_processes_freeing_ports([child.pid])
+    finally:
+        child.kill()
+        child.wait()
+
+    assert results[child.pid] is True
+    assert freed_ports == [port]
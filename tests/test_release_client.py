@@ -0,0 +1,143 @@
+"""Tests for the release client (against a local stand-in for the GitHub API)."""
+
+import json
+import sys
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from src import release_client
+
+RELEASE = {
+    'tag_name': 'v9.1.0',
+    'html_url': 'https://example.com/releases/v9.1.0',
+    'body': 'Notes',
+    'assets': [
+        {'name': 'source.zip', 'browser_download_url': 'https://example.com/source.zip'},
+        {'name': 'App.dmg', 'browser_download_url': 'https://example.com/App.dmg'},
+    ],
+}
+ETAG = '"abc123"'
+
+
+class FakeReleasesHandler(BaseHTTPRequestHandler):
+    """Serves RELEASE with an ETag and honours If-None-Match."""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.server.status != 200:
+            self.send_error(self.server.status)
+            return
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+
+        body = json.dumps(RELEASE).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeReleasesHandler)
+    server.requests = []
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, tmp_path, interval=3600):
+    host, port = server.server_address[:2]
+    return release_client.ReleaseClient(
+        url=f"http://{host}:{port}/releases/latest",
+        state_path=str(tmp_path / "state" / "update_state.json"),
+        interval=interval, timeout=5
+    )
+
+
+def test_parse_release():
+    """Test extracting version, URLs and notes from a release payload."""
+    release = release_client.parse_release(RELEASE)
+
+    assert release['version'] == '9.1.0'
+    assert release['download_url'] == 'https://example.com/App.dmg'
+    assert release['release_notes'] == 'Notes'
+    assert release_client.is_newer('0.10.0', '0.9.1')
+    assert not release_client.is_newer('0.3.0', '0.3.0')
+    assert not release_client.is_newer('beta', '0.3.0')
+
+
+def test_check_skips_inside_interval(server, tmp_path):
+    """Test that a second check inside the interval makes no request."""
+    client = make_client(server, tmp_path)
+
+    first = client.check()
+    assert first['status'] == release_client.FETCHED
+    assert first['release']['version'] == '9.1.0'
+
+    second = client.check()
+    assert second['status'] == release_client.SKIPPED
+    assert second['release'] == first['release']
+    assert len(server.requests) == 1
+
+    # The interval survives a restart: the state is on disk
+    assert make_client(server, tmp_path).check()['status'] == release_client.SKIPPED
+    assert len(server.requests) == 1
+
+
+def test_check_sends_etag(server, tmp_path):
+    """Test that due and forced checks are conditional and reuse the cached release."""
+    make_client(server, tmp_path).check()
+    assert 'If-None-Match' not in server.requests[0]
+
+    # A new client (as after a restart) with the interval already over
+    client = make_client(server, tmp_path, interval=0)
+    result = client.check()
+
+    assert server.requests[1]['If-None-Match'] == ETAG
+    assert result['status'] == release_client.NOT_MODIFIED
+    assert result['release']['version'] == '9.1.0'
+
+    assert make_client(server, tmp_path).check(force=True)['status'] == release_client.NOT_MODIFIED
+    assert len(server.requests) == 3
+
+
+def test_failed_check_keeps_state(server, tmp_path):
+    """Test that errors propagate and the next check is still due."""
+    client = make_client(server, tmp_path)
+    server.status = 500
+
+    with pytest.raises(urllib.error.HTTPError):
+        client.check()
+    assert client.is_due()
+    assert client.release is None
+
+    server.status = 200
+    assert client.check()['status'] == release_client.FETCHED
+
+
+def test_corrupt_state_file_is_ignored(server, tmp_path):
+    """Test that an unreadable state file just means a fresh check."""
+    client = make_client(server, tmp_path)
+    Path(client.state_path).parent.mkdir(parents=True)
+    Path(client.state_path).write_text("{not json")
+
+    assert client.is_due()
+    assert client.check()['status'] == release_client.FETCHED
+    assert json.loads(Path(client.state_path).read_text())['etag'] == ETAG
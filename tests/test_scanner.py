@@ -1,9 +1,120 @@
 """Tests for port scanner module."""
 
+import io
+import os
+import socket
 import sys
-sys.path.insert(0, '/Users/elberdalfidan/Desktop/personal/localhost-monitor')
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from src import port_scanner
+import pytest
+
+from src import config, port_scanner
+from src.port_set import PortSet
+
+PORTS = PortSet.parse("3000-9000")
+
+
+# `lsof -F pcfnPtT` output (TCP sockets carry TQR/TQS/TST lines)
+LSOF_OUTPUT = """\
+p12345
+cnode
+f23
+tIPv4
+PTCP
+n*:3000
+TST=LISTEN
+TQR=0
+TQS=0
+f24
+tIPv6
+PTCP
+n*:3000
+TST=LISTEN
+f25
+tIPv4
+PTCP
+n127.0.0.1:3000->127.0.0.1:52000
+TST=ESTABLISHED
+f26
+tIPv4
+PUDP
+n*:5353
+f27
+tIPv4
+PUDP
+n127.0.0.1:5354->127.0.0.1:53
+p23456
+cGoogle Chrome Helper
+f5
+tIPv4
+PTCP
+n127.0.0.1:8000
+TST=LISTEN
+p345
+cpostgres
+f7
+tIPv6
+PTCP
+n[::1]:5432
+TST=LISTEN
+p1
+csshd
+f3
+tIPv4
+PTCP
+n*:22
+TST=LISTEN
+"""
+
+PROC_NET_TCP = """\
+  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 00000000:0BB8 00000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 1001 1
+   1: 0100007F:1F40 00000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 1002 1
+   2: 0100007F:1F40 0100007F:9C40 01 00000000:00000000 00:00000000 00000000  1000        0 1003 1
+   3: 00000000:0016 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1004 1
+"""
+
+PROC_NET_TCP6 = """\
+  sl  local_address                         remote_address                        st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 00000000000000000000000000000000:0BB8 00000000000000000000000000000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 1005 1
+"""
+
+# An unconnected UDP socket on :5353 (listed) and a connected one (not listed)
+PROC_NET_UDP = """\
+   sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode ref pointer drops
+  304: 00000000:14E9 00000000:0000 07 00000000:00000000 00:00000000 00000000  1000        0 1006 2 0000000000000000 0
+  305: 0100007F:14EA 0100007F:0035 01 00000000:00000000 00:00000000 00000000  1000        0 1007 2 0000000000000000 0
+"""
+
+PROC_NET_UDP6 = """\
+   sl  local_address                         remote_address                        st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode ref pointer drops
+  100: 00000000000000000000000001000000:14E9 00000000000000000000000000000000:0000 07 00000000:00000000 00:00000000 00000000  1000        0 1008 2 0000000000000000 0
+"""
+
+
+def make_fake_proc(root, processes):
+    """
+    Build a minimal fake procfs tree.
+
+    Args:
+        root: Directory to create the tree in
+        processes: Dictionary of pid -> (comm, [socket inodes])
+    """
+    net_dir = root / "net"
+    net_dir.mkdir()
+    (net_dir / "tcp").write_text(PROC_NET_TCP)
+    (net_dir / "tcp6").write_text(PROC_NET_TCP6)
+    (net_dir / "udp").write_text(PROC_NET_UDP)
+    (net_dir / "udp6").write_text(PROC_NET_UDP6)
+
+    for pid, (comm, inodes) in processes.items():
+        fd_dir = root / str(pid) / "fd"
+        fd_dir.mkdir(parents=True)
+        (root / str(pid) / "comm").write_text(comm + "\n")
+        os.symlink("/dev/null", fd_dir / "0")
+        for fd, inode in enumerate(inodes, start=3):
+            os.symlink(f"socket:[{inode}]", fd_dir / str(fd))
 
 
 def test_scan_ports():
@@ -20,5 +131,295 @@ def test_scan_ports():
     return processes
 
 
+def test_parse_lsof_fields():
+    """Test streaming parse of `lsof -F pcfnPtT` output."""
+    lines = iter(LSOF_OUTPUT.splitlines(keepends=True))
+    processes = port_scanner.parse_lsof_fields(lines, PORTS)
+
+    # Command names keep their spaces, IPv6 ports parse, connected sockets
+    # are skipped and :22 is out of range
+    assert [(p['port'], p['pid'], p['name'], p['protocol'], p['family'], p['address'])
+            for p in processes] == [
+        (3000, 12345, 'node', 'tcp', 'ipv4', '0.0.0.0'),
+        (3000, 12345, 'node', 'tcp', 'ipv6', '::'),
+        (5353, 12345, 'node', 'udp', 'ipv4', '0.0.0.0'),
+        (8000, 23456, 'Google Chrome Helper', 'tcp', 'ipv4', '127.0.0.1'),
+        (5432, 345, 'postgres', 'tcp', 'ipv6', '::1'),
+    ]
+
+
+def test_parse_lsof_plain_fields():
+    """Test that output without f/t/P/T fields still parses (as TCP listeners)."""
+    processes = port_scanner.parse_lsof_fields(["p42\n", "cnode\n", "n*:3000\n", "n[::1]:3001\n"],
+                                               PORTS)
+
+    assert [(p['port'], p['family'], p['address']) for p in processes] == [
+        (3000, 'ipv4', '0.0.0.0'),
+        (3001, 'ipv6', '::1'),
+    ]
+
+
+def test_lsof_backend_narrows_port_range(monkeypatch):
+    """Test that lsof is asked for the port range instead of every socket."""
+    commands = []
+
+    class FakePopen:
+        def __init__(self, cmd, **kwargs):
+            commands.append(cmd)
+            self.stdout = io.StringIO("p42\ncnode\nn*:3000\n")
+            self.returncode = 0
+
+        def kill(self):
+            pass
+
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr(port_scanner.subprocess, "Popen", FakePopen)
+    processes = port_scanner.LsofBackend(protocols=("tcp", "udp")).scan(PORTS)
+    port_scanner.LsofBackend(protocols=("tcp",)).scan(PORTS)
+
+    assert [(p['port'], p['pid'], p['name']) for p in processes] == [(3000, 42, 'node')]
+
+    # One lsof run covers TCP and UDP; a LISTEN-only filter would hide UDP
+    assert "-iTCP:3000-9000" in commands[0] and "-iUDP:3000-9000" in commands[0]
+    assert "-sTCP:LISTEN" not in commands[0]
+    assert commands[0][-2:] == ["-F", "pcfnPtT"]
+    assert "-iUDP:3000-9000" not in commands[1] and "-sTCP:LISTEN" in commands[1]
+
+    # Sparse sets become lsof port lists
+    port_scanner.LsofBackend(protocols=("tcp",)).scan(PortSet.parse("3000-3999, 5173, 8000-8999"))
+    assert "-iTCP:3000-3999,5173,8000-8999" in commands[2]
+
+
+def test_proc_backend(tmp_path):
+    """Test the /proc/net backend against a fake procfs tree."""
+    make_fake_proc(tmp_path, {
+        12345: ("node", [1001, 1005]),
+        23456: ("python3", [1002, 1003]),
+        1: ("sshd", [1004]),
+    })
+
+    backend = port_scanner.ProcNetBackend(proc_root=str(tmp_path))
+    processes = backend.scan(PORTS)
+
+    # IPv4 and IPv6 listeners on :3000 are both reported, the established
+    # connection (inode 1003) and the out-of-range :22 listener are not
+    assert sorted((p['port'], p['pid'], p['name'], p['family'], p['address'])
+                  for p in processes) == [
+        (3000, 12345, 'node', 'ipv4', '0.0.0.0'),
+        (3000, 12345, 'node', 'ipv6', '::'),
+        (8000, 23456, 'python3', 'ipv4', '127.0.0.1'),
+    ]
+
+
+def test_proc_backend_udp(tmp_path):
+    """Test that unconnected UDP sockets are found in the same pass."""
+    make_fake_proc(tmp_path, {
+        12345: ("node", [1001]),
+        777: ("dnsmock", [1006, 1007, 1008]),
+    })
+
+    processes = port_scanner.ProcNetBackend(proc_root=str(tmp_path)).scan(PORTS)
+    assert sorted((p['port'], p['protocol'], p['family'], p['address']) for p in processes) == [
+        (3000, 'tcp', 'ipv4', '0.0.0.0'),
+        (5353, 'udp', 'ipv4', '0.0.0.0'),
+        (5353, 'udp', 'ipv6', '::1'),
+    ]
+
+    tcp_only = port_scanner.ProcNetBackend(proc_root=str(tmp_path), protocols=("tcp",))
+    assert [p['protocol'] for p in tcp_only.scan(PORTS)] == ['tcp']
+
+    # A sparse set skips everything between its ranges
+    sparse = port_scanner.ProcNetBackend(proc_root=str(tmp_path)).scan(PortSet.parse("22, 5353"))
+    assert sorted({p['port'] for p in sparse}) == [5353]
+
+
+def test_scan_ports_with_backend(tmp_path):
+    """Test that scan_ports de-duplicates, filters and sorts backend results."""
+    make_fake_proc(tmp_path, {
+        23456: ("python3", [1002]),
+        12345: ("node", [1001, 1005]),
+    })
+
+    port_scanner.set_backend(port_scanner.ProcNetBackend(proc_root=str(tmp_path)))
+    try:
+        processes = port_scanner.scan_ports(3000, 9000)
+    finally:
+        port_scanner.set_backend(None)
+
+    # The IPv4 and IPv6 sockets of node on :3000 are merged into one entry
+    assert processes == [
+        {'port': 3000, 'pid': 12345, 'name': 'node',
+         'sockets': (('tcp', 'ipv4', '0.0.0.0'), ('tcp', 'ipv6', '::'))},
+        {'port': 8000, 'pid': 23456, 'name': 'python3',
+         'sockets': (('tcp', 'ipv4', '127.0.0.1'),)},
+    ]
+
+
+def test_select_backend():
+    """Test backend selection falls back to an available backend."""
+    backend = port_scanner.select_backend("auto")
+    assert backend.name in port_scanner.BACKENDS
+
+    backend = port_scanner.select_backend("does-not-exist")
+    assert backend.name in port_scanner.BACKENDS
+
+
+def test_filter_processes(monkeypatch):
+    """Test whitelist/blacklist filtering with the compiled matcher."""
+    processes = [
+        {'port': 3000, 'pid': 1, 'name': 'node'},
+        {'port': 5000, 'pid': 2, 'name': 'ControlCe'},
+        {'port': 7768, 'pid': 3, 'name': 'Spotify'},
+        {'port': 8000, 'pid': 4, 'name': 'Python3.11'},
+    ]
+
+    monkeypatch.setattr(config, 'FILTER_MODE', 'whitelist')
+    assert [p['pid'] for p in port_scanner.filter_processes(processes)] == [1, 4]
+
+    monkeypatch.setattr(config, 'FILTER_MODE', 'blacklist')
+    assert [p['pid'] for p in port_scanner.filter_processes(processes)] == [1, 4]
+
+    monkeypatch.setattr(config, 'FILTER_MODE', 'off')
+    assert port_scanner.filter_processes(processes) == processes
+
+
+def test_matcher_rebuilds_only_on_config_change(monkeypatch):
+    """Test that the compiled matcher is reused until the lists change."""
+    monkeypatch.setattr(config, 'FILTER_MODE', 'whitelist')
+    monkeypatch.setattr(config, 'DEV_PROCESS_WHITELIST', ['node'])
+
+    matcher = port_scanner.get_process_matcher()
+    assert port_scanner.get_process_matcher() is matcher
+    assert matcher.matches('node') and not matcher.matches('Spotify')
+
+    # Repeated names are answered from the memo cache
+    matcher.matches('node')
+    assert matcher.matches.cache_info().hits >= 1
+
+    monkeypatch.setattr(config, 'DEV_PROCESS_WHITELIST', ['node', 'spotify'])
+    rebuilt = port_scanner.get_process_matcher()
+    assert rebuilt is not matcher
+    assert rebuilt.matches('Spotify')
+
+
+def test_port_range_bytecode_layout():
+    """Test the inet_diag bytecode for one and several port ranges."""
+    single = port_scanner.build_port_range_bytecode([(3000, 9000)])
+    # S_GE, operand, S_LE, operand
+    assert len(single) == 16
+    assert single[:4] == bytes([2, 8]) + (20).to_bytes(2, sys.byteorder)
+
+    double = port_scanner.build_port_range_bytecode([(3000, 3999), (8000, 8999)])
+    # Two ranges joined by a JMP
+    assert len(double) == 36
+    assert double[16] == 1
+
+
+def test_netlink_backend():
+    """Test the netlink backend filters by port range in the kernel."""
+    backend = port_scanner.NetlinkBackend()
+    if not backend.is_available():
+        pytest.skip("NETLINK_SOCK_DIAG not available")
+
+    listeners = []
+    try:
+        for _ in range(4):
+            sock = socket.socket()
+            sock.bind(("127.0.0.1", 0))
+            sock.listen()
+            listeners.append(sock)
+
+        inside, outside, first, second = (sock.getsockname()[1] for sock in listeners)
+
+        # A UDP socket bound to the same port is found in the same scan
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        listeners.append(udp)
+        udp.bind(("127.0.0.1", inside))
+
+        processes = backend.scan(PortSet([(inside, inside)]))
+
+        mine = {(p['port'], p['protocol'], p['address']) for p in processes if p['pid'] == os.getpid()}
+        assert mine == {(inside, 'tcp', '127.0.0.1'), (inside, 'udp', '127.0.0.1')}
+        assert outside not in {p['port'] for p in processes}
+        assert not backend.listeners_changed(PortSet([(inside, inside)]))
+
+        # Sparse sets: one kernel filter with a range per port
+        sparse = PortSet([(first, first), (second, second)])
+        assert {p['port'] for p in backend.scan(sparse) if p['pid'] == os.getpid()} == {first, second}
+    finally:
+        for sock in listeners:
+            sock.close()
+
+    assert backend.listeners_changed(PortSet([(inside, inside)]))
+
+
+def test_port_snapshot_indexes():
+    """Test deduplication and the port/pid indexes of PortSnapshot."""
+    snapshot = port_scanner.PortSnapshot([
+        {'port': 8000, 'pid': 2, 'name': 'python3'},
+        {'port': 3000, 'pid': 1, 'name': 'node'},
+        {'port': 3000, 'pid': 1, 'name': 'node'},  # IPv6 twin
+        {'port': 3001, 'pid': 1, 'name': 'node'},
+        {'port': 3000, 'pid': 3, 'name': 'node'},  # SO_REUSEPORT worker
+    ])
+
+    assert len(snapshot) == 4
+    assert [(e['port'], e['pid']) for e in snapshot] == [(3000, 1), (3000, 3), (3001, 1), (8000, 2)]
+    assert snapshot.ports == (3000, 3001, 8000)
+    assert snapshot.ports_of(1) == (3000, 3001)
+    assert snapshot.ports_of(99) == ()
+    assert [e['pid'] for e in snapshot.entries_for_port(3000)] == [1, 3]
+    assert snapshot.lookup(8000)['name'] == 'python3'
+    assert snapshot.lookup(9999) is None
+    assert 3001 in snapshot
+
+    with pytest.raises(TypeError):
+        snapshot.lookup(8000)['name'] = 'ruby'
+
+
+def test_port_snapshot_merges_sockets():
+    """Test that the sockets of one (port, pid) are merged into one entry."""
+    snapshot = port_scanner.PortSnapshot([
+        {'port': 3000, 'pid': 1, 'name': 'node', 'protocol': 'tcp', 'family': 'ipv6', 'address': '::'},
+        {'port': 3000, 'pid': 1, 'name': 'node', 'protocol': 'tcp', 'family': 'ipv4', 'address': '0.0.0.0'},
+        {'port': 3000, 'pid': 1, 'name': 'node', 'protocol': 'udp', 'family': 'ipv4', 'address': '0.0.0.0'},
+        {'port': 3000, 'pid': 2, 'name': 'node', 'protocol': 'tcp', 'family': 'ipv4', 'address': '0.0.0.0'},
+    ])
+
+    assert list(snapshot.listeners) == [(3000, 1), (3000, 2)]
+    entry = snapshot.listeners[(3000, 1)]
+    assert 'protocol' not in entry
+    assert entry['sockets'] == (
+        ('tcp', 'ipv4', '0.0.0.0'), ('tcp', 'ipv6', '::'), ('udp', 'ipv4', '0.0.0.0'),
+    )
+
+    # Rebuilding from merged entries (as the scan engine does) keeps them
+    rebuilt = port_scanner.PortSnapshot({**e, 'memory_mb': 1.0} for e in snapshot)
+    assert rebuilt.listeners[(3000, 1)]['sockets'] == entry['sockets']
+
+
+def test_get_process_by_port_uses_latest_snapshot(monkeypatch):
+    """Test that single-port lookups don't scan again."""
+    scans = []
+
+    class CountingBackend(port_scanner.ScannerBackend):
+        def scan(self, ports):
+            scans.append(ports)
+            return [{'port': 3000, 'pid': 1, 'name': 'node'}]
+
+    monkeypatch.setattr(config, "FILTER_MODE", "off")
+    monkeypatch.setattr(port_scanner, "_latest_snapshot", None)
+    port_scanner.set_backend(CountingBackend())
+    try:
+        assert port_scanner.get_process_by_port(3000) == {'port': 3000, 'pid': 1, 'name': 'node'}
+        assert port_scanner.get_process_by_port(3001) is None
+    finally:
+        port_scanner.set_backend(None)
+
+    assert len(scans) == 1
+
+
 if __name__ == "__main__":
     test_scan_ports()
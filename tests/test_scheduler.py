@@ -0,0 +1,52 @@
+"""Tests for the adaptive refresh scheduler."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.scheduler import RefreshScheduler
+
+
+def test_backs_off_while_unchanged():
+    """Test exponential back-off up to the maximum interval."""
+    scheduler = RefreshScheduler(min_interval=1, max_interval=10, backoff=2)
+
+    intervals = []
+    for _ in range(5):
+        scheduler.record(changed=False)
+        intervals.append(scheduler.interval)
+
+    assert intervals == [2, 4, 8, 10, 10]
+
+
+def test_change_and_request_reset_interval():
+    """Test that a change or an explicit request returns to the fast interval."""
+    scheduler = RefreshScheduler(min_interval=1, max_interval=10, backoff=2)
+
+    scheduler.record(changed=False)
+    scheduler.record(changed=True)
+    assert scheduler.interval == 1
+
+    scheduler.record(changed=False)
+    scheduler.request()
+    assert scheduler.interval == 1
+
+
+def test_requests_are_coalesced():
+    """Test that many requests before the worker wakes cause a single wake-up."""
+    scheduler = RefreshScheduler(min_interval=0.2, max_interval=0.2)
+
+    threads = [threading.Thread(target=scheduler.request) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert scheduler.wait() is True
+
+    # All ten requests were consumed by that one wake-up
+    started = time.monotonic()
+    assert scheduler.wait() is False
+    assert time.monotonic() - started >= 0.15